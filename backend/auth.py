@@ -1,13 +1,24 @@
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from . import models, schemas, database, config
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=config.settings.ARGON2_TIME_COST,
+    argon2__memory_cost=config.settings.ARGON2_MEMORY_COST_KIB,
+    argon2__parallelism=config.settings.ARGON2_PARALLELISM,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 SECRET_KEY = config.settings.SECRET_KEY
@@ -20,6 +31,60 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# argon2 is CPU-bound but releases the GIL. Running it on a small dedicated pool
+# keeps a login storm from occupying every API threadpool slot, and the
+# pending limit sheds load instead of letting the queue grow without bound.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_pending = 0
+
+def _password_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=config.settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+        )
+    return _hash_executor
+
+async def _run_password_hashing(fn, *args):
+    global _hash_pending
+    if _hash_pending >= config.settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_executor(), fn, *args)
+    finally:
+        _hash_pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_hashing(pwd_context.hash, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also returns a new hash when the stored one uses outdated parameters."""
+    return await _run_password_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
+class Principal:
+    """
+    The authenticated caller, as carried by an access token. Routes that only
+    need the user's id (most of them) authorize from this without a database
+    round trip; changes to a user's role take effect when their token is next
+    refreshed.
+    """
+    __slots__ = ("id", "email", "full_name", "role")
+
+    def __init__(self, id: str, email: str, full_name: Optional[str] = None, role: str = "user"):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.role = role
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(user.id, user.email, user.full_name, user.role or "user")
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -30,22 +95,138 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
-    credentials_exception = HTTPException(
+def create_user_access_token(user: models.User) -> str:
+    """Short-lived access token carrying everything needed to build a Principal."""
+    return create_access_token(
+        {"sub": user.id, "email": user.email, "name": user.full_name, "role": user.role or "user", "typ": "access"},
+        timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(email=email)
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(models.User).filter(models.User.email == token_data.email).first()
+        raise credentials_exception()
+    if payload.get("sub") is None:
+        raise credentials_exception()
+    return payload
+
+def decode_access_token(token: str) -> schemas.TokenData:
+    payload = decode_token(token)
+    typ = payload.get("typ")
+    if typ == "access":
+        return schemas.TokenData(user_id=payload["sub"], email=payload.get("email"))
+    if typ is not None:
+        # e.g. a refresh token presented as a bearer token
+        raise credentials_exception()
+    # Tokens issued before access claims existed carry only sub=email
+    return schemas.TokenData(email=payload["sub"])
+
+def _user_filter(token_data: schemas.TokenData):
+    if token_data.user_id:
+        return models.User.id == token_data.user_id
+    return models.User.email == token_data.email
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Stateless authorization from the access token's claims; no users-table lookup."""
+    payload = decode_token(token)
+    if payload.get("typ") == "access":
+        return Principal(payload["sub"], payload.get("email"), payload.get("name"), payload.get("role", "user"))
+    token_data = decode_access_token(token)
+    async with database.AsyncSessionLocal() as db:
+        user = (await db.execute(select(models.User).where(_user_filter(token_data)))).scalars().first()
+    if user is None:
+        raise credentials_exception()
+    return Principal.from_user(user)
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+    """Loads the full User row; only for routes that return or modify the user itself."""
+    token_data = decode_access_token(token)
+    user = db.query(models.User).filter(_user_filter(token_data)).first()
+    if user is None:
+        raise credentials_exception()
+    return user
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(database.get_async_db)):
+    """Same as get_current_user, for routes on the AsyncSession path."""
+    token_data = decode_access_token(token)
+    result = await db.execute(select(models.User).where(_user_filter(token_data)))
+    user = result.scalars().first()
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
     return user
+
+# Refresh tokens: long-lived, single use. Each refresh revokes the presented
+# token and issues a new one in the same family; presenting a token that was
+# already rotated means it leaked, so the whole family is revoked.
+
+async def issue_refresh_token(db: AsyncSession, user_id: str, family_id: Optional[str] = None) -> str:
+    """Adds the revocation row to the session; the caller commits."""
+    jti = uuid.uuid4().hex
+    family_id = family_id or uuid.uuid4().hex
+    expires_at = datetime.utcnow() + timedelta(days=config.settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(models.RefreshToken(id=jti, user_id=user_id, family_id=family_id, expires_at=expires_at, revoked=False))
+    return jwt.encode(
+        {"sub": user_id, "jti": jti, "fam": family_id, "typ": "refresh", "exp": expires_at},
+        SECRET_KEY, algorithm=ALGORITHM,
+    )
+
+def _decode_refresh_token(token: str) -> dict:
+    payload = decode_token(token)
+    if payload.get("typ") != "refresh" or not payload.get("jti"):
+        raise credentials_exception()
+    return payload
+
+async def revoke_token_family(db: AsyncSession, family_id: str):
+    await db.execute(
+        update(models.RefreshToken).where(models.RefreshToken.family_id == family_id).values(revoked=True)
+    )
+    await db.commit()
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[models.User, str]:
+    """Exchange a refresh token for the user and a new refresh token."""
+    payload = _decode_refresh_token(token)
+    # Claim the token in one statement, so concurrent refreshes with the same
+    # token cannot both pass a read-then-write check; only the winner rotates
+    claimed = await db.execute(
+        update(models.RefreshToken)
+        .where(
+            models.RefreshToken.id == payload["jti"],
+            models.RefreshToken.user_id == payload["sub"],
+            models.RefreshToken.revoked.is_(False),
+        )
+        .values(revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount != 1:
+        await db.rollback()
+        row = await db.get(models.RefreshToken, payload["jti"])
+        if row is not None and row.user_id == payload["sub"]:
+            # Already rotated: replayed or leaked
+            await revoke_token_family(db, row.family_id)
+        raise credentials_exception()
+    user = await db.get(models.User, payload["sub"])
+    if user is None:
+        await db.rollback()
+        raise credentials_exception()
+    new_token = await issue_refresh_token(db, user.id, payload["fam"])
+    await db.commit()
+    return user, new_token
+
+async def revoke_refresh_token(db: AsyncSession, token: str):
+    payload = _decode_refresh_token(token)
+    await revoke_token_family(db, payload["fam"])
+
+async def purge_expired_refresh_tokens(db: AsyncSession, user_id: str):
+    await db.execute(
+        delete(models.RefreshToken).where(
+            models.RefreshToken.user_id == user_id, models.RefreshToken.expires_at < datetime.utcnow()
+        )
+    )
@@ -0,0 +1,265 @@
+"""
+In-process benchmark of the API hot paths.
+
+Builds a throwaway SQLite database (migrated, then seeded by backend/seed.py
+with --users users each holding --vitals vitals and --reports reports), starts
+the app with its lifespan and drives it through httpx's ASGI transport, so the
+numbers cover routing, validation, auth, ORM and serialization without any
+network or server noise. The LLM provider is replaced by a fake that answers
+instantly, which keeps upload and chat deterministic and offline.
+
+Scenarios: login, dashboard, vitals_list, vitals_add, report_upload, chat, sos.
+Each runs --requests requests at --concurrency and reports throughput and
+p50/p95/p99 latency. Results are written as JSON so runs can be compared
+across commits (--compare baseline.json prints the change per scenario).
+
+DATABASE_URL from the environment is ignored: the run migrates the database
+and seeds thousands of synthetic users into it. To benchmark another
+database, such as a disposable PostgreSQL, pass it with --database-url.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.api_bench --users 200 --vitals 500 --json bench.json
+    python -m backend.benchmarks.api_bench --scenarios dashboard,chat --compare bench.json
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCENARIOS = ("login", "dashboard", "vitals_list", "vitals_add", "report_upload", "chat", "sos")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+# --- Fake LLM -----------------------------------------------------------------
+
+class FakeUsage:
+    prompt_token_count = 400
+    candidates_token_count = 120
+
+
+class FakeResponse:
+    usage_metadata = FakeUsage()
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+ANALYSIS_JSON = json.dumps({
+    "summary": "Benchmark report: all markers within range.",
+    "risk_level": "GREEN",
+    "findings": [{"marker": "Hemoglobin", "value": "14.1 g/dL", "status": "NORMAL"}],
+})
+
+
+def install_fake_llm():
+    from ..config import settings
+    from ..services import llm
+
+    settings.GEMINI_API_KEY = "benchmark"
+    llm.upload_file = lambda path, mime_type: {"path": path, "mime_type": mime_type}
+    llm.generate = lambda contents, model_name=llm.DEFAULT_MODEL: FakeResponse(ANALYSIS_JSON)
+
+    async def generate_async(contents, model_name=llm.DEFAULT_MODEL):
+        return FakeResponse("Stay hydrated and keep logging your vitals. Consult your doctor for advice.")
+
+    llm.generate_async = generate_async
+
+
+# --- Seeding ------------------------------------------------------------------
+
+def seed_database(users: int, vitals_per_user: int, reports_per_user: int, seed: int) -> list:
+    """Synthetic users and history (see backend/seed.py); returns the user emails."""
+    from .. import seed as synthetic
+
+    synthetic.seed(os.environ["DATABASE_URL"], users, workers=1, seed=seed,
+                   vitals_per_user=vitals_per_user, reports_per_user=reports_per_user)
+    return [synthetic.user_email(n) for n in range(users)]
+
+
+# --- Scenarios ----------------------------------------------------------------
+
+def build_requests(emails: list, rng: random.Random):
+    """Map scenario name -> factory returning (method, path, kwargs) for one request."""
+    from .. import models
+    from ..auth import create_user_access_token
+    from ..database import SessionLocal
+    from ..seed import SEED_PASSWORD
+
+    db = SessionLocal()
+    try:
+        users = db.query(models.User).filter(models.User.email.in_(emails)).all()
+        headers = {u.email: {"Authorization": f"Bearer {create_user_access_token(u)}"} for u in users}
+    finally:
+        db.close()
+    pdf = b"%PDF-1.4\n% benchmark\n" + b"0" * 2048
+
+    def auth():
+        return headers[rng.choice(emails)]
+
+    return {
+        "login": lambda: ("POST", "/api/v1/auth/token",
+                          {"data": {"username": rng.choice(emails), "password": SEED_PASSWORD}}),
+        "dashboard": lambda: ("GET", "/api/v1/health/dashboard", {"headers": auth()}),
+        "vitals_list": lambda: ("GET", "/api/v1/health/vitals", {"headers": auth()}),
+        "vitals_add": lambda: ("POST", "/api/v1/health/vitals",
+                               {"headers": auth(), "json": {"heart_rate": "72", "blood_pressure": "120/80"}}),
+        "report_upload": lambda: ("POST", "/api/v1/analysis/upload",
+                                  {"headers": auth(), "files": {"file": ("report.pdf", io.BytesIO(pdf), "application/pdf")}}),
+        "chat": lambda: ("POST", "/api/v1/assistant/chat",
+                         {"headers": auth(), "json": {"message": "How are my vitals looking?"}}),
+        "sos": lambda: ("POST", "/api/v1/emergency/trigger",
+                        {"headers": auth(), "json": {"latitude": 19.07, "longitude": 72.87}}),
+    }
+
+
+async def run_scenario(client, factory, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(factory())
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            method, path, kwargs = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2),
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies), 2),
+        },
+    }
+
+
+async def run(args, emails: list) -> dict:
+    import httpx
+
+    from ..main import app
+
+    install_fake_llm()
+    factories = build_requests(emails, random.Random(args.seed))
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name in args.scenarios:
+                # Warm-up so one-off costs (first query compile, lazy imports) stay out of the numbers
+                await run_scenario(client, factories[name], min(args.concurrency, args.requests), args.concurrency)
+                results[name] = await run_scenario(client, factories[name], args.requests, args.concurrency)
+                print(f"{name:14s} {results[name]['throughput_rps']:>8} rps  "
+                      f"p50 {results[name]['latency_ms']['p50']:>8} ms  p99 {results[name]['latency_ms']['p99']:>8} ms")
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(results: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["scenarios"]
+    print(f"\nvs {baseline_path}:")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric in ("p50", "p99"):
+            old, new = before["latency_ms"][metric], current["latency_ms"][metric]
+            print(f"  {name:14s} {metric} {old:>8} -> {new:>8} ms ({(new - old) / old * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API hot paths in-process")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--vitals", type=int, default=200, help="Vitals per user")
+    parser.add_argument("--reports", type=int, default=5, help="Reports per user")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", default=None)
+    parser.add_argument("--compare", default=None, help="Earlier --json output to compare against")
+    parser.add_argument("--database-url", default=None,
+                        help="Disposable database to migrate and seed (default: a scratch SQLite file)")
+    args = parser.parse_args()
+    args.scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    # The app writes uploads relative to the working directory, so run inside a scratch dir
+    workdir = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir.name, 'api_bench.db')}"
+    os.environ.setdefault("PRICE_REFRESH_INTERVAL_SECONDS", "86400")
+    # Scenarios hammer the LLM routes far beyond any per-user limit; the limiter
+    # has its own overhead benchmark (benchmarks/rate_limit.py)
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    os.chdir(workdir.name)
+
+    from .. import migrate
+    migrate.upgrade()
+    seed_started = time.perf_counter()
+    emails = seed_database(args.users, args.vitals, args.reports, args.seed)
+    print(f"Seeded {args.users} users x {args.vitals} vitals / {args.reports} reports "
+          f"in {time.perf_counter() - seed_started:.1f}s")
+
+    results = asyncio.run(run(args, emails))
+    output = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "users": args.users, "vitals_per_user": args.vitals, "reports_per_user": args.reports,
+            "requests": args.requests, "concurrency": args.concurrency, "seed": args.seed,
+        },
+        "scenarios": results,
+    }
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(output, f, indent=2)
+    if compare_path:
+        compare(results, compare_path)
+    os.chdir(REPO_ROOT)
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
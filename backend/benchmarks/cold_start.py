@@ -0,0 +1,109 @@
+"""
+ASGI cold-start budget.
+
+Starts a fresh interpreter per run and measures the three phases an autoscaled
+instance goes through before it can take traffic:
+    import     - importing backend.main (app construction, routers, SDKs)
+    startup    - running the lifespan startup (catalog/index loading)
+    first      - serving the first GET /api/v1/health
+The median total across runs is checked against --budget-ms; the script exits
+non-zero when it is exceeded, so it can gate CI or a deploy.
+
+Usage (from the repository root, after python -m backend.migrate):
+    python -m backend.benchmarks.cold_start --runs 5 --budget-ms 2500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs inside the child interpreter; prints one JSON line with phase timings
+PROBE = r"""
+import asyncio, json, time
+t0 = time.perf_counter()
+from backend.main import app
+t1 = time.perf_counter()
+
+async def main():
+    import httpx
+    messages = asyncio.Queue()
+    await messages.put({"type": "lifespan.startup"})
+    started = asyncio.Event()
+
+    async def receive():
+        return await messages.get()
+
+    async def send(message):
+        if message["type"].startswith("lifespan.startup"):
+            started.set()
+
+    lifespan = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send))
+    await started.wait()
+    t2 = time.perf_counter()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        response = await client.get("/api/v1/health")
+    t3 = time.perf_counter()
+    await messages.put({"type": "lifespan.shutdown"})
+    await lifespan
+    return t2, t3, response.status_code
+
+t2, t3, status = asyncio.run(main())
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "startup_ms": (t2 - t1) * 1000,
+                  "first_request_ms": (t3 - t2) * 1000, "status": status}))
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure_once(env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=REPO_ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["total_ms"] = sample["import_ms"] + sample["startup_ms"] + sample["first_request_ms"]
+    return sample
+
+
+def prepare_database(env: dict):
+    """Migrate the target database once, outside the timed runs (as the release step would)."""
+    subprocess.run([sys.executable, "-m", "backend.migrate"], cwd=REPO_ROOT, env=env,
+                   check=True, capture_output=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ASGI cold start against a budget")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2500.0)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    tmpdir = None
+    if "DATABASE_URL" not in env:
+        tmpdir = tempfile.TemporaryDirectory()
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'cold_start.db')}"
+    prepare_database(env)
+
+    samples = [measure_once(env) for _ in range(args.runs)]
+    summary = {
+        phase: round(statistics.median(s[phase] for s in samples), 1)
+        for phase in ("import_ms", "startup_ms", "first_request_ms", "total_ms")
+    }
+    summary.update(runs=args.runs, budget_ms=args.budget_ms, within_budget=summary["total_ms"] <= args.budget_ms)
+
+    print(json.dumps(summary, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"summary": summary, "samples": samples}, f, indent=2)
+    if tmpdir:
+        tmpdir.cleanup()
+    sys.exit(0 if summary["within_budget"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Memory and time to first byte of the streaming export.
+
+Seeds one synthetic user with --rows vitals in a throwaway database, then
+compares producing their record:
+
+  materialized  what clients did before: every list loaded through its
+                response_model and encoded in one piece
+  ndjson        services.export.stream_ndjson, consumed chunk by chunk
+  csv           services.export.stream_csv for the vitals section
+
+Peak memory is traced with tracemalloc (Python allocations only), so the
+absolute times are inflated; compare the rows against each other. Exits
+non-zero when the NDJSON stream's peak exceeds --budget-mib, which should
+hold for any --rows since memory is bounded by EXPORT_BATCH_ROWS.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.export --rows 200000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def traced(produce):
+    """(first chunk ms, total ms, bytes, peak MiB) for a callable returning an iterable of chunks."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in produce():
+        if first is None:
+            first = (time.perf_counter() - started) * 1000
+        size += len(chunk)
+    total = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return {"first_chunk_ms": round(first or total, 1), "total_ms": round(total, 1),
+            "bytes": size, "peak_mib": round(peak, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the streaming export against a materialized one")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--budget-mib", type=float, default=32.0)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+
+    workdir = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir.name, 'export.db')}"
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    from pydantic import TypeAdapter
+
+    from .. import database, migrate, models, schemas
+    from .. import seed as synthetic
+    from ..services import export
+
+    migrate.upgrade()
+    synthetic.seed(os.environ["DATABASE_URL"], 1, workers=1, vitals_per_user=args.rows,
+                   reports_per_user=20, medicines_per_user=10)
+    db = database.SessionLocal()
+    user_id = db.query(models.User.id).scalar()
+    db.close()
+
+    lists = (
+        (models.Vital, schemas.VitalResponse),
+        (models.Report, schemas.ReportResponse),
+        (models.Medicine, schemas.MedicineResponse),
+    )
+
+    def materialized():
+        session = database.SessionLocal()
+        try:
+            for model, schema in lists:
+                adapter = TypeAdapter(List[schema])
+                entities = session.query(model).filter(model.user_id == user_id).all()
+                yield adapter.dump_json(adapter.validate_python(entities))
+        finally:
+            session.close()
+
+    results = {
+        "rows": args.rows,
+        "batch_rows": export.settings.EXPORT_BATCH_ROWS,
+        "materialized": traced(materialized),
+        "ndjson": traced(lambda: export.stream_ndjson(user_id)),
+        "csv": traced(lambda: export.stream_csv(user_id, "vital")),
+    }
+
+    print(json.dumps(results, indent=2))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    workdir.cleanup()
+    if results["ndjson"]["peak_mib"] > args.budget_mib:
+        print(f"Streaming export peaked at {results['ndjson']['peak_mib']} MiB (budget {args.budget_mib} MiB)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Import-time profile of the ASGI app.
+
+Runs `python -X importtime -c "import backend.main"` in a fresh interpreter,
+parses the per-module report from stderr and prints the modules with the
+largest cumulative import cost. Exits non-zero when the total exceeds
+--budget-ms or when a heavy SDK that should only load on demand (Gemini,
+Pillow, Twilio, pytesseract) is imported at startup.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.import_time --top 20 --budget-ms 1500
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Top-level packages that must stay behind the provider layer
+LAZY_PACKAGES = ("google.generativeai", "google.ai.generativelanguage", "PIL", "twilio", "pytesseract")
+
+# Total self time of all imports, best of --runs; backend/tests/test_import_time.py holds the app to it
+BUDGET_MS = 1500.0
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> list:
+    """Return [{module, self_us, cumulative_us, depth}] in report order."""
+    rows = []
+    for line in stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2,
+            })
+    return rows
+
+
+def profile(target: str, env: dict) -> list:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"import {target} failed")
+    return parse_importtime(result.stderr)
+
+
+def eager_heavy_imports(modules) -> list:
+    """The modules among these that belong to LAZY_PACKAGES."""
+    return sorted({m for m in modules if any(m == p or m.startswith(p + ".") for p in LAZY_PACKAGES)})
+
+
+def best_profile(target: str, env: dict, runs: int) -> list:
+    """The fastest of several profiles, to dampen noise."""
+    return min((profile(target, env) for _ in range(runs)),
+               key=lambda r: sum(row["self_us"] for row in r))
+
+
+def total_ms(rows: list) -> float:
+    return sum(row["self_us"] for row in rows) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile and budget the app's import time")
+    parser.add_argument("--target", default="backend.main")
+    parser.add_argument("--runs", type=int, default=3, help="Best-of-N to dampen noise")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+    rows = best_profile(args.target, env, args.runs)
+    total = total_ms(rows)
+    eager = eager_heavy_imports(row["module"] for row in rows)
+    top = sorted((r for r in rows if r["depth"] <= 1), key=lambda r: -r["cumulative_us"])[:args.top]
+
+    summary = {
+        "target": args.target,
+        "total_ms": round(total, 1),
+        "modules": len(rows),
+        "budget_ms": args.budget_ms,
+        "within_budget": total <= args.budget_ms,
+        "eager_heavy_imports": eager[:10],
+        "top": [{"module": r["module"], "cumulative_ms": round(r["cumulative_us"] / 1000, 1)} for r in top],
+    }
+    print(json.dumps(summary, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"summary": summary, "rows": rows}, f, indent=2)
+    sys.exit(0 if summary["within_budget"] and not eager else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Password hashing throughput.
+
+Verifies argon2id hashes with the configured (or overridden) parameters from
+1..--threads threads and reports logins per second, per core and the
+per-verification latency. argon2 releases the GIL, so throughput should scale
+with threads up to the core count; use the per-core figure to size
+PASSWORD_HASH_WORKERS and the instance for a login storm.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.password_hash
+    python -m backend.benchmarks.password_hash --memory-kib 65536 --time-cost 3 --parallelism 4
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+from ..config import settings
+
+
+def measure(context: CryptContext, threads: int, seconds: float) -> dict:
+    hashed = context.hash("benchmark-password")
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        latencies = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            context.verify("benchmark-password", hashed)
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = [ms for result in pool.map(lambda _: worker(), range(threads)) for ms in result]
+    elapsed = time.perf_counter() - started
+    rate = len(latencies) / elapsed
+    return {
+        "threads": threads,
+        "logins_per_s": round(rate, 1),
+        "logins_per_s_per_core": round(rate / min(threads, os.cpu_count() or 1), 1),
+        "latency_ms_p50": round(statistics.median(latencies), 1),
+        "latency_ms_max": round(max(latencies), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure argon2 login throughput per core")
+    parser.add_argument("--time-cost", type=int, default=settings.ARGON2_TIME_COST)
+    parser.add_argument("--memory-kib", type=int, default=settings.ARGON2_MEMORY_COST_KIB)
+    parser.add_argument("--parallelism", type=int, default=settings.ARGON2_PARALLELISM)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duration per thread count")
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    context = CryptContext(
+        schemes=["argon2"], argon2__time_cost=args.time_cost,
+        argon2__memory_cost=args.memory_kib, argon2__parallelism=args.parallelism,
+    )
+    results = {
+        "params": {"time_cost": args.time_cost, "memory_kib": args.memory_kib, "parallelism": args.parallelism},
+        "cores": os.cpu_count(),
+        "runs": [measure(context, n, args.seconds) for n in sorted({1, args.threads})],
+    }
+    print(json.dumps(results, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
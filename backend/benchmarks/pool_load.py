@@ -0,0 +1,119 @@
+"""
+Connection pool load test.
+
+Fires N concurrent "requests" at the engine built from the configured pool
+settings. Each request checks out a connection, runs a query and holds the
+connection for --hold-ms (standing in for ORM work inside a request), and the
+time spent waiting for the checkout is recorded. With the default pool
+(5 + 10 overflow) and 200 concurrent requests, most of the latency is queueing
+for a connection, and requests beyond DB_POOL_TIMEOUT_SECONDS fail outright.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.pool_load --concurrency 200 --hold-ms 50
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.pool_load --json pool.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from ..config import settings
+from ..database import configure_engine, engine_options
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(url: str, concurrency: int, requests: int, hold_ms: float) -> dict:
+    engine = configure_engine(create_engine(url, **engine_options(url)))
+    waits, timeouts = [], 0
+    lock = threading.Lock()
+    # The first wave starts together; it is smaller than concurrency when there are fewer requests
+    first_wave = min(concurrency, requests)
+    start_gate = threading.Barrier(first_wave)
+
+    def one_request(n):
+        nonlocal timeouts
+        if n < first_wave:
+            start_gate.wait()
+        requested = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                acquired = time.perf_counter()
+                conn.execute(text("SELECT 1"))
+                time.sleep(hold_ms / 1000)
+        except PoolTimeoutError:
+            with lock:
+                timeouts += 1
+            return
+        with lock:
+            waits.append((acquired - requested) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(requests)))
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    return {
+        "database": engine.dialect.name,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout_s": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pgbouncer": settings.DB_PGBOUNCER,
+        "concurrency": concurrency,
+        "requests": requests,
+        "hold_ms": hold_ms,
+        "completed": len(waits),
+        "timeouts": timeouts,
+        "throughput_rps": round(len(waits) / elapsed, 1),
+        "wait_ms": {
+            "mean": round(statistics.fmean(waits), 2) if waits else None,
+            "p50": round(percentile(waits, 50), 2) if waits else None,
+            "p95": round(percentile(waits, 95), 2) if waits else None,
+            "p99": round(percentile(waits, 99), 2) if waits else None,
+            "max": round(max(waits), 2) if waits else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure connection checkout wait under concurrency")
+    parser.add_argument("--url", default=None, help="Database URL (default: a throwaway SQLite file)")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=None, help="Total requests (default: 5x concurrency)")
+    parser.add_argument("--hold-ms", type=float, default=50.0)
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write results to this file")
+    args = parser.parse_args()
+    if args.concurrency < 1 or (args.requests is not None and args.requests < 1):
+        parser.error("--concurrency and --requests must be at least 1")
+
+    tmpdir = None
+    url = args.url or os.environ.get("DATABASE_URL")
+    if not url:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'pool_load.db')}"
+
+    result = run(url, args.concurrency, args.requests or args.concurrency * 5, args.hold_ms)
+    print(json.dumps(result, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Overhead of the rate limiter on the request path.
+
+Drives the LLMRateLimit dependency (bucket take, daily budget lookup and the
+usage charge on exit) directly, for --users distinct users round-robin so the
+dict stays realistic, and reports the per-request cost. Exits non-zero when
+p99 exceeds --budget-us (100 µs by default), which makes it usable as a CI
+guard. Uses the in-process backend unless RATE_LIMIT_REDIS_URL is set.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.rate_limit
+    python -m backend.benchmarks.rate_limit --users 100000 --requests 500000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def measure(users: int, requests: int) -> dict:
+    from starlette.requests import Request
+
+    from ..auth import Principal
+    from ..rate_limit import LLMRateLimit, _current_usage
+
+    limit = LLMRateLimit("benchmark", user="1000000/minute", route="1000000000/minute")
+    principals = [Principal(f"user-{n}", f"user{n}@bench.test") for n in range(users)]
+    latencies = []
+    for i in range(requests):
+        principal = principals[i % users]
+        started = time.perf_counter()
+        dependency = limit(Request({"type": "http"}), principal)
+        await dependency.__anext__()
+        _current_usage.get().tokens += 500
+        try:
+            await dependency.__anext__()
+        except StopAsyncIteration:
+            pass
+        latencies.append((time.perf_counter() - started) * 1_000_000)
+    return {
+        "users": users,
+        "requests": requests,
+        "latency_us": {
+            "mean": round(statistics.fmean(latencies), 2),
+            "p50": round(percentile(latencies, 50), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies), 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the rate limiter's per-request overhead")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--budget-us", type=float, default=100.0, help="Fail if p99 exceeds this")
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    results = asyncio.run(measure(args.users, args.requests))
+    print(json.dumps(results, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    if results["latency_us"]["p99"] > args.budget_us:
+        print(f"p99 {results['latency_us']['p99']} µs exceeds the {args.budget_us} µs budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Serialization cost of a large vitals response.
+
+Seeds one synthetic user with --rows vitals in a throwaway database and times
+each way of producing the GET /health/vitals body:
+
+  orm_pydantic       ORM entities validated by the response_model, then
+                     dumped by pydantic-core (FastAPI's default path)
+  orm_pydantic_json  the same model output re-encoded by FastJSONResponse
+                     (why routes with a response_model keep FastAPI's path)
+  columns_direct     schema_columns + rows_response, what the route does now
+
+It checks that columns_direct produces exactly the bytes pydantic would, then
+reports body size and compression time at the configured gzip level and
+brotli quality (brotli only if the package is installed).
+
+Usage (from the repository root):
+    python -m backend.benchmarks.serialization --rows 10000
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def best_of(fn, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time serialization of a large vitals response")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+
+    workdir = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir.name, 'serialization.db')}"
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    from pydantic import TypeAdapter
+
+    from .. import database, migrate, models, schemas
+    from .. import seed as synthetic
+    from ..compression import brotli
+    from ..config import settings
+    from ..serialization import FastJSONResponse, rows_response, schema_columns
+
+    migrate.upgrade()
+    synthetic.seed(os.environ["DATABASE_URL"], 1, workers=1, vitals_per_user=args.rows,
+                   reports_per_user=0, medicines_per_user=0)
+
+    db = database.SessionLocal()
+    user_id = db.query(models.User.id).scalar()
+    adapter = TypeAdapter(List[schemas.VitalResponse])
+    order = models.Vital.recorded_at.desc()
+
+    def load_entities():
+        db.expunge_all()
+        return db.query(models.Vital).filter(models.Vital.user_id == user_id).order_by(order).all()
+
+    def orm_pydantic():
+        return adapter.dump_json(adapter.validate_python(load_entities()))
+
+    def orm_pydantic_json():
+        return FastJSONResponse(adapter.dump_python(adapter.validate_python(load_entities()), mode="json")).body
+
+    def columns_direct():
+        rows = db.query(*schema_columns(models.Vital, schemas.VitalResponse)).filter(
+            models.Vital.user_id == user_id).order_by(order).all()
+        return rows_response(schemas.VitalResponse, rows).body
+
+    results = {"rows": args.rows, "serialize_ms": {}}
+    bodies = {}
+    for name, fn in (("orm_pydantic", orm_pydantic), ("orm_pydantic_json", orm_pydantic_json),
+                     ("columns_direct", columns_direct)):
+        results["serialize_ms"][name], bodies[name] = best_of(fn, args.repeat)
+    db.close()
+    if bodies["columns_direct"] != bodies["orm_pydantic"]:
+        print("columns_direct output differs from the response_model output")
+        sys.exit(1)
+
+    body = bodies["columns_direct"]
+    results["body_bytes"] = len(body)
+    results["compression"] = {}
+    codecs = [("gzip", lambda: gzip.compress(body, settings.COMPRESSION_GZIP_LEVEL))]
+    if brotli is not None:
+        codecs.append(("br", lambda: brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)))
+    for name, fn in codecs:
+        ms, compressed = best_of(fn, args.repeat)
+        results["compression"][name] = {"ms": round(ms, 1), "bytes": len(compressed)}
+    results["serialize_ms"] = {k: round(v, 1) for k, v in results["serialize_ms"].items()}
+
+    print(json.dumps(results, indent=2))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
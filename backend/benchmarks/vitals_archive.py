@@ -0,0 +1,114 @@
+"""
+Storage saved by the vitals archive tier, and what reading across it costs.
+
+Seeds --users synthetic users with --vitals readings each (spread over three
+years) in a throwaway SQLite database, measures the vitals table and its
+indexes (dbstat), runs the archival job, vacuums, and measures again. It also
+times building one user's GET /health/vitals body before and after, and
+checks that the two bodies are identical.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.vitals_archive --users 20 --vitals 20000
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def table_bytes(path: str) -> dict:
+    """Bytes per table including its indexes, from SQLite's dbstat."""
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("VACUUM")
+        sizes = dict(connection.execute(
+            "SELECT tbl_name, SUM(pgsize) FROM dbstat JOIN sqlite_master USING (name) GROUP BY tbl_name"
+        ).fetchall())
+    finally:
+        connection.close()
+    return {table: sizes.get(table, 0) for table in ("vitals", "vitals_archive")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the vitals archive tier")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--vitals", type=int, default=20000, help="Readings per user")
+    parser.add_argument("--older-than-days", type=int, default=90)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+
+    workdir = tempfile.TemporaryDirectory()
+    db_path = os.path.join(workdir.name, "archive.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    from .. import database, migrate, models, schemas
+    from .. import seed as synthetic
+    from ..serialization import rows_response, schema_columns
+    from ..services import vitals_archive
+
+    migrate.upgrade()
+    synthetic.seed(os.environ["DATABASE_URL"], args.users, workers=1, vitals_per_user=args.vitals,
+                   reports_per_user=0, medicines_per_user=0)
+    db = database.SessionLocal()
+    user_id = db.query(models.User.id).order_by(models.User.id).first()[0]
+    fields = tuple(schemas.VitalResponse.model_fields)
+
+    def vitals_body():
+        db.expire_all()
+        started = time.perf_counter()
+        rows = db.query(*schema_columns(models.Vital, schemas.VitalResponse)).filter(
+            models.Vital.user_id == user_id).order_by(models.Vital.recorded_at.desc()).all()
+        body = rows_response(schemas.VitalResponse, vitals_archive.merged_newest_first(db, user_id, fields, rows)).body
+        return body, (time.perf_counter() - started) * 1000
+
+    body_before, list_before_ms = vitals_body()
+    db.close()
+    before = table_bytes(db_path)
+
+    started = time.perf_counter()
+    totals = vitals_archive.archive(args.older_than_days)
+    archive_seconds = time.perf_counter() - started
+    after = table_bytes(db_path)
+
+    db = database.SessionLocal()
+    body_after, list_after_ms = vitals_body()
+    hot_rows = db.query(models.Vital).count()
+    user_months = db.query(models.VitalArchive).count()
+    db.close()
+    if body_after != body_before:
+        print("The vitals list differs after archiving")
+        sys.exit(1)
+
+    readings = args.users * args.vitals
+    results = {
+        "readings": readings,
+        "archived": totals["rows"],
+        "hot_rows_left": hot_rows,
+        "user_months": user_months,
+        "archive_seconds": round(archive_seconds, 1),
+        "vitals_table_mib": {"before": round(before["vitals"] / 2**20, 1), "after": round(after["vitals"] / 2**20, 1)},
+        "archive_table_mib": round(after["vitals_archive"] / 2**20, 1),
+        "bytes_per_reading": {
+            "hot": round(before["vitals"] / readings, 1),
+            "archived": round(after["vitals_archive"] / max(totals["rows"], 1), 1),
+        },
+        "vitals_list_ms": {"before": round(list_before_ms, 1), "after": round(list_after_ms, 1)},
+    }
+    print(json.dumps(results, indent=2))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
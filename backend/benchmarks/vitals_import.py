@@ -0,0 +1,109 @@
+"""
+Throughput of the bulk vitals import.
+
+Writes a --rows line CSV of mixed vitals (with a small share of invalid rows)
+into a throwaway database's upload directory and runs the import worker on it
+in this process, as the pool would. Reports rows per second and the job's
+counters; exits non-zero when the import takes longer than --budget-s (60 s
+by default, the target for a 1M-row file).
+
+Usage (from the repository root):
+    python -m backend.benchmarks.vitals_import --rows 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLES = (
+    ("HR", lambda rng: (rng.randint(55, 110), ""), "bpm"),
+    ("BP", lambda rng: (rng.randint(100, 160), rng.randint(60, 100)), "mmHg"),
+    ("Glucose", lambda rng: (rng.randint(70, 200), ""), "mg/dL"),
+    ("Temp", lambda rng: (round(rng.uniform(36.1, 38.5), 1), ""), "Cel"),
+    ("Weight", lambda rng: (round(rng.uniform(50, 110), 1), ""), "kg"),
+)
+
+
+def write_csv(path: str, rows: int, invalid_share: float = 0.01, seed: int = 42):
+    rng = random.Random(seed)
+    start = datetime(2016, 1, 1)
+    with open(path, "w", newline="") as f:
+        f.write("category,value_primary,value_secondary,unit,notes,recorded_at\n")
+        for i in range(rows):
+            category, values, unit = SAMPLES[i % len(SAMPLES)]
+            primary, secondary = values(rng)
+            if rng.random() < invalid_share:
+                primary = "n/a"
+            recorded_at = (start + timedelta(minutes=i)).isoformat()
+            f.write(f"{category},{primary},{secondary},{unit},,{recorded_at}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a bulk vitals import")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--budget-s", type=float, default=60.0)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+
+    workdir = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir.name, 'import.db')}"
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    from .. import database, migrate, models
+    from .. import seed as synthetic
+    from ..services import vitals_import
+
+    migrate.upgrade()
+    synthetic.seed(os.environ["DATABASE_URL"], 1, workers=1, vitals_per_user=0,
+                   reports_per_user=0, medicines_per_user=0)
+    vitals_import.IMPORT_DIR = workdir.name
+
+    db = database.SessionLocal()
+    user_id = db.query(models.User.id).scalar()
+    job = models.ImportJob(user_id=user_id, format="csv", status=vitals_import.QUEUED)
+    db.add(job)
+    db.commit()
+    job_id = job.id
+    path = vitals_import.upload_path(job_id)
+    write_csv(path, args.rows)
+    size = os.path.getsize(path)
+
+    started = time.perf_counter()
+    vitals_import.run_import(job_id, path)
+    elapsed = time.perf_counter() - started
+
+    db.expire_all()
+    job = db.get(models.ImportJob, job_id)
+    results = {
+        "rows": args.rows,
+        "file_mib": round(size / (1024 * 1024), 1),
+        "batch_rows": vitals_import.settings.IMPORT_BATCH_ROWS,
+        "status": job.status,
+        "rows_imported": job.rows_imported,
+        "rows_rejected": job.rows_rejected,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(args.rows / elapsed),
+    }
+    db.close()
+
+    print(json.dumps(results, indent=2))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    workdir.cleanup()
+    if job.status != vitals_import.SUCCEEDED or elapsed > args.budget_s:
+        print(f"Import took {elapsed:.1f}s (budget {args.budget_s:.0f}s), status {job.status}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
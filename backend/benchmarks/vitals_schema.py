@@ -0,0 +1,160 @@
+"""
+Size and speed of the compact vitals schema (migration 0009) against the
+string-keyed one it replaced.
+
+Seeds --users synthetic users with --vitals readings each in a throwaway
+SQLite database at head, measures the vitals table and each of its indexes
+(dbstat) and times the two hot queries:
+
+  list       one user's readings, newest first (GET /health/vitals)
+  dashboard  the newest reading of each of five categories (GET /health/dashboard)
+
+It then downgrades to 0008 and measures the old layout twice: as it was,
+with no index besides its primary key, and with the same (user_id, category,
+recorded_at) index added, which separates what the index buys from what the
+narrower rows and keys buy. Upgrading again must give back the same rows and ids.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.vitals_schema --users 20 --vitals 20000
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DASHBOARD_CATEGORIES = ("HR", "BP", "Glucose", "Temp", "Weight")
+INDEX = "ix_vitals_user_id_category_recorded_at"
+
+
+def index_bytes(path: str) -> dict:
+    """Bytes of the vitals table and of each of its indexes, from SQLite's dbstat."""
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("VACUUM")
+        sizes = dict(connection.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN "
+            "(SELECT name FROM sqlite_master WHERE tbl_name = 'vitals') GROUP BY name"
+        ).fetchall())
+    finally:
+        connection.close()
+    return {"table": sizes.pop("vitals"), "indexes": sizes}
+
+
+def query_ms(path: str, user_ids, category_key, repeat: int) -> dict:
+    """Median ms of the list and dashboard queries over the given users."""
+    connection = sqlite3.connect(path)
+    list_sql = ("SELECT id, category, value_primary, value_secondary, unit, notes, recorded_at "
+                "FROM vitals WHERE user_id = ? ORDER BY recorded_at DESC")
+    latest_sql = ("SELECT id, value_primary, value_secondary, unit, recorded_at FROM vitals "
+                  "WHERE user_id = ? AND category = ? ORDER BY recorded_at DESC LIMIT 1")
+    timings = {"list": [], "dashboard": []}
+    try:
+        for _ in range(repeat):
+            for user_id in user_ids:
+                started = time.perf_counter()
+                connection.execute(list_sql, (user_id,)).fetchall()
+                timings["list"].append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                for category in DASHBOARD_CATEGORIES:
+                    connection.execute(latest_sql, (user_id, category_key(category))).fetchone()
+                timings["dashboard"].append((time.perf_counter() - started) * 1000)
+    finally:
+        connection.close()
+    return {name: round(statistics.median(values), 2) for name, values in timings.items()}
+
+
+def measure(path: str, user_ids, category_key, repeat: int) -> dict:
+    sizes = index_bytes(path)
+    return {
+        "table_mib": round(sizes["table"] / 2**20, 2),
+        "index_mib": {name: round(size / 2**20, 2) for name, size in sorted(sizes["indexes"].items())},
+        "total_index_mib": round(sum(sizes["indexes"].values()) / 2**20, 2),
+        "query_ms": query_ms(path, user_ids, category_key, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the compact vitals schema against the old one")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--vitals", type=int, default=20000, help="Readings per user")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+
+    workdir = tempfile.TemporaryDirectory()
+    db_path = os.path.join(workdir.name, "vitals.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    from .. import database, migrate, models, schemas
+    from .. import seed as synthetic
+    from ..serialization import schema_columns
+
+    migrate.upgrade()
+    synthetic.seed(os.environ["DATABASE_URL"], args.users, workers=1, vitals_per_user=args.vitals,
+                   reports_per_user=0, medicines_per_user=0)
+
+    def vitals_rows():
+        db = database.SessionLocal()
+        try:
+            return db.query(*schema_columns(models.Vital, schemas.VitalResponse)).order_by(
+                models.Vital.user_id, models.Vital.recorded_at.desc(), models.Vital.id).all()
+        finally:
+            db.close()
+            database.engine.dispose()
+
+    rows_before = vitals_rows()
+    user_ids = sorted({row.user_id for row in rows_before})
+    compact = measure(db_path, user_ids, models.VITAL_CATEGORIES.get, args.repeat)
+
+    started = time.perf_counter()
+    migrate.downgrade("0008")
+    downgrade_seconds = time.perf_counter() - started
+    old = measure(db_path, user_ids, str, args.repeat)
+    connection = sqlite3.connect(db_path)
+    connection.execute(f"CREATE INDEX {INDEX} ON vitals (user_id, category, recorded_at)")
+    connection.commit()
+    connection.close()
+    old_indexed = measure(db_path, user_ids, str, args.repeat)
+    connection = sqlite3.connect(db_path)
+    connection.execute(f"DROP INDEX {INDEX}")
+    connection.close()
+
+    started = time.perf_counter()
+    migrate.upgrade()
+    upgrade_seconds = time.perf_counter() - started
+    if vitals_rows() != rows_before:
+        print("The vitals differ after downgrading and upgrading again")
+        sys.exit(1)
+
+    results = {
+        "readings": args.users * args.vitals,
+        "compact": compact,
+        "old": old,
+        "old_with_same_index": old_indexed,
+        "bytes_per_reading": {
+            "compact": round((compact["table_mib"] + compact["total_index_mib"]) * 2**20 / len(rows_before), 1),
+            "old": round((old["table_mib"] + old["total_index_mib"]) * 2**20 / len(rows_before), 1),
+            "old_with_same_index": round(
+                (old_indexed["table_mib"] + old_indexed["total_index_mib"]) * 2**20 / len(rows_before), 1),
+        },
+        "migration_seconds": {"upgrade": round(upgrade_seconds, 1), "downgrade": round(downgrade_seconds, 1)},
+    }
+    print(json.dumps(results, indent=2))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Throughput of the production server profile from 1 to N workers.
+
+Seeds a throwaway SQLite database, then for each worker count starts gunicorn
+with backend/gunicorn.conf.py (WEB_CONCURRENCY set to the count) and drives
+it over real HTTP from --clients client processes for --seconds per scenario:
+
+  vitals_list  GET /health/vitals of a user with --vitals readings
+               (JSON encoding and compression)
+  login        POST /auth/token (argon2 verification)
+
+Reports requests per second, p50/p95 latency and the speedup over one
+worker. The clients run on the same machine and take CPU from the server,
+so on small machines the curve flattens early; run with --max-workers
+below the core count, or accept the numbers as a lower bound. By default it
+goes up to the available cores.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.worker_scaling --max-workers 8 --clients 16
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BACKEND_DIR = os.path.join(REPO_ROOT, "backend")
+SCENARIOS = ("vitals_list", "login")
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def request(connection, scenario: str, token: str, login_body: str):
+    if scenario == "vitals_list":
+        connection.request("GET", "/api/v1/health/vitals",
+                           headers={"Authorization": f"Bearer {token}", "Accept-Encoding": "br, gzip"})
+    else:
+        connection.request("POST", "/api/v1/auth/token", body=login_body,
+                           headers={"Content-Type": "application/x-www-form-urlencoded"})
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def client(job) -> list:
+    """Latencies (ms) of the successful requests one client made until the deadline."""
+    port, scenario, token, login_body, deadline = job
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    latencies = []
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            status = request(connection, scenario, token, login_body)
+        except (ConnectionError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            continue
+        if status == 200:
+            latencies.append((time.perf_counter() - started) * 1000)
+    connection.close()
+    return latencies
+
+
+def start_server(workers: int, port: int, env: dict) -> subprocess.Popen:
+    env = dict(env, WEB_CONCURRENCY=str(workers), PORT=str(port))
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"], cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            connection.request("GET", "/api/v1/health")
+            if connection.getresponse().status == 200:
+                connection.close()
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"gunicorn with {workers} workers did not come up on port {port}")
+
+
+def stop_server(server: subprocess.Popen):
+    server.terminate()  # SIGTERM: the graceful drain
+    try:
+        server.wait(timeout=90)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def login(port: int, login_body: str) -> str:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    connection.request("POST", "/api/v1/auth/token", body=login_body,
+                       headers={"Content-Type": "application/x-www-form-urlencoded"})
+    token = json.loads(connection.getresponse().read())["access_token"]
+    connection.close()
+    return token
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput scaling across gunicorn workers")
+    parser.add_argument("--max-workers", type=int, default=available_cores())
+    parser.add_argument("--clients", type=int, default=max(4, 2 * available_cores()))
+    parser.add_argument("--seconds", type=float, default=10.0, help="Per scenario and worker count")
+    parser.add_argument("--vitals", type=int, default=2000, help="Readings of the benchmark user")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir.name, 'scaling.db')}"
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    from .. import migrate
+    from .. import seed as synthetic
+
+    migrate.upgrade()
+    synthetic.seed(os.environ["DATABASE_URL"], 1, workers=1, vitals_per_user=args.vitals,
+                   reports_per_user=0, medicines_per_user=0)
+    login_body = urlencode({"username": synthetic.user_email(0), "password": synthetic.SEED_PASSWORD})
+    env = dict(os.environ, RATE_LIMIT_ENABLED="false", PYTHONPATH=REPO_ROOT)
+
+    counts = sorted({1, args.max_workers} | {n for n in (2, 4, 8, 16, 32) if n < args.max_workers})
+    results = {"cores": available_cores(), "clients": args.clients, "seconds": args.seconds, "runs": {}}
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(args.clients) as pool:
+        for workers in counts:
+            port = free_port()
+            server = start_server(workers, port, env)
+            try:
+                token = login(port, login_body)
+                for scenario in scenarios:
+                    deadline = time.time() + args.seconds
+                    jobs = [(port, scenario, token, login_body, deadline)] * args.clients
+                    latencies = [ms for part in pool.map(client, jobs) for ms in part]
+                    run = {
+                        "requests_per_s": round(len(latencies) / args.seconds, 1),
+                        "p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+                        "p95_ms": round(percentile(latencies, 95), 1) if latencies else None,
+                    }
+                    results["runs"].setdefault(scenario, {})[workers] = run
+                    print(f"{scenario:12} workers={workers:<3} {run['requests_per_s']:>8} req/s  "
+                          f"p50 {run['p50_ms']} ms  p95 {run['p95_ms']} ms", flush=True)
+            finally:
+                stop_server(server)
+
+    for scenario, runs in results["runs"].items():
+        single = runs[1]["requests_per_s"] or 1
+        for workers, run in runs.items():
+            run["speedup"] = round(run["requests_per_s"] / single, 2)
+
+    print(json.dumps(results, indent=2))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
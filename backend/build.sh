@@ -3,4 +3,7 @@
 
 pip install -r requirements.txt
 
+# Release step: apply schema migrations once, before any worker starts
+(cd .. && python -m backend.migrate)
+
 echo "Build completed successfully!"
@@ -0,0 +1,130 @@
+"""
+Caches used by services that memoize expensive lookups.
+
+TTLCache lives in one process. get_shared_cache() returns the cache for
+results that every worker should see, such as AI recommendations: Redis when
+CACHE_REDIS_URL is set (requires the redis package), otherwise a TTLCache
+per process. Callers key entries on the data they were computed from, so a
+per-process cache is never stale, only less often hit. Redis errors count as
+misses, so an outage only costs recomputation.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+import orjson
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a fixed time-to-live.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def keys(self) -> list:
+        """Return the keys of all live (non-expired) entries."""
+        now = time.monotonic()
+        with self._lock:
+            return [k for k, (expires_at, _) in self._data.items() if expires_at >= now]
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+
+class MemorySharedCache:
+    """The shared cache interface over a TTLCache, for a single worker."""
+
+    def __init__(self, max_entries: int = 10000):
+        self._cache = TTLCache(ttl_seconds=300, max_entries=max_entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        self._cache.set(key, value, ttl_seconds)
+
+    def delete(self, key: str):
+        self._cache.delete(key)
+
+
+class RedisSharedCache:
+    """Entries shared by all workers, stored as JSON."""
+
+    def __init__(self, url: str, prefix: str = "arodoc:cache:"):
+        import redis
+
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self._redis.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable, treating {key} as a miss: {e}")
+            return None
+        return None if raw is None else orjson.loads(raw)
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        try:
+            self._redis.set(self.prefix + key, orjson.dumps(value), px=int(ttl_seconds * 1000))
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable, not storing {key}: {e}")
+
+    def delete(self, key: str):
+        try:
+            self._redis.delete(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable, could not delete {key}: {e}")
+
+
+_shared_cache = None
+
+
+def get_shared_cache():
+    global _shared_cache
+    if _shared_cache is None:
+        if settings.CACHE_REDIS_URL:
+            _shared_cache = RedisSharedCache(settings.CACHE_REDIS_URL)
+        else:
+            _shared_cache = MemorySharedCache()
+    return _shared_cache
@@ -0,0 +1,132 @@
+"""
+Negotiated response compression.
+
+Extends Starlette's GZipMiddleware with brotli, preferred whenever the client
+accepts it and the brotli package (or brotlicffi) is installed; otherwise
+gzip, otherwise identity. Bodies below the size threshold, already-encoded
+bodies, partial (206) responses and media that is compressed already
+(images, PDFs, archives) pass through untouched. Streaming responses are
+compressed chunk by chunk, and large chunks are compressed off the event loop.
+
+A strong ETag on a body compressed here gets the coding appended ("abc" ->
+"abc-br"), since each content-coding is a different representation and
+must not share a strong validator with the others (RFC 9110, 8.8.3).
+strip_coding() undoes it when comparing If-None-Match (see http_cache.py).
+"""
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import (
+    DEFAULT_EXCLUDED_CONTENT_TYPES,
+    GZipMiddleware,
+    GZipResponder,
+    IdentityResponder,
+    _get_gzip_capacity_limiter,
+)
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # optional; gzip only
+        brotli = None
+
+EXCLUDED_CONTENT_TYPES = DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/pdf",)
+CODINGS = ("br", "gzip")
+
+
+def coded_etag(etag: str, coding: str) -> str:
+    """The strong ETag of the coding's representation; weak tags stay as they are."""
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{coding}"'
+
+
+def strip_coding(etag: str) -> str:
+    """The ETag of the identity representation behind a coded one."""
+    for coding in CODINGS:
+        suffix = f'-{coding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Codings the client accepts, honouring q=0."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        try:
+            q = float(params.strip().removeprefix("q=")) if params else 1.0
+        except ValueError:
+            q = 1.0
+        if coding.strip() and q > 0:
+            accepted.add(coding.strip())
+    return accepted
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int = 4, *, thread_minimum_size: int = 128 * 1024,
+                 exclude_content_types=EXCLUDED_CONTENT_TYPES):
+        super().__init__(app, minimum_size, exclude_content_types=exclude_content_types)
+        self.quality = quality
+        self.thread_minimum_size = thread_minimum_size
+        self._compressor = None
+
+    @property
+    def compressor(self):
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        return self._compressor
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if len(body) >= self.thread_minimum_size:
+            return await anyio.to_thread.run_sync(
+                self._compress_body, body, more_body, limiter=_get_gzip_capacity_limiter()
+            )
+        return self._compress_body(body, more_body)
+
+    def _compress_body(self, body: bytes, more_body: bool) -> bytes:
+        if more_body:
+            return self.compressor.process(body) + self.compressor.flush()
+        return self.compressor.process(body) + self.compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=gzip_level,
+                         exclude_content_types=EXCLUDED_CONTENT_TYPES)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            responder = BrotliResponder(
+                self.app, self.minimum_size, self.brotli_quality,
+                thread_minimum_size=self.thread_minimum_size, exclude_content_types=self.exclude_content_types,
+            )
+        elif "gzip" in accepted:
+            responder = GZipResponder(
+                self.app, self.minimum_size, self.compresslevel,
+                thread_minimum_size=self.thread_minimum_size, exclude_content_types=self.exclude_content_types,
+            )
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size, exclude_content_types=self.exclude_content_types)
+
+        async def send_with_coded_etag(message):
+            # Only bodies this middleware encoded; an app that set Content-Encoding itself owns its ETag
+            if message["type"] == "http.response.start" and not responder.content_encoding_set:
+                headers = MutableHeaders(raw=message["headers"])
+                coding = headers.get("content-encoding")
+                if coding in CODINGS and "etag" in headers:
+                    headers["ETag"] = coded_etag(headers["etag"], coding)
+            await send(message)
+
+        await responder(scope, receive, send_with_coded_etag)
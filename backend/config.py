@@ -12,13 +12,92 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "dev-secret-key-change-in-production"
     GEMINI_API_KEY: Optional[str] = None
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15 # Stateless; renewed through /auth/refresh
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+
+    # Password Hashing (argon2id; changing these rehashes users on their next login, see README)
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST_KIB: int = 65536 # 64 MiB
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 2 # Dedicated threads, separate from the API threadpool
+    PASSWORD_HASH_MAX_PENDING: int = 64 # Beyond this, sign-ins get 503 + Retry-After instead of queueing
+
+    # Database Engine / Connection Pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0 # Max wait for a pooled connection
+    DB_POOL_RECYCLE_SECONDS: int = 1800 # Reconnect before server/proxy idle timeouts
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000 # 0 disables
+    DB_PGBOUNCER: bool = False # Let PgBouncer (transaction pooling) own the pool
+    DB_SQLITE_WAL: bool = True
+    DB_SQLITE_BUSY_TIMEOUT_MS: int = 30000 # How long a SQLite write waits for another writer's lock
     
     # Twilio SMS Configuration (Optional)
     TWILIO_ACCOUNT_SID: Optional[str] = None
     TWILIO_AUTH_TOKEN: Optional[str] = None
     TWILIO_PHONE_NUMBER: Optional[str] = None
 
+    # Medicine Price Index
+    PRICE_FETCHER: str = "mock" # Vendor quote source, see services/price_index.py
+    PRICE_REFRESH_INTERVAL_SECONDS: int = 900
+    PRICE_CACHE_TTL_SECONDS: int = 1800
+    PRICE_FETCH_TIMEOUT_SECONDS: float = 5.0
+    PRICE_REFRESH_CONCURRENCY: int = 16
+
+    # Drug Catalog (paths relative to the backend folder)
+    DRUG_CATALOG_PATH: str = "data/drug_catalog.json"
+    DRUG_INDEX_PATH: str = "data/drug_index.pkl"
+    INTERACTIONS_PATH: str = "data/drug_interactions.json"
+    INTERACTION_CACHE_SIZE: int = 10000
+
+    # Facility Directory
+    FACILITY_GRID_CELL_DEG: float = 0.25
+    SOS_NEAREST_HOSPITALS: int = 3
+    SOS_HOSPITAL_RADIUS_KM: float = 50.0
+
+    # Rate Limiting for the LLM-backed routes (see rate_limit.py)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_USER: str = "10/minute" # Per user and route, unless the route sets its own
+    RATE_LIMIT_ROUTE: str = "300/minute" # Per route across all users; keeps us inside the model quota
+    RATE_LIMIT_REDIS_URL: Optional[str] = None # Share buckets across workers; in-process when unset
+    LLM_DAILY_TOKEN_BUDGET: int = 200000 # Per user per UTC day; 0 disables
+
+    # Shared Cache (see cache.py); may be the same Redis as RATE_LIMIT_REDIS_URL
+    CACHE_REDIS_URL: Optional[str] = None # One cache for all workers; per process when unset
+    RECOMMENDATIONS_CACHE_SECONDS: int = 21600 # AI recommendations are also keyed on the user's data versions
+
+    # Response Compression (brotli when the package is installed, else gzip)
+    COMPRESSION_MIN_BYTES: int = 1024 # Smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4 # 0-11; higher is much slower for little gain on JSON
+
+    # Report Files (see services/report_files.py)
+    REPORT_URL_TTL_SECONDS: int = 900 # Signed file links stay valid for one to two of these
+    REPORT_FILES_ACCEL_REDIRECT: Optional[str] = None # e.g. "/_report_files/": nginx internal location aliased to backend/uploads
+    REPORT_THUMBNAIL_PX: int = 320 # Longest side of upload previews (services/thumbnails.py)
+    REPORT_THUMBNAIL_QUALITY: int = 70 # WebP quality
+    REPORT_THUMBNAIL_WORKERS: int = 2 # Rendering processes per API worker; 0 disables previews
+
+    # Export (see services/export.py)
+    EXPORT_BATCH_ROWS: int = 2000 # Rows fetched per cursor round trip and sent per chunk
+
+    # Vitals Archive (see services/vitals_archive.py)
+    ARCHIVE_AFTER_DAYS: int = 90 # Whole months older than this move to the columnar archive
+
+    # Vitals Import (see services/vitals_import.py)
+    IMPORT_MAX_BYTES: int = 256 * 1024 * 1024
+    IMPORT_BATCH_ROWS: int = 5000 # Rows per insert and commit; progress is reported per batch
+    IMPORT_MAX_ERRORS: int = 100 # Rejected-row reasons kept on the job
+    IMPORT_WORKERS: int = 1 # Parsing processes per API worker
+    IMPORT_STALE_SECONDS: int = 15 * 60 # A queued or running job without progress for this long is failed (its worker died with its process)
+
+    # Observability
+    METRICS_ENABLED: bool = True # Request/DB/LLM metrics, scraped from /metrics
+    QUERY_BUDGET_MODE: str = "off" # off | log (staging) | raise (tests), see query_budget.py
+    SLOW_QUERY_MS: float = 0 # Log statements slower than this; 0 disables
+    SLOW_QUERY_EXPLAIN: bool = True # Include the EXPLAIN plan with slow queries
+
     class Config:
         env_file = str(BASE_DIR / ".env")
         env_file_encoding = 'utf-8'
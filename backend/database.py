@@ -1,19 +1,118 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 from .config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-connect_args = {"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
+# Async drivers used for the AsyncSession path, keyed by backend name
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+
+def async_database_url(url: str) -> str:
+    """Same database, async driver: sqlite:// -> sqlite+aiosqlite://, postgresql:// -> postgresql+asyncpg://"""
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    parsed = parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    if backend == "postgresql" and "sslmode" in parsed.query:
+        # asyncpg spells libpq's sslmode as ssl
+        query = dict(parsed.query)
+        query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+
+def engine_options(url: str, config=settings) -> dict:
+    """
+    create_engine() keyword arguments for the configured pool profile.
+    File databases get explicit pool sizing; PostgreSQL behind PgBouncer gets no
+    client-side pool at all, since PgBouncer does the pooling.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    options = {"pool_pre_ping": config.DB_POOL_PRE_PING}
+    pool_sizing = dict(
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=config.DB_POOL_RECYCLE_SECONDS,
+    )
+
+    if backend == "sqlite":
+        # aiosqlite passes these straight through to sqlite3.connect()
+        options["connect_args"] = {
+            "check_same_thread": False,
+            # sqlite3's busy timeout, in seconds
+            "timeout": config.DB_SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+        if parsed.database not in (None, "", ":memory:"):
+            options.update(pool_sizing)
+    elif config.DB_PGBOUNCER:
+        # PgBouncer multiplexes server connections; a second pool here would only pin them
+        options["poolclass"] = NullPool
+    else:
+        options.update(pool_sizing)
+        if backend == "postgresql" and config.DB_STATEMENT_TIMEOUT_MS:
+            if parsed.get_driver_name() == "asyncpg":
+                options["connect_args"] = {"server_settings": {"statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS)}}
+            else:
+                options["connect_args"] = {"options": f"-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}"}
+
+    if backend == "postgresql" and config.DB_PGBOUNCER and parsed.get_driver_name() == "asyncpg":
+        # Prepared statements don't survive transaction pooling
+        options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    return options
+
+
+def configure_engine(engine, config=settings):
+    """Attach per-connection settings that cannot be passed through create_engine()."""
+    if isinstance(engine, AsyncEngine):
+        configure_engine(engine.sync_engine, config)
+        return engine
+
+    backend = engine.dialect.name
+    database = engine.url.database or ""
+
+    if backend == "sqlite" and config.DB_SQLITE_WAL and database not in ("", ":memory:"):
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+    if backend == "postgresql" and config.DB_PGBOUNCER and config.DB_STATEMENT_TIMEOUT_MS:
+        # Transaction pooling rejects startup options and shares sessions, so scope it per transaction
+        @event.listens_for(engine, "begin")
+        def set_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(config.DB_STATEMENT_TIMEOUT_MS)}")
+
+    return engine
+
+
+engine = configure_engine(create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL)))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Async path for I/O-bound routes: waiting on the DB doesn't hold a threadpool slot
+ASYNC_DATABASE_URL = async_database_url(SQLALCHEMY_DATABASE_URL)
+async_engine = configure_engine(create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL)))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,50 @@
+"""
+Statement timing shared by the request metrics (metrics.py) and the query
+budgets (query_budget.py).
+
+One before/after_cursor_execute pair on every engine (async engines through
+their sync_engine) times each statement and hands it to the subscribed
+observers, so running both features does not time every statement twice.
+"""
+
+import threading
+import time
+from typing import Callable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# observer(conn, statement, parameters, executemany, elapsed_seconds)
+Observer = Callable[..., None]
+
+_observers: Tuple[Observer, ...] = ()
+_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    for observer in _observers:
+        observer(conn, statement, parameters, executemany, elapsed)
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def observe_queries(observer: Observer):
+    """Call observer after every statement on any engine; idempotent per observer."""
+    global _observers
+    with _lock:
+        if observer not in _observers:
+            _observers = _observers + (observer,)
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(Engine, "handle_error", _handle_error)
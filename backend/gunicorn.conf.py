@@ -0,0 +1,83 @@
+"""
+Production server profile: gunicorn managing uvicorn workers.
+
+    cd backend && gunicorn -c gunicorn.conf.py
+
+One worker per core available to the process (WEB_CONCURRENCY overrides), so
+argon2, JSON encoding and image work are no longer confined to one core. Each
+worker has its own database pool, so the database sees up to
+workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+
+The app is imported once in the master (preload_app) and the read-only
+indexes are built there too, so workers fork with them in place. Connections
+the master opened are dropped in every child, never shared.
+
+SIGTERM drains: workers stop accepting and finish in-flight requests for up
+to GRACEFUL_TIMEOUT seconds (see workers.py).
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS
+        return os.cpu_count() or 1
+
+
+wsgi_app = "backend.main:app"
+chdir = str(BACKEND_DIR.parent)  # Paths such as backend/uploads are relative to the repository root
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY") or available_cores())
+worker_class = "backend.workers.UvicornWorker"
+preload_app = True
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "60"))  # Longer than an LLM call
+timeout = 120  # A worker silent for this long is restarted
+keepalive = 5
+accesslog = "-"
+
+# Metrics from every worker, summed on /metrics (see metrics.py). Must be set
+# before prometheus_client is imported, which preloading does next.
+if workers > 1 and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="arodoc-metrics-")
+
+
+def on_starting(server):
+    # Samples left by a previous run would be added to this one's
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir and os.path.isdir(metrics_dir):
+        for name in os.listdir(metrics_dir):
+            os.remove(os.path.join(metrics_dir, name))
+
+
+def when_ready(server):
+    from backend.main import warm_shared_state
+
+    warm_shared_state()
+
+
+def post_fork(server, worker):
+    from backend import database
+
+    # Leave the parent's pooled connections, if any, to the parent
+    database.engine.dispose(close=False)
+    database.async_engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+    if os.path.basename(metrics_dir).startswith("arodoc-metrics-"):
+        shutil.rmtree(metrics_dir, ignore_errors=True)
@@ -0,0 +1,132 @@
+"""
+Conditional GETs for the read-mostly, per-user endpoints.
+
+Every write to a cached resource bumps a per-user counter in
+resource_versions, in the same transaction as the write itself. Reads declare
+their resource with the ResourceETag dependency, which looks the counter up
+before the route runs and derives a strong ETag from it. If the client's
+If-None-Match matches, the request ends there with 304 and the route's own
+query and serialization never run. Compressed responses carry the tag with
+the coding appended (compression.py), which matches the same version.
+
+The version is read before the data, so a write racing with a read can only
+pair newer data with an older ETag, which costs the client one extra full
+response and never serves it stale data.
+
+    @router.get("/vitals", dependencies=[Depends(ResourceETag(VITALS))])
+
+    bump(db, current_user.id, VITALS)   # before db.commit()
+"""
+
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import database, models
+from .auth import Principal, get_current_principal
+from .compression import strip_coding
+
+PROFILE = "profile"
+VITALS = "vitals"
+REPORTS = "reports"
+CONTACTS = "contacts"
+MEDICINES = "medicines"
+
+# Change when the shape of a cached response changes, so clients refetch after a deploy
+SCHEMA_VERSION = 1
+
+_INSERT = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def _bump_statement(dialect: str, user_id: str, resources):
+    table = models.ResourceVersion.__table__
+    stmt = _INSERT[dialect](table).values([
+        {"user_id": user_id, "resource": resource, "version": 1} for resource in resources
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.resource],
+        set_={"version": table.c.version + 1},
+    )
+
+
+def bump(db: Session, user_id: str, *resources: str):
+    """Invalidate the user's cached copies of resources; call before committing the write."""
+    db.execute(_bump_statement(db.get_bind().dialect.name, user_id, resources))
+
+
+async def bump_async(db: AsyncSession, user_id: str, *resources: str):
+    await db.execute(_bump_statement(db.get_bind().dialect.name, user_id, resources))
+
+
+async def current_version(db: AsyncSession, user_id: str, resource: str) -> int:
+    result = await db.execute(
+        select(models.ResourceVersion.version).where(
+            models.ResourceVersion.user_id == user_id,
+            models.ResourceVersion.resource == resource,
+        )
+    )
+    return result.scalar() or 0
+
+
+def current_versions(db: Session, user_id: str, resources) -> Dict[str, int]:
+    """The user's versions of several resources in one query, 0 for never-written ones."""
+    rows = db.execute(
+        select(models.ResourceVersion.resource, models.ResourceVersion.version).where(
+            models.ResourceVersion.user_id == user_id,
+            models.ResourceVersion.resource.in_(resources),
+        )
+    ).all()
+    versions = dict.fromkeys(resources, 0)
+    versions.update(rows)
+    return versions
+
+
+def make_etag(user_id: str, resource: str, version: int) -> str:
+    # The user id is part of the tag: a browser shared by two accounts must not match across them
+    digest = hashlib.blake2b(f"{user_id}:{resource}:{version}:{SCHEMA_VERSION}".encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """
+    The tag in If-None-Match that names the current version, if any. The
+    comparison is weak, so a W/ prefix added by a proxy still matches, and so
+    does the tag of a compressed representation of the same version.
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if strip_coding(tag) == etag:
+            return tag
+    return None
+
+
+class ResourceETag:
+    """Route dependency answering 304 when the client already holds the current version."""
+
+    def __init__(self, resource: str):
+        self.resource = resource
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        principal: Principal = Depends(get_current_principal),
+        db: AsyncSession = Depends(database.get_async_db),
+    ):
+        etag = make_etag(principal.id, self.resource, await current_version(db, principal.id, self.resource))
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+        matched = matching_etag(request.headers.get("if-none-match"), etag)
+        if matched is not None:
+            # The 304 names the representation the client holds, coded or not
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={**headers, "ETag": matched})
+        response.headers.update(headers)
@@ -1,14 +1,52 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from .routers import auth, health, analysis, emergency, assistant, medicines
-from . import models, database
-import os
+from contextlib import asynccontextmanager
+from .routers import auth, health, analysis, emergency, assistant, medicines, export
+from . import database
+from .compression import CompressionMiddleware
+from .metrics import MetricsMiddleware, instrument_engines, metrics_endpoint
+from .query_budget import install_query_budgets
+from .config import settings
+from .services.price_index import price_index
+from .services.drug_search import get_drug_index
+from .services.interactions import get_interaction_graph
+from .services.facility_index import build_facility_index
+from .services import thumbnails, vitals_import
+import asyncio
 
-# Create Tables
-models.Base.metadata.create_all(bind=database.engine)
+# The schema is managed by migrations (python -m backend.migrate), run as a
+# release step; workers start without creating or checking tables.
 
-app = FastAPI(title="Arodoc AI API", version="1.0.0")
+def warm_shared_state():
+    """
+    Build the read-only indexes that need no database. Under gunicorn with
+    preload_app (gunicorn.conf.py) the master calls this once and every worker
+    inherits the result; otherwise the lifespan below builds them.
+    """
+    get_drug_index()
+    get_interaction_graph()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_shared_state()
+    db = database.SessionLocal()
+    try:
+        price_index.load_vendors(db)
+        build_facility_index(db, settings.FACILITY_GRID_CELL_DEG)
+        # Imports whose worker died with a previous process
+        db.execute(vitals_import.fail_stale())
+        db.commit()
+    finally:
+        db.close()
+    price_refresher = asyncio.create_task(
+        price_index.run_refresher(settings.PRICE_REFRESH_INTERVAL_SECONDS)
+    )
+    yield
+    price_refresher.cancel()
+    thumbnails.shutdown()
+    vitals_import.shutdown()
+
+app = FastAPI(title="Arodoc AI API", version="1.0.0", lifespan=lifespan)
 
 # CORS Middleware
 origins = [
@@ -26,9 +64,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for uploaded reports
-os.makedirs("backend/uploads", exist_ok=True)
-app.mount("/uploads", StaticFiles(directory="backend/uploads"), name="uploads")
+if settings.METRICS_ENABLED:
+    instrument_engines()
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+
+install_query_budgets(app)
+
+# Outermost, so the metrics above record uncompressed response sizes
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# Uploaded report files are served through signed URLs, see routers/analysis.py
 
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(health.router, prefix="/api/v1")
@@ -36,6 +87,7 @@ app.include_router(analysis.router, prefix="/api/v1")
 app.include_router(emergency.router, prefix="/api/v1")
 app.include_router(assistant.router, prefix="/api/v1")
 app.include_router(medicines.router, prefix="/api/v1")
+app.include_router(export.router, prefix="/api/v1")
 
 @app.get("/")
 def read_root():
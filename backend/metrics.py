@@ -0,0 +1,160 @@
+"""
+Request-level performance metrics, exposed in Prometheus format on /metrics.
+
+MetricsMiddleware times every request and records its size against the route
+template (e.g. /api/v1/medicines/{medicine_id}/status), so label cardinality
+stays bounded. Statement timings (db_timing.py) add the number of queries and the time
+spent in the database to the request being served, which is tracked in a
+context variable; this works for sync routes (run in the threadpool with a
+copy of the context) and AsyncSession routes alike. The LLM provider layer
+reports call duration and token usage through observe_llm_call.
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from starlette.responses import Response
+
+from .db_timing import observe_queries
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to serve a request",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being served", ["method"],
+    multiprocess_mode="livesum",
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size", ["method", "route"], buckets=SIZE_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries issued while serving a request",
+    ["method", "route"], buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in the database while serving a request",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Duration of individual database statements",
+    ["dialect"], buckets=LATENCY_BUCKETS,
+)
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds", "Duration of LLM provider calls",
+    ["model", "operation", "outcome"], buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Tokens consumed by LLM calls", ["model", "kind"],
+)
+
+RATE_LIMITED = Counter(
+    "http_rate_limited_total", "Requests refused by the rate limiter", ["scope", "reason"],
+)
+
+
+class RequestStats:
+    __slots__ = ("db_queries", "db_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being served in this context, if any."""
+    return _request_stats.get()
+
+
+# --- Database ---------------------------------------------------------------
+
+def _observe_query(conn, statement, parameters, executemany, elapsed):
+    DB_QUERY_LATENCY.labels(conn.dialect.name).observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+def instrument_engines():
+    """Count and time the statements of every engine (sync, and async via its sync_engine)."""
+    observe_queries(_observe_query)
+
+
+# --- LLM --------------------------------------------------------------------
+
+def observe_llm_call(model: str, operation: str, seconds: float, response=None, error: bool = False):
+    LLM_LATENCY.labels(model, operation, "error" if error else "ok").observe(seconds)
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        LLM_TOKENS.labels(model, "prompt").inc(getattr(usage, "prompt_token_count", 0) or 0)
+        LLM_TOKENS.labels(model, "completion").inc(getattr(usage, "candidates_token_count", 0) or 0)
+
+
+# --- HTTP -------------------------------------------------------------------
+
+def route_label(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses pass through untouched."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            _request_stats.reset(token)
+            route = route_label(scope)
+            REQUEST_LATENCY.labels(method, route, str(status)).observe(elapsed)
+            RESPONSE_SIZE.labels(method, route).observe(size)
+            REQUEST_DB_QUERIES.labels(method, route).observe(stats.db_queries)
+            REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+
+
+def metrics_endpoint() -> Response:
+    # Under several workers (gunicorn.conf.py) each writes its samples to
+    # PROMETHEUS_MULTIPROC_DIR, and any one of them can report the sum
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,68 @@
+"""
+Applies database migrations (Alembic, see migrations/).
+
+Run this as a release step before starting or scaling out workers; the app
+itself never creates or checks the schema at startup:
+    python -m backend.migrate                       # upgrade to the latest revision
+    python -m backend.migrate downgrade <revision>  # step back to an older revision
+"""
+
+import logging
+import sys
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parent / "alembic.ini"
+
+# Revision that matches databases created by the old create_all() at import time
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(database_url: Optional[str] = None) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["database_url"] = database_url or settings.DATABASE_URL
+    # Keep the host process's logging setup when migrations run in-process
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def adopt_unversioned_database(config: Config):
+    """Stamp databases built by create_all() with the baseline so upgrades start from there."""
+    engine = create_engine(config.attributes["database_url"])
+    try:
+        tables = set(inspect(engine).get_table_names())
+    finally:
+        engine.dispose()
+    if "users" in tables and "alembic_version" not in tables:
+        logger.warning(f"Existing schema without migration history; stamping revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+
+
+def upgrade(revision: str = "head", database_url: Optional[str] = None):
+    config = alembic_config(database_url)
+    adopt_unversioned_database(config)
+    command.upgrade(config, revision)
+
+
+def downgrade(revision: str, database_url: Optional[str] = None):
+    command.downgrade(alembic_config(database_url), revision)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    action = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if action == "upgrade":
+        upgrade(sys.argv[2] if len(sys.argv) > 2 else "head")
+    elif action == "downgrade" and len(sys.argv) > 2:
+        downgrade(sys.argv[2])
+    else:
+        print("Usage: python -m backend.migrate [upgrade [revision] | downgrade <revision>]")
+        sys.exit(1)
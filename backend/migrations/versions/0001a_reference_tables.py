@@ -0,0 +1,60 @@
+"""reference tables
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-19 11:18:00.000000
+
+Vendor catalog and facility directory, which the baseline schema never had.
+Databases created by create_all() after those models were added, and ones
+built by an earlier version of revision 0001, already have them; those are
+left as they are.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001a'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'facilities' not in existing:
+        op.create_table('facilities',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.Column('specialty', sa.String(), nullable=True),
+        sa.Column('rating', sa.Float(), nullable=True),
+        sa.Column('address', sa.String(), nullable=True),
+        sa.Column('city', sa.String(), nullable=True),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('lat', sa.Float(), nullable=True),
+        sa.Column('lng', sa.Float(), nullable=True),
+        sa.Column('has_emergency', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_facilities_city'), 'facilities', ['city'], unique=False)
+        op.create_index(op.f('ix_facilities_name'), 'facilities', ['name'], unique=False)
+    if 'vendors' not in existing:
+        op.create_table('vendors',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('logo', sa.String(), nullable=True),
+        sa.Column('reliability', sa.String(), nullable=True),
+        sa.Column('search_url', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+        )
+
+
+def downgrade():
+    op.drop_table('vendors')
+    op.drop_index(op.f('ix_facilities_name'), table_name='facilities')
+    op.drop_index(op.f('ix_facilities_city'), table_name='facilities')
+    op.drop_table('facilities')
@@ -0,0 +1,70 @@
+"""seed reference data
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-19 11:20:00.000000
+
+Vendor catalog and facility directory rows that were previously seeded by
+the app at startup.
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001a'
+branch_labels = None
+depends_on = None
+
+VENDORS = [
+    {"name": "Apollo Pharmacy", "logo": "apollo", "reliability": "High",
+     "search_url": "https://www.apollopharmacy.com/search?q={query}"},
+    {"name": "1mg", "logo": "1mg", "reliability": "High",
+     "search_url": "https://www.1mg.com/search?q={query}"},
+    {"name": "Pharmeasy", "logo": "pharmeasy", "reliability": "Medium",
+     "search_url": "https://www.pharmeasy.com/search?q={query}"},
+    {"name": "Netmeds", "logo": "netmeds", "reliability": "Medium",
+     "search_url": "https://www.netmeds.com/search?q={query}"},
+]
+
+FACILITIES = [
+    {"name": "City General Hospital", "type": "Hospital", "specialty": "General", "rating": 4.5, "address": "123 Healthcare Ave", "city": "New York", "lat": 40.7411, "lng": -73.9897, "has_emergency": True},
+    {"name": "Heart Care Institute", "type": "Specialty Center", "specialty": "Cardiology", "rating": 4.8, "address": "45 Cardia Lane", "city": "Los Angeles", "lat": 34.0522, "lng": -118.2437, "has_emergency": True},
+    {"name": "Diabetes & Metabolism Clinic", "type": "Clinic", "specialty": "Endocrinology", "rating": 4.6, "address": "78 Sugar St", "city": "Chicago", "lat": 41.8781, "lng": -87.6298, "has_emergency": False},
+    {"name": "Dr. Smith's Family Practice", "type": "Private Clinic", "specialty": "General Physician", "rating": 4.9, "address": "90 Wellness Blvd", "city": "New York", "lat": 40.7580, "lng": -73.9855, "has_emergency": False},
+    {"name": "Central Diagnostic Lab", "type": "Diagnostic", "specialty": "Pathology", "rating": 4.2, "address": "12 Test Rd", "city": "Houston", "lat": 29.7604, "lng": -95.3698, "has_emergency": False},
+    {"name": "Mumbai City Hospital", "type": "Hospital", "specialty": "General", "rating": 4.7, "address": "Marine Drive", "city": "Mumbai", "lat": 18.9438, "lng": 72.8231, "has_emergency": True},
+    {"name": "Delhi Heart Center", "type": "Specialty Center", "specialty": "Cardiology", "rating": 4.5, "address": "Connaught Place", "city": "Delhi", "lat": 28.6315, "lng": 77.2167, "has_emergency": True},
+    {"name": "Bangalore Wellness Clinic", "type": "Clinic", "specialty": "General", "rating": 4.6, "address": "Indiranagar", "city": "Bangalore", "lat": 12.9784, "lng": 77.6408, "has_emergency": False},
+]
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    vendors = sa.table('vendors',
+        sa.column('id', sa.String), sa.column('name', sa.String), sa.column('logo', sa.String),
+        sa.column('reliability', sa.String), sa.column('search_url', sa.String),
+        sa.column('is_active', sa.Boolean))
+    existing = {name for (name,) in conn.execute(sa.select(vendors.c.name))}
+    rows = [{"id": str(uuid.uuid4()), "is_active": True, **v} for v in VENDORS if v["name"] not in existing]
+    if rows:
+        op.bulk_insert(vendors, rows)
+
+    facilities = sa.table('facilities',
+        sa.column('id', sa.String), sa.column('name', sa.String), sa.column('type', sa.String),
+        sa.column('specialty', sa.String), sa.column('rating', sa.Float), sa.column('address', sa.String),
+        sa.column('city', sa.String), sa.column('lat', sa.Float), sa.column('lng', sa.Float),
+        sa.column('has_emergency', sa.Boolean))
+    if conn.execute(sa.select(sa.func.count()).select_from(facilities)).scalar() == 0:
+        op.bulk_insert(facilities, [{"id": str(uuid.uuid4()), **f} for f in FACILITIES])
+
+
+def downgrade():
+    vendors = sa.table('vendors', sa.column('name', sa.String))
+    op.execute(vendors.delete().where(vendors.c.name.in_([v["name"] for v in VENDORS])))
+    facilities = sa.table('facilities', sa.column('name', sa.String))
+    op.execute(facilities.delete().where(facilities.c.name.in_([f["name"] for f in FACILITIES])))
@@ -0,0 +1,31 @@
+"""resource versions
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 14:05:00.000000
+
+Per-user version counters behind the ETags of the read-mostly endpoints.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resource_versions',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('resource', sa.String(length=16), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'resource')
+    )
+
+
+def downgrade():
+    op.drop_table('resource_versions')
@@ -0,0 +1,27 @@
+"""report file name
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 16:20:00.000000
+
+Uploads are now stored content-addressed, so the original file name is kept
+in its own column.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('reports', sa.Column('file_name', sa.String(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.drop_column('file_name')
@@ -0,0 +1,27 @@
+"""report thumbnail url
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 18:05:00.000000
+
+Uploads get a WebP preview rendered in the background; the column is set once
+it exists.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('reports', sa.Column('thumbnail_url', sa.String(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.drop_column('thumbnail_url')
@@ -0,0 +1,34 @@
+"""vitals archive
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 21:10:00.000000
+
+Catalog of archived vitals months, each a packed columnar blob.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('vitals_archive',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('first_recorded_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_recorded_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'month')
+    )
+
+
+def downgrade():
+    op.drop_table('vitals_archive')
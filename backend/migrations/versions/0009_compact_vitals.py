@@ -0,0 +1,133 @@
+"""compact vitals
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 22:30:00.000000
+
+Vitals get an integer row key, their public UUID stored as 16 bytes (native
+uuid on PostgreSQL), a small-int category and a unit that is NULL when it is
+the category's standard one, plus an index on (user_id, category,
+recorded_at) for the dashboard and the per-user series. The ids the API
+returns do not change.
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+# As in models.VITAL_CATEGORIES / CATEGORY_UNITS at the time of this revision
+CATEGORIES = {"BP": 1, "HR": 2, "SpO2": 3, "Glucose": 4, "Temp": 5, "Weight": 6}
+UNITS = {"BP": "mmHg", "HR": "bpm", "SpO2": "%", "Glucose": "mg/dL", "Temp": "°F", "Weight": "kg"}
+NAMES = {code: name for name, code in CATEGORIES.items()}
+BATCH_ROWS = 10000
+
+VALUE_COLUMNS = ('user_id', 'value_primary', 'value_secondary', 'notes', 'recorded_at')
+
+
+def _uuid_type():
+    return postgresql.UUID(as_uuid=False) if op.get_bind().dialect.name == 'postgresql' else sa.LargeBinary(16)
+
+
+def _value_columns():
+    """Columns copied as they are, typed so DateTime binds on SQLite."""
+    types = (sa.String(), sa.Float(), sa.Float(), sa.String(), sa.DateTime(timezone=True))
+    return [sa.column(name, type_) for name, type_ in zip(VALUE_COLUMNS, types)]
+
+
+def _rename_constraints(prefix):
+    # PostgreSQL keeps the names the copy was created with
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f'ALTER TABLE vitals RENAME CONSTRAINT {prefix}_pkey TO vitals_pkey')
+        op.execute(f'ALTER TABLE vitals RENAME CONSTRAINT {prefix}_user_id_fkey TO vitals_user_id_fkey')
+
+
+def _copy(source, target, convert):
+    """Copy every row of source into target in batches, converting each mapping."""
+    conn = op.get_bind()
+    result = conn.execution_options(yield_per=BATCH_ROWS).execute(sa.select(source))
+    for rows in result.mappings().partitions():
+        conn.execute(target.insert(), [convert(row) for row in rows])
+
+
+def upgrade():
+    conn = op.get_bind()
+    postgres = conn.dialect.name == 'postgresql'
+
+    old = sa.table('vitals', sa.column('id', sa.String), sa.column('category', sa.String),
+                   sa.column('unit', sa.String), *_value_columns())
+    unknown = [c for (c,) in conn.execute(sa.select(old.c.category).distinct()) if c not in CATEGORIES]
+    if unknown:
+        raise RuntimeError(f"vitals has categories without a code, add them to CATEGORIES first: {unknown}")
+
+    new = op.create_table('vitals_compact',
+    sa.Column('pk', sa.Integer().with_variant(sa.BigInteger(), 'postgresql'), autoincrement=True, nullable=False),
+    sa.Column('id', _uuid_type(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('category', sa.SmallInteger(), nullable=False),
+    sa.Column('value_primary', sa.Float(), nullable=False),
+    sa.Column('value_secondary', sa.Float(), nullable=True),
+    sa.Column('unit', sa.String(), nullable=True),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('pk'),
+    sa.UniqueConstraint('id', name='uq_vitals_id')
+    )
+
+    def convert(row):
+        public_id = uuid.UUID(row['id'])
+        return {
+            'id': str(public_id) if postgres else public_id.bytes,
+            'category': CATEGORIES[row['category']],
+            'unit': None if row['unit'] == UNITS[row['category']] else row['unit'],
+            **{c: row[c] for c in VALUE_COLUMNS},
+        }
+
+    _copy(old, new, convert)
+    op.drop_table('vitals')
+    op.rename_table('vitals_compact', 'vitals')
+    _rename_constraints('vitals_compact')
+    op.create_index('ix_vitals_user_id_category_recorded_at', 'vitals', ['user_id', 'category', 'recorded_at'], unique=False)
+
+
+def downgrade():
+    conn = op.get_bind()
+    postgres = conn.dialect.name == 'postgresql'
+
+    compact = sa.table('vitals', sa.column('pk', sa.Integer), sa.column('id', _uuid_type()),
+                       sa.column('category', sa.SmallInteger), sa.column('unit', sa.String),
+                       *_value_columns())
+    old = op.create_table('vitals_wide',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('value_primary', sa.Float(), nullable=False),
+    sa.Column('value_secondary', sa.Float(), nullable=True),
+    sa.Column('unit', sa.String(), nullable=True),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    def convert(row):
+        category = NAMES[row['category']]
+        return {
+            'id': str(row['id']) if postgres else str(uuid.UUID(bytes=bytes(row['id']))),
+            'category': category,
+            'unit': row['unit'] or UNITS[category],
+            **{c: row[c] for c in VALUE_COLUMNS},
+        }
+
+    _copy(compact, old, convert)
+    op.drop_table('vitals')
+    op.rename_table('vitals_wide', 'vitals')
+    _rename_constraints('vitals_wide')
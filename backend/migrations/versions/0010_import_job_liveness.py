@@ -0,0 +1,53 @@
+"""import job liveness
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-20 09:00:00.000000
+
+Import jobs record when they last made progress, so jobs whose worker died
+can be failed, and a partial unique index allows one queued or running job
+per user. Of duplicate active jobs left by earlier concurrent requests, all
+but each user's newest are failed first.
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+ACTIVE = "status IN ('queued', 'running')"
+
+
+def upgrade():
+    op.add_column('import_jobs', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+
+    jobs = sa.table('import_jobs', sa.column('id', sa.String), sa.column('user_id', sa.String),
+                    sa.column('status', sa.String), sa.column('created_at', sa.DateTime(timezone=True)),
+                    sa.column('finished_at', sa.DateTime(timezone=True)), sa.column('errors', sa.JSON))
+    conn = op.get_bind()
+    active = conn.execute(
+        sa.select(jobs.c.id, jobs.c.user_id).where(jobs.c.status.in_(('queued', 'running')))
+        .order_by(jobs.c.user_id, jobs.c.created_at.desc())
+    ).all()
+    newest = {}
+    superseded = [job_id for job_id, user_id in active if newest.setdefault(user_id, job_id) != job_id]
+    if superseded:
+        conn.execute(jobs.update().where(jobs.c.id.in_(superseded)).values(
+            status='failed', finished_at=datetime.now(timezone.utc),
+            errors=['import stopped: superseded by a newer import'],
+        ))
+
+    op.create_index('uq_import_jobs_user_id_active', 'import_jobs', ['user_id'], unique=True,
+                    sqlite_where=sa.text(ACTIVE), postgresql_where=sa.text(ACTIVE))
+
+
+def downgrade():
+    op.drop_index('uq_import_jobs_user_id_active', table_name='import_jobs')
+    with op.batch_alter_table('import_jobs') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -1,12 +1,69 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Float, Boolean, ForeignKey, Date, DateTime, Text, JSON, LargeBinary, Index, UniqueConstraint, case, text, type_coerce
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship as orm_relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from .database import Base
 import uuid
 
 def generate_uuid():
     return str(uuid.uuid4())
 
+# Vital categories are stored as small integers; never renumber, only append
+VITAL_CATEGORIES = {"BP": 1, "HR": 2, "SpO2": 3, "Glucose": 4, "Temp": 5, "Weight": 6}
+CATEGORY_NAMES = {code: name for name, code in VITAL_CATEGORIES.items()}
+# The unit every reading of a category is stored in unless it says otherwise
+CATEGORY_UNITS = {"BP": "mmHg", "HR": "bpm", "SpO2": "%", "Glucose": "mg/dL", "Temp": "°F", "Weight": "kg"}
+
+def stored_unit(category, unit):
+    """None for the category's standard unit, which is the common case and costs nothing to store."""
+    return None if unit == CATEGORY_UNITS.get(category) else unit
+
+class PublicUUID(TypeDecorator):
+    """
+    A UUID exposed as its canonical string: native uuid on PostgreSQL, 16 raw
+    bytes elsewhere. Strings that are not UUIDs bind as NULL, so looking one up
+    simply finds nothing.
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            parsed = uuid.UUID(str(value))
+        except ValueError:
+            return None
+        return str(parsed) if dialect.name == "postgresql" else parsed.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return str(uuid.UUID(bytes=bytes(value)))
+
+class VitalCategory(TypeDecorator):
+    """A vital category name ('BP', 'HR', ...) stored as its VITAL_CATEGORIES code."""
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return VITAL_CATEGORIES[value]
+        except KeyError:
+            raise ValueError(f"Unknown vital category: {value!r}") from None
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else CATEGORY_NAMES[value]
+
 class User(Base):
     __tablename__ = "users"
 
@@ -38,18 +95,39 @@ class Profile(Base):
 
 class Vital(Base):
     __tablename__ = "vitals"
+    __table_args__ = (
+        UniqueConstraint("id", name="uq_vitals_id"),
+        # Serves the dashboard's latest-per-category lookups, and a user's whole series
+        Index("ix_vitals_user_id_category_recorded_at", "user_id", "category", "recorded_at"),
+    )
 
-    id = Column(String, primary_key=True, default=generate_uuid)
+    pk = Column(Integer().with_variant(BigInteger, "postgresql"), primary_key=True, autoincrement=True) # Internal row key
+    id = Column(PublicUUID, nullable=False, default=generate_uuid, insert_sentinel=True) # The id the API uses; also lets SQLAlchemy batch inserts
     user_id = Column(String, ForeignKey("users.id"))
-    category = Column(String, nullable=False) # 'BP', 'HR', 'SpO2', 'Glucose', 'Temp', 'Weight'
+    category = Column(VitalCategory, nullable=False) # 'BP', 'HR', 'SpO2', 'Glucose', 'Temp', 'Weight'
     value_primary = Column(Float, nullable=False) # e.g., Systolic, or just the value
     value_secondary = Column(Float, nullable=True) # e.g., Diastolic
-    unit = Column(String)
+    unit_override = Column("unit", String) # NULL means CATEGORY_UNITS[category]
     notes = Column(String)
     recorded_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = orm_relationship("User", back_populates="vitals")
 
+    @hybrid_property
+    def unit(self):
+        return self.unit_override or CATEGORY_UNITS.get(self.category)
+
+    @unit.inplace.setter
+    def _unit_setter(self, value):
+        self.unit_override = stored_unit(self.category, value)
+
+    @unit.inplace.expression
+    @classmethod
+    def _unit_expression(cls):
+        standard = case({VITAL_CATEGORIES[name]: unit for name, unit in CATEGORY_UNITS.items()},
+                        value=type_coerce(cls.category, SmallInteger))
+        return func.coalesce(cls.unit_override, standard).label("unit")
+
 class Report(Base):
     __tablename__ = "reports"
 
@@ -61,6 +139,8 @@ class Report(Base):
     summary = Column(Text)
     risk_level = Column(String) # GREEN, YELLOW, RED
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    file_name = Column(String) # Original upload name; the stored file is content-addressed
+    thumbnail_url = Column(String) # Set once the preview has been rendered
     
     user = orm_relationship("User", back_populates="reports")
 
@@ -103,6 +183,98 @@ class Medicine(Base):
 
     user = orm_relationship("User", back_populates="medicines")
 
+class Vendor(Base):
+    __tablename__ = "vendors"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    name = Column(String, unique=True, nullable=False)
+    logo = Column(String)
+    reliability = Column(String) # High, Medium, Low
+    search_url = Column(String) # Template with a {query} placeholder
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class Facility(Base):
+    __tablename__ = "facilities"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    name = Column(String, nullable=False, index=True)
+    type = Column(String) # Hospital, Clinic, Specialty Center, Diagnostic
+    specialty = Column(String)
+    rating = Column(Float)
+    address = Column(String)
+    city = Column(String, index=True)
+    phone = Column(String)
+    lat = Column(Float)
+    lng = Column(Float)
+    has_emergency = Column(Boolean, default=False)
+
+class RefreshToken(Base):
+    """
+    One row per issued refresh token, kept only for revocation. Tokens from the
+    same login share a family; presenting an already-rotated token revokes it.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(String(32), primary_key=True) # JWT "jti"
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked = Column(Boolean, nullable=False, default=False)
+
+class ResourceVersion(Base):
+    """
+    Per-user change counter for each cached resource (see http_cache.py).
+    Writes bump it in their own transaction; reads turn it into an ETag.
+    """
+    __tablename__ = "resource_versions"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    resource = Column(String(16), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class VitalArchive(Base):
+    """
+    One user's vitals for one calendar month, packed column by column into a
+    compressed blob (see services/vitals_archive.py).
+    """
+    __tablename__ = "vitals_archive"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True) # First day of the month
+    row_count = Column(Integer, nullable=False)
+    first_recorded_at = Column(DateTime(timezone=True), nullable=False)
+    last_recorded_at = Column(DateTime(timezone=True), nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+class ImportJob(Base):
+    """
+    A bulk vitals import (see services/vitals_import.py). The worker updates
+    the counters in the same transaction as each batch it inserts.
+    """
+    __tablename__ = "import_jobs"
+    __table_args__ = (
+        # At most one queued or running import per user, also under concurrent requests
+        Index("uq_import_jobs_user_id_active", "user_id", unique=True,
+              sqlite_where=text("status IN ('queued', 'running')"),
+              postgresql_where=text("status IN ('queued', 'running')")),
+    )
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    format = Column(String(16), nullable=False) # csv, fhir, fhir-ndjson
+    status = Column(String(16), nullable=False, default="queued") # queued, running, succeeded, failed
+    size_bytes = Column(Integer, nullable=False, default=0)
+    bytes_processed = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_skipped = Column(Integer, nullable=False, default=0) # Resources that are not vitals
+    rows_rejected = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON) # First IMPORT_MAX_ERRORS messages, "line N: reason"
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now()) # Last progress; jobs idle for IMPORT_STALE_SECONDS are failed
+
 # Update User relationship (Outside of User class definition to avoid circular issues if order matters, 
 # but here we can just update the User class or rely on the back_populates in Medicine if User doesn't explicitly list it.
 # However, usually we want it on both sides. Let's add it to User class.)
@@ -63,15 +63,35 @@ class NotificationService:
     
     def format_location_link(self, location: Dict) -> str:
         """Generate a Google Maps link from location data."""
-        if location and location.get("lat") and location.get("lng"):
-            lat, lng = location["lat"], location["lng"]
+        try:
+            from .services.facility_index import location_coordinates
+        except ImportError:
+            from services.facility_index import location_coordinates
+        
+        coords = location_coordinates(location)
+        if coords:
+            lat, lng = coords
             return f"https://www.google.com/maps?q={lat},{lng}"
         return "Location unavailable"
     
+    def format_nearest_hospitals(self, hospitals: List[Dict]) -> str:
+        """One-line summary of the nearest hospitals for SMS, e.g. "City Hospital (1.2 km, 555-0100)"."""
+        parts = []
+        for h in hospitals:
+            details = [f"{h['distance_km']} km"]
+            if h.get("phone"):
+                details.append(h["phone"])
+            parts.append(f"{h['name']} ({', '.join(details)})")
+        return "; ".join(parts)
+    
     def create_sos_sms_body(self, user_name: str, location: Dict) -> str:
         """Create an SMS message for SOS alerts."""
         location_link = self.format_location_link(location)
-        return f"🚨 EMERGENCY: {user_name} triggered SOS! Location: {location_link} - Please contact them immediately!"
+        body = f"🚨 EMERGENCY: {user_name} triggered SOS! Location: {location_link} - Please contact them immediately!"
+        hospitals = (location or {}).get("nearest_hospitals")
+        if hospitals:
+            body += f" Nearest hospitals: {self.format_nearest_hospitals(hospitals)}"
+        return body
     
     def notify_emergency_contacts(self, user, location: Dict, 
                                    contacts: List) -> Dict:
@@ -0,0 +1,22 @@
+"""
+pytest plugin exposing query budgets as a fixture.
+
+Enable with `-p backend.pytest_query_budget` or
+`pytest_plugins = ["backend.pytest_query_budget"]` in a conftest, then:
+
+    def test_dashboard(client, db_query_budget):
+        with db_query_budget(8, label="dashboard"):
+            client.get("/api/v1/health/dashboard", headers=auth)
+
+Endpoint-declared budgets are enforced for every request when the suite runs
+with QUERY_BUDGET_MODE=raise, as backend/tests does (see test_query_budgets.py).
+"""
+
+import pytest
+
+from .query_budget import query_budget
+
+
+@pytest.fixture
+def db_query_budget():
+    yield query_budget
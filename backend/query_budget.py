@@ -0,0 +1,186 @@
+"""
+Query budgets and slow-query logging.
+
+Endpoints declare how many SQL statements a request may issue with the
+@budget decorator. QueryBudgetMiddleware compares each request against its
+declaration: QUERY_BUDGET_MODE=log reports offenders (staging), =raise turns
+them into QueryBudgetExceeded so a test client fails the test. With
+SLOW_QUERY_MS set, statements slower than the threshold are logged together
+with their EXPLAIN plan.
+
+For tests there is also the query_budget() context manager, which records
+every statement issued while it is open, on any thread; backend/pytest_query_budget.py
+wraps it as a pytest fixture.
+"""
+
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, NamedTuple, Optional, Set
+
+from .config import settings
+from .db_timing import observe_queries
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "log", "raise")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RecordedQuery(NamedTuple):
+    statement: str
+    seconds: float
+
+
+class QueryRecorder:
+    """Statements issued while the recorder is active."""
+
+    def __init__(self):
+        self.queries: List[RecordedQuery] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(q.seconds for q in self.queries)
+
+    def report(self, limit: int = 10) -> str:
+        """Most repeated statements first, which is where an N+1 shows up."""
+        repeated = Counter(" ".join(q.statement.split()) for q in self.queries)
+        lines = [f"{n}x {sql[:200]}" for sql, n in repeated.most_common(limit)]
+        return "\n".join(lines)
+
+    def check(self, max_queries: Optional[int] = None, max_seconds: Optional[float] = None,
+              label: str = "block"):
+        """Raise QueryBudgetExceeded if the recorded statements exceed the budget."""
+        problems = []
+        if max_queries is not None and self.count > max_queries:
+            problems.append(f"{self.count} queries (budget {max_queries})")
+        if max_seconds is not None and self.total_seconds > max_seconds:
+            problems.append(f"{self.total_seconds * 1000:.1f} ms in the database (budget {max_seconds * 1000:.0f} ms)")
+        if problems:
+            raise QueryBudgetExceeded(f"{label} issued {', '.join(problems)}:\n{self.report()}")
+
+
+_recorders: Set[QueryRecorder] = set()
+_recorders_lock = threading.Lock()
+_request_recorder: ContextVar[Optional[QueryRecorder]] = ContextVar("query_budget_recorder", default=None)
+
+
+# --- Statement hook -----------------------------------------------------------
+
+EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+
+
+def explain(conn, statement: str, parameters) -> Optional[str]:
+    """EXPLAIN a SELECT on the raw DBAPI connection, bypassing the engine events."""
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+    finally:
+        cursor.close()
+
+
+def _observe_query(conn, statement, parameters, executemany, elapsed):
+    query = RecordedQuery(statement, elapsed)
+
+    recorder = _request_recorder.get()
+    if recorder is not None:
+        recorder.queries.append(query)
+    if _recorders:
+        with _recorders_lock:
+            for r in _recorders:
+                r.queries.append(query)
+
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        plan = explain(conn, statement, parameters) if settings.SLOW_QUERY_EXPLAIN and not executemany else None
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {' '.join(statement.split())[:500]}"
+                       + (f"\nPlan:\n{plan}" if plan else ""))
+
+
+def install():
+    """Feed statement timings (db_timing.py) to budgets and slow-query logging; idempotent."""
+    observe_queries(_observe_query)
+
+
+# --- Budgets ------------------------------------------------------------------
+
+def budget(max_queries: int, max_seconds: Optional[float] = None) -> Callable:
+    """Declare the query budget of an endpoint (place below the @router decorator)."""
+    def decorate(endpoint):
+        endpoint.query_budget = (max_queries, max_seconds)
+        return endpoint
+    return decorate
+
+
+@contextmanager
+def query_budget(max_queries: Optional[int] = None, max_seconds: Optional[float] = None,
+                 label: str = "block"):
+    """Record every statement issued inside the block and enforce the budget on exit."""
+    install()
+    recorder = QueryRecorder()
+    with _recorders_lock:
+        _recorders.add(recorder)
+    try:
+        yield recorder
+    finally:
+        with _recorders_lock:
+            _recorders.discard(recorder)
+    recorder.check(max_queries, max_seconds, label)
+
+
+class QueryBudgetMiddleware:
+    """Checks every request against the budget declared on its endpoint."""
+
+    def __init__(self, app, mode: str = "log"):
+        if mode not in MODES:
+            raise ValueError(f"QUERY_BUDGET_MODE must be one of {MODES}")
+        self.app = app
+        self.mode = mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recorder = QueryRecorder()
+        token = _request_recorder.set(recorder)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_recorder.reset(token)
+
+        route = scope.get("route")
+        declared = getattr(getattr(route, "endpoint", None), "query_budget", None)
+        if declared is None:
+            return
+        label = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+        try:
+            recorder.check(*declared, label=label)
+        except QueryBudgetExceeded as e:
+            if self.mode == "raise":
+                raise
+            logger.warning(str(e))
+
+
+def install_query_budgets(app):
+    """Wire budgets and slow-query logging into the app according to settings."""
+    if settings.QUERY_BUDGET_MODE == "off" and not settings.SLOW_QUERY_MS:
+        return
+    install()
+    if settings.QUERY_BUDGET_MODE != "off":
+        app.add_middleware(QueryBudgetMiddleware, mode=settings.QUERY_BUDGET_MODE)
+
@@ -0,0 +1,258 @@
+"""
+Rate limiting and LLM cost budgets for the routes that call the model.
+
+Each limited route gets two token buckets, one per user and one shared by all
+users of the route, and both must have a token for the request to proceed.
+On top of that every user has a daily budget of LLM tokens (prompt plus
+completion, UTC day). The budget is checked before the route runs and charged
+afterwards with the usage the provider layer reported for the calls made
+while serving it. A refused request gets 429 with Retry-After.
+
+Buckets live in process memory by default; set RATE_LIMIT_REDIS_URL (and
+install the redis package) to share them between workers. If Redis is
+unreachable the limiter fails open rather than taking the API down with it.
+
+Usage, as a route dependency:
+
+    @router.post("/chat", dependencies=[Depends(LLMRateLimit("assistant.chat", user="20/minute"))])
+
+A route that can answer from a cache without calling the model looks the
+cache up in a dependency listed before the limiter and calls mark_cache_hit()
+on a hit; that request then passes without taking a token.
+"""
+
+import logging
+import math
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+
+from .auth import Principal, get_current_principal
+from .config import settings
+from .metrics import RATE_LIMITED
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# (key, refill per second, burst)
+Bucket = Tuple[str, float, float]
+
+
+def parse_rate(rate: str) -> Tuple[float, float]:
+    """'10/minute' -> (refill per second, burst); the burst is the full allowance."""
+    count, _, period = rate.partition("/")
+    if period not in PERIODS or not count.strip().isdigit() or int(count) < 1:
+        raise ValueError(f"Invalid rate {rate!r}, expected e.g. '10/minute'")
+    return int(count) / PERIODS[period], float(count)
+
+
+def utc_day() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%d")
+
+
+def seconds_until_utc_midnight() -> int:
+    now = datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(1, math.ceil((midnight - now).total_seconds()))
+
+
+# --- Backends -----------------------------------------------------------------
+
+class MemoryBackend:
+    """Buckets in a dict. Only touched from the event loop, so no locking is needed."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, List[float]] = {}  # key -> [tokens, updated]
+        self._usage: Dict[str, int] = {}
+        self._usage_day = utc_day()
+
+    async def take(self, buckets: List[Bucket]) -> float:
+        """Take one token from every bucket, or none; returns seconds to wait (0 when granted)."""
+        now = time.monotonic()
+        wait = 0.0
+        levels = []
+        for key, rate, burst in buckets:
+            state = self._buckets.get(key)
+            tokens = burst if state is None else min(burst, state[0] + (now - state[1]) * rate)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / rate)
+            levels.append(tokens)
+        if wait:
+            return wait
+        if len(self._buckets) >= self.max_keys:
+            self._prune(now)
+        for (key, _, _), tokens in zip(buckets, levels):
+            self._buckets[key] = [tokens - 1, now]
+        return 0.0
+
+    def _prune(self, now: float):
+        # A bucket idle long enough to have refilled completely carries no state
+        idle = [k for k, (tokens, updated) in self._buckets.items() if now - updated > 86400]
+        for key in idle or list(self._buckets)[: self.max_keys // 10]:
+            del self._buckets[key]
+
+    def _roll_day(self):
+        day = utc_day()
+        if day != self._usage_day:
+            self._usage.clear()
+            self._usage_day = day
+
+    async def usage(self, key: str) -> int:
+        self._roll_day()
+        return self._usage.get(key, 0)
+
+    async def add_usage(self, key: str, amount: int):
+        self._roll_day()
+        self._usage[key] = self._usage.get(key, 0) + amount
+
+
+class RedisBackend:
+    """Buckets shared by all workers; each take is one atomic script call."""
+
+    TAKE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local rate, burst = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'updated')
+    local tokens = burst
+    if state[1] then
+        tokens = math.min(burst, tonumber(state[1]) + (now - tonumber(state[2])) * rate)
+    end
+    if tokens < 1 then wait = math.max(wait, (1 - tokens) / rate) end
+    levels[i] = tokens
+end
+if wait > 0 then return tostring(wait) end
+for i, key in ipairs(KEYS) do
+    local rate, burst = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+    redis.call('HSET', key, 'tokens', levels[i] - 1, 'updated', now)
+    redis.call('EXPIRE', key, math.ceil(burst / rate) + 1)
+end
+return '0'
+"""
+
+    def __init__(self, url: str, prefix: str = "arodoc:ratelimit:"):
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+        self._take = self._redis.register_script(self.TAKE_SCRIPT)
+
+    async def take(self, buckets: List[Bucket]) -> float:
+        keys = [self.prefix + key for key, _, _ in buckets]
+        args = [value for _, rate, burst in buckets for value in (rate, burst)]
+        return float(await self._take(keys=keys, args=args))
+
+    async def usage(self, key: str) -> int:
+        return int(await self._redis.get(f"{self.prefix}usage:{utc_day()}:{key}") or 0)
+
+    async def add_usage(self, key: str, amount: int):
+        name = f"{self.prefix}usage:{utc_day()}:{key}"
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.incrby(name, amount)
+            pipe.expire(name, 2 * 86400)
+            await pipe.execute()
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if settings.RATE_LIMIT_REDIS_URL:
+            _backend = RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+        else:
+            _backend = MemoryBackend()
+    return _backend
+
+
+# --- LLM usage ----------------------------------------------------------------
+
+class LLMUsage:
+    """Tokens used by the LLM calls made while serving one request."""
+    __slots__ = ("tokens",)
+
+    def __init__(self):
+        self.tokens = 0
+
+
+_current_usage: ContextVar[Optional[LLMUsage]] = ContextVar("llm_usage", default=None)
+
+
+def record_llm_usage(response):
+    """Called by the provider layer after each call; a no-op outside limited routes."""
+    usage = _current_usage.get()
+    metadata = getattr(response, "usage_metadata", None)
+    if usage is None or metadata is None:
+        return
+    total = getattr(metadata, "total_token_count", None)
+    if not total:
+        total = (getattr(metadata, "prompt_token_count", 0) or 0) + (getattr(metadata, "candidates_token_count", 0) or 0)
+    usage.tokens += total
+
+
+# --- Dependency ---------------------------------------------------------------
+
+def mark_cache_hit(request: Request):
+    """This request is answered from a cache, so it calls no model and is not limited."""
+    request.state.llm_cache_hit = True
+
+
+def _too_many(scope: str, reason: str, retry_after: float, detail: str):
+    RATE_LIMITED.labels(scope, reason).inc()
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class LLMRateLimit:
+    """Route dependency enforcing the per-user and per-route limits and the daily LLM budget."""
+
+    def __init__(self, scope: str, user: Optional[str] = None, route: Optional[str] = None):
+        self.scope = scope
+        self.user_rate, self.user_burst = parse_rate(user or settings.RATE_LIMIT_USER)
+        self.route_rate, self.route_burst = parse_rate(route or settings.RATE_LIMIT_ROUTE)
+        self.route_key = f"route:{scope}"
+
+    async def __call__(self, request: Request, principal: Principal = Depends(get_current_principal)):
+        if not settings.RATE_LIMIT_ENABLED or getattr(request.state, "llm_cache_hit", False):
+            yield
+            return
+        backend = get_backend()
+        try:
+            wait = await backend.take([
+                (f"user:{principal.id}:{self.scope}", self.user_rate, self.user_burst),
+                (self.route_key, self.route_rate, self.route_burst),
+            ])
+            used = await backend.usage(principal.id) if settings.LLM_DAILY_TOKEN_BUDGET else 0
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            yield
+            return
+        if wait:
+            _too_many(self.scope, "rate", wait, "Too many requests, please slow down")
+        if settings.LLM_DAILY_TOKEN_BUDGET and used >= settings.LLM_DAILY_TOKEN_BUDGET:
+            _too_many(self.scope, "budget", seconds_until_utc_midnight(),
+                      "Daily AI usage limit reached, please try again tomorrow")
+
+        usage = LLMUsage()
+        token = _current_usage.set(usage)
+        try:
+            yield
+        finally:
+            _current_usage.reset(token)
+            if usage.tokens:
+                try:
+                    await backend.add_usage(principal.id, usage.tokens)
+                except Exception as e:
+                    logger.warning(f"Could not record LLM usage: {e}")
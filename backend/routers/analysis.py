@@ -1,16 +1,25 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
+from datetime import datetime, timezone
 from typing import List
-import shutil
+import mimetypes
 import os
 import json
-import google.generativeai as genai
 from .. import models, schemas, database, config
-from ..auth import get_current_user
+from ..auth import Principal, get_current_principal
+from ..http_cache import REPORTS, ResourceETag, bump
+from ..serialization import FastJSONRoute, rows_response, schema_columns
+from ..rate_limit import LLMRateLimit
+from ..services import llm, report_files, thumbnails
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/analysis",
-    tags=["Analysis"]
+    tags=["Analysis"],
+    route_class=FastJSONRoute
 )
 
 def analyze_medical_text(file_path: str, mime_type: str):
@@ -19,7 +28,7 @@ def analyze_medical_text(file_path: str, mime_type: str):
     Returns structured JSON data.
     """
     if not config.settings.GEMINI_API_KEY:
-        print("WARNING: No GEMINI_API_KEY found. Using Mock response.")
+        logger.warning("No GEMINI_API_KEY found. Using mock analysis response.")
         return {
             "summary": "AI Key missing. Returning mock data: Analysis indicates normal levels.",
             "risk_level": "GREEN",
@@ -27,13 +36,8 @@ def analyze_medical_text(file_path: str, mime_type: str):
         }
 
     try:
-        # Configure Gemini with current API key (runtime, not import-time)
-        genai.configure(api_key=config.settings.GEMINI_API_KEY)
-        
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        
         # Upload the file to Gemini
-        uploaded_file = genai.upload_file(file_path, mime_type=mime_type)
+        uploaded_file = llm.upload_file(file_path, mime_type=mime_type)
         
         prompt = """
         Analyze this medical report/lab result. 
@@ -51,14 +55,14 @@ def analyze_medical_text(file_path: str, mime_type: str):
         }
         """
 
-        response = model.generate_content([prompt, uploaded_file])
+        response = llm.generate([prompt, uploaded_file])
         
         text = response.text.replace("```json", "").replace("```", "").strip()
         return json.loads(text)
 
     except Exception as e:
         error_msg = str(e)
-        print(f"Gemini Analysis Failed: {error_msg}")
+        logger.error(f"Gemini analysis failed: {error_msg}")
         return {
             "summary": f"AI Analysis is currently busy. (Error: {error_msg}). Showing standard sample: Blood work indicates levels are within acceptable therapeutic ranges.",
             "risk_level": "GREEN",
@@ -69,56 +73,121 @@ def analyze_medical_text(file_path: str, mime_type: str):
             ]
         }
 
-@router.post("/upload", response_model=schemas.ReportResponse)
-def upload_report(file: UploadFile = File(...), db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+@router.post("/upload", response_model=schemas.ReportResponse, dependencies=[Depends(LLMRateLimit("analysis.upload", user="5/minute"))])
+def upload_report(file: UploadFile = File(...), db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
     # Validate file type
     ALLOWED_TYPES = ["application/pdf", "image/jpeg", "image/png", "image/jpg"]
     if file.content_type not in ALLOWED_TYPES:
         raise HTTPException(status_code=400, detail="Invalid file type. Only PDF and Image files are allowed.")
 
-    # Create unique filename
-    import uuid
-    safe_filename = f"{uuid.uuid4()}_{file.filename}"
-    file_location = f"backend/uploads/{safe_filename}"
-    os.makedirs("backend/uploads", exist_ok=True)
-    
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    # Perform Analysis
-    analysis = analyze_medical_text(file_location, file.content_type)
-    
-    new_report = models.Report(
-        user_id=current_user.id,
-        file_url=file_location,
-        file_type=file.content_type,
-        analysis_result=analysis.get("findings", []),
-        summary=analysis.get("summary", "No summary available"),
-        risk_level=analysis.get("risk_level", "YELLOW")
-    )
-    db.add(new_report)
-    db.commit()
+    stored = report_files.store_upload(file.file, file.content_type)
+    file_location = stored.path
+    try:
+        # Perform Analysis
+        analysis = analyze_medical_text(stored.readable, file.content_type)
+
+        new_report = models.Report(
+            user_id=current_user.id,
+            file_url=file_location,
+            file_name=file.filename,
+            file_type=file.content_type,
+            analysis_result=analysis.get("findings", []),
+            summary=analysis.get("summary", "No summary available"),
+            risk_level=analysis.get("risk_level", "YELLOW")
+        )
+        db.add(new_report)
+        bump(db, current_user.id, REPORTS)
+        db.commit()
+    except BaseException:
+        report_files.discard(stored)
+        raise
+    # A concurrent delete of a report sharing this content may have removed the file
+    report_files.settle(stored)
+
+    # The preview renders in the background; a re-upload of stored content already has one
+    if thumbnails.schedule(file_location, file.content_type) and new_report.thumbnail_url is None:
+        new_report.thumbnail_url = thumbnails.thumbnail_url(new_report.id)
+        bump(db, current_user.id, REPORTS)
+        db.commit()
     db.refresh(new_report)
     return new_report
 
-@router.get("/reports", response_model=List[schemas.ReportResponse])
-def get_reports(db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
-    return db.query(models.Report).filter(models.Report.user_id == current_user.id).order_by(models.Report.created_at.desc()).all()
+@router.get("/reports", response_model=List[schemas.ReportResponse], dependencies=[Depends(ResourceETag(REPORTS))])
+def get_reports(response: Response, db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
+    rows = db.query(*schema_columns(models.Report, schemas.ReportResponse)).filter(models.Report.user_id == current_user.id).order_by(models.Report.created_at.desc()).all()
+    return rows_response(schemas.ReportResponse, rows, response.headers)
 
 @router.delete("/reports/{report_id}")
-def delete_report(report_id: str, db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+def delete_report(report_id: str, db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
     report = db.query(models.Report).filter(models.Report.id == report_id, models.Report.user_id == current_user.id).first()
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    # Delete the physical file if it exists
-    if report.file_url and os.path.exists(report.file_url):
-        try:
-            os.remove(report.file_url)
-        except Exception as e:
-            print(f"Error deleting file: {e}")
-            
+    file_url = report.file_url
     db.delete(report)
+    bump(db, current_user.id, REPORTS)
     db.commit()
+
+    # Delete the physical file unless another report shares its content
+    if file_url:
+        try:
+            report_files.remove_if_unreferenced(db, file_url)
+        except Exception as e:
+            logger.warning(f"Error deleting report file: {e}")
     return {"message": "Report deleted successfully"}
 
+@router.get("/reports/{report_id}/file", response_model=schemas.ReportFileURL)
+def get_report_file_url(report_id: str, request: Request, db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
+    """Short-lived signed link to the original upload; only the owner can obtain one."""
+    file_url = db.query(models.Report.file_url).filter(models.Report.id == report_id, models.Report.user_id == current_user.id).scalar()
+    if not file_url:
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    key = report_files.storage_key(file_url)
+    expires, signature = report_files.sign(key)
+    path = request.app.url_path_for("serve_report_file", key=key)
+    return {
+        "url": f"{path}?expires={expires}&signature={signature}",
+        "expires_at": datetime.fromtimestamp(expires, timezone.utc),
+    }
+
+@router.get("/reports/{report_id}/thumbnail", response_class=FileResponse)
+def get_report_thumbnail(report_id: str, db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
+    """WebP preview of the upload; 404 until it has been rendered."""
+    file_url = db.query(models.Report.file_url).filter(
+        models.Report.id == report_id, models.Report.user_id == current_user.id, models.Report.thumbnail_url.isnot(None)
+    ).scalar()
+    path = thumbnails.thumbnail_path(file_url) if file_url else None
+    if path is None or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    # Derived from a content-addressed blob, so a report's thumbnail never changes
+    headers = {"Cache-Control": "private, max-age=31536000, immutable", "X-Content-Type-Options": "nosniff"}
+    return FileResponse(path, media_type="image/webp", headers=headers)
+
+@router.get("/files/{key:path}", include_in_schema=False)
+async def serve_report_file(key: str, expires: int, signature: str):
+    """
+    Serves a signed report link without touching the database. Range requests
+    are supported, and the body is streamed off the event loop (zero-copy where
+    the server supports pathsend). With REPORT_FILES_ACCEL_REDIRECT set, nginx
+    sends the file instead and no worker is involved past the signature check.
+    """
+    if not report_files.verify(key, expires, signature):
+        raise HTTPException(status_code=403, detail="This link is invalid or has expired")
+    path = report_files.resolve(key)
+    if path is None or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    headers = {"X-Content-Type-Options": "nosniff"}
+    if report_files.is_content_addressed(key):
+        # The path names the content, so it can never change
+        headers["Cache-Control"] = "private, max-age=31536000, immutable"
+        headers["ETag"] = f'"{os.path.splitext(os.path.basename(key))[0]}"'
+    else:
+        headers["Cache-Control"] = f"private, max-age={config.settings.REPORT_URL_TTL_SECONDS}"
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    if config.settings.REPORT_FILES_ACCEL_REDIRECT:
+        headers["X-Accel-Redirect"] = config.settings.REPORT_FILES_ACCEL_REDIRECT.rstrip("/") + "/" + key
+        return Response(headers=headers, media_type=media_type)
+    return FileResponse(path, media_type=media_type, headers=headers, content_disposition_type="inline")
@@ -1,14 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import date
 from .. import models, database, config
-from ..auth import get_current_user
+from ..auth import Principal, get_current_principal
+from ..query_budget import budget
+from ..rate_limit import LLMRateLimit
+from ..serialization import FastJSONRoute
+from ..services import llm
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/assistant",
-    tags=["AI Assistant"]
+    tags=["AI Assistant"],
+    route_class=FastJSONRoute
 )
 
 class ChatMessage(BaseModel):
@@ -31,12 +40,14 @@ def check_emergency(message: str) -> bool:
     message_lower = message.lower()
     return any(keyword in message_lower for keyword in EMERGENCY_KEYWORDS)
 
-def get_user_health_context(db: Session, user_id: str) -> str:
+async def get_user_health_context(db: AsyncSession, user_id: str) -> str:
     """Build health context string from user's data"""
     context_parts = []
     
     # Get user profile
-    profile = db.query(models.Profile).filter(models.Profile.user_id == user_id).first()
+    profile = (await db.execute(
+        select(models.Profile).where(models.Profile.user_id == user_id)
+    )).scalars().first()
     if profile:
         if profile.dob:
             today = date.today()
@@ -49,17 +60,19 @@ def get_user_health_context(db: Session, user_id: str) -> str:
             context_parts.append(f"Blood Type: {profile.blood_type}")
     
     # Get latest vitals
-    def get_vital(category):
-        return db.query(models.Vital).filter(
-            models.Vital.user_id == user_id,
-            models.Vital.category == category
-        ).order_by(models.Vital.recorded_at.desc()).first()
+    async def get_vital(category):
+        return (await db.execute(
+            select(models.Vital).where(
+                models.Vital.user_id == user_id,
+                models.Vital.category == category
+            ).order_by(models.Vital.recorded_at.desc()).limit(1)
+        )).scalars().first()
     
-    hr = get_vital("HR")
-    bp = get_vital("BP")
-    glucose = get_vital("Glucose")
-    temp = get_vital("Temp")
-    weight = get_vital("Weight")
+    hr = await get_vital("HR")
+    bp = await get_vital("BP")
+    glucose = await get_vital("Glucose")
+    temp = await get_vital("Temp")
+    weight = await get_vital("Weight")
     
     vitals = []
     if hr:
@@ -78,20 +91,23 @@ def get_user_health_context(db: Session, user_id: str) -> str:
         context_parts.append("Recent Vitals: " + ", ".join(vitals))
     
     # Get latest report summary
-    latest_report = db.query(models.Report).filter(
-        models.Report.user_id == user_id
-    ).order_by(models.Report.created_at.desc()).first()
+    latest_report = (await db.execute(
+        select(models.Report).where(
+            models.Report.user_id == user_id
+        ).order_by(models.Report.created_at.desc()).limit(1)
+    )).scalars().first()
     
     if latest_report and latest_report.summary:
         context_parts.append(f"Latest Report ({latest_report.risk_level}): {latest_report.summary[:300]}")
     
     return "\n".join(context_parts) if context_parts else "No health data available yet."
 
-@router.post("/chat", response_model=ChatResponse)
-def chat_with_assistant(
+@router.post("/chat", response_model=ChatResponse, dependencies=[Depends(LLMRateLimit("assistant.chat", user="20/minute"))])
+@budget(7)
+async def chat_with_assistant(
     chat: ChatMessage,
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     AI-powered health assistant chat endpoint.
@@ -114,11 +130,8 @@ def chat_with_assistant(
         )
     
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=config.settings.GEMINI_API_KEY)
-        
         # Get user's health context
-        health_context = get_user_health_context(db, current_user.id)
+        health_context = await get_user_health_context(db, current_user.id)
         
         # Build conversation history for context
         history_text = ""
@@ -148,8 +161,7 @@ CONVERSATION HISTORY:
 
 Respond naturally to the user's message. Be helpful and caring."""
 
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content([
+        response = await llm.generate_async([
             system_prompt,
             f"User: {chat.message}"
         ])
@@ -163,7 +175,7 @@ Respond naturally to the user's message. Be helpful and caring."""
         return ChatResponse(response=ai_response, is_emergency=False)
         
     except Exception as e:
-        print(f"AI Assistant error: {e}")
+        logger.error(f"AI Assistant error: {e}")
         return ChatResponse(
             response="I'm having trouble processing your request right now. Please try again in a moment.\n\nIn the meantime, you can:\n- Check your Dashboard for health insights\n- View your Recommendations for personalized tips\n- Use the Hospital Locator to find nearby care",
             is_emergency=False
@@ -1,22 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from fastapi.security import OAuth2PasswordRequestForm
-from datetime import timedelta
 from .. import models, schemas, database, auth
 from ..auth import get_current_user
+from ..http_cache import PROFILE, ResourceETag
+from ..serialization import FastJSONRoute
 
 router = APIRouter(
     prefix="/auth",
-    tags=["Authentication"]
+    tags=["Authentication"],
+    route_class=FastJSONRoute
 )
 
+def token_response(user: models.User, refresh_token: str) -> dict:
+    return {
+        "access_token": auth.create_user_access_token(user),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": auth.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
 @router.post("/signup", response_model=schemas.UserResponse)
-def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if db_user:
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(database.get_async_db)):
+    result = await db.execute(select(models.User).where(models.User.email == user.email))
+    if result.scalars().first():
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = auth.get_password_hash(user.password)
+    hashed_password = await auth.hash_password_async(user.password)
     new_user = models.User(
         email=user.email,
         hashed_password=hashed_password,
@@ -25,7 +37,7 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
     db.add(new_user)
     
     # Flush to get the ID for the profile, but don't commit yet
-    db.flush()
+    await db.flush()
 
     # Always create profile even if dob is missing
     new_profile = models.Profile(
@@ -35,26 +47,45 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
     db.add(new_profile)
     
     # Commit both
-    db.commit()
-    db.refresh(new_user)
-        
-    return new_user
+    await db.commit()
+    result = await db.execute(
+        select(models.User).options(selectinload(models.User.profile)).where(models.User.id == new_user.id)
+    )
+    return result.scalars().one()
 
 @router.post("/token", response_model=schemas.Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(database.get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(database.get_async_db)):
+    result = await db.execute(select(models.User).where(models.User.email == form_data.username))
+    user = result.scalars().first()
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await auth.verify_and_update_password_async(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = auth.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    if new_hash:
+        # Stored hash predates the current argon2 parameters
+        user.hashed_password = new_hash
+    await auth.purge_expired_refresh_tokens(db, user.id)
+    refresh_token = await auth.issue_refresh_token(db, user.id)
+    await db.commit()
+    return token_response(user, refresh_token)
+
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh_access_token(request: schemas.RefreshRequest, db: AsyncSession = Depends(database.get_async_db)):
+    """Trade a refresh token for a new access token and a rotated refresh token (no password check)."""
+    user, refresh_token = await auth.rotate_refresh_token(db, request.refresh_token)
+    return token_response(user, refresh_token)
+
+@router.post("/logout")
+async def logout(request: schemas.RefreshRequest, db: AsyncSession = Depends(database.get_async_db)):
+    await auth.revoke_refresh_token(db, request.refresh_token)
+    return {"message": "Logged out"}
 
-@router.get("/me", response_model=schemas.UserResponse)
+# Only the profile part of the account can change after signup
+@router.get("/me", response_model=schemas.UserResponse, dependencies=[Depends(ResourceETag(PROFILE))])
 def read_users_me(current_user: models.User = Depends(get_current_user)):
     return current_user
@@ -1,20 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from .. import models, schemas, database
-from ..auth import get_current_user
+from ..auth import Principal, get_current_principal
+from ..http_cache import CONTACTS, ResourceETag, bump_async
+from ..serialization import FastJSONRoute
+from ..config import settings
 from ..notification_service import notify_emergency_contacts
+from ..services.facility_index import nearest_emergency_hospitals
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/emergency",
-    tags=["Emergency"]
+    tags=["Emergency"],
+    route_class=FastJSONRoute
 )
 
 @router.post("/trigger")
-def trigger_sos(location: dict, db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+async def trigger_sos(location: dict, db: AsyncSession = Depends(database.get_async_db), current_user: Principal = Depends(get_current_principal)):
+    # 0. Attach the nearest emergency hospitals (in-memory index lookup)
+    nearest_hospitals = nearest_emergency_hospitals(
+        location, settings.SOS_NEAREST_HOSPITALS, settings.SOS_HOSPITAL_RADIUS_KM
+    )
+    location = {**location, "nearest_hospitals": nearest_hospitals}
+
     # 1. Log the event
     new_alert = models.Alert(
         user_id=current_user.id,
@@ -23,14 +36,19 @@ def trigger_sos(location: dict, db: Session = Depends(database.get_db), current_
         location=location
     )
     db.add(new_alert)
-    db.commit()
+    await db.commit()
 
     # 2. Get emergency contacts
-    contacts = db.query(models.EmergencyContact).filter(models.EmergencyContact.user_id == current_user.id).all()
+    result = await db.execute(
+        select(models.EmergencyContact).where(models.EmergencyContact.user_id == current_user.id)
+    )
+    contacts = result.scalars().all()
     
     # 3. Send real notifications (email + optional SMS)
     logger.info(f"SOS TRIGGERED FOR USER {current_user.email} AT {location}")
-    notification_results = notify_emergency_contacts(
+    # SMS delivery is blocking network I/O; keep it off the event loop
+    notification_results = await run_in_threadpool(
+        notify_emergency_contacts,
         user=current_user,
         location=location,
         contacts=contacts
@@ -44,31 +62,38 @@ def trigger_sos(location: dict, db: Session = Depends(database.get_db), current_
         "message": "Emergency contacts notified and alert logged.",
         "notifications_sent": notification_results["success_count"],
         "notifications_failed": notification_results["failure_count"],
-        "contacts_notified": len(contacts)
+        "contacts_notified": len(contacts),
+        "nearest_hospitals": nearest_hospitals
     }
 
 @router.post("/contacts", response_model=schemas.EmergencyContactResponse)
-def add_contact(contact: schemas.EmergencyContactCreate, db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+async def add_contact(contact: schemas.EmergencyContactCreate, db: AsyncSession = Depends(database.get_async_db), current_user: Principal = Depends(get_current_principal)):
     new_contact = models.EmergencyContact(**contact.dict(), user_id=current_user.id)
     db.add(new_contact)
-    db.commit()
-    db.refresh(new_contact)
+    await bump_async(db, current_user.id, CONTACTS)
+    await db.commit()
+    await db.refresh(new_contact)
     return new_contact
 
-@router.get("/contacts", response_model=List[schemas.EmergencyContactResponse])
-def get_contacts(db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
-    return db.query(models.EmergencyContact).filter(models.EmergencyContact.user_id == current_user.id).all()
+@router.get("/contacts", response_model=List[schemas.EmergencyContactResponse], dependencies=[Depends(ResourceETag(CONTACTS))])
+async def get_contacts(db: AsyncSession = Depends(database.get_async_db), current_user: Principal = Depends(get_current_principal)):
+    result = await db.execute(
+        select(models.EmergencyContact).where(models.EmergencyContact.user_id == current_user.id)
+    )
+    return result.scalars().all()
 
 @router.delete("/contacts/{contact_id}")
-def delete_contact(contact_id: str, db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
-    contact = db.query(models.EmergencyContact).filter(
+async def delete_contact(contact_id: str, db: AsyncSession = Depends(database.get_async_db), current_user: Principal = Depends(get_current_principal)):
+    result = await db.execute(select(models.EmergencyContact).where(
         models.EmergencyContact.id == contact_id,
         models.EmergencyContact.user_id == current_user.id
-    ).first()
+    ))
+    contact = result.scalars().first()
     
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
         
-    db.delete(contact)
-    db.commit()
+    await db.delete(contact)
+    await bump_async(db, current_user.id, CONTACTS)
+    await db.commit()
     return {"message": "Contact deleted successfully"}
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from ..auth import Principal, get_current_principal
+from ..serialization import FastJSONRoute
+from ..services import export
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/export",
+    tags=["Export"],
+    route_class=FastJSONRoute
+)
+
+@router.get("", response_class=StreamingResponse)
+def export_record(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|zip)$"),
+    section: Optional[str] = Query(None, description="Required for csv: " + ", ".join(export.SECTION_NAMES)),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Streams the user's full health record as NDJSON, one section as CSV, or a
+    zip of the NDJSON record plus the original report files. Sent with chunked
+    transfer encoding while it is being read.
+    """
+    if format == "csv":
+        if section not in export.SECTION_NAMES:
+            raise HTTPException(status_code=400, detail=f"section must be one of: {', '.join(export.SECTION_NAMES)}")
+        body = export.stream_csv(current_user.id, section)
+    elif format == "zip":
+        body = export.stream_zip(current_user.id)
+    else:
+        body = export.stream_ndjson(current_user.id)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{export.filename(format, section)}"',
+        "Cache-Control": "no-store",
+        "X-Content-Type-Options": "nosniff",
+    }
+    return StreamingResponse(body, media_type=export.MEDIA_TYPES[format], headers=headers)
@@ -1,12 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from .. import models, schemas, database
-from ..auth import get_current_user
+from ..auth import Principal, get_current_principal
+from ..config import settings
+from ..cache import get_shared_cache
+from ..http_cache import PROFILE, REPORTS, VITALS, ResourceETag, bump, current_versions
+from ..serialization import FastJSONRoute, rows_response, schema_columns
+from ..query_budget import budget
+from ..rate_limit import LLMRateLimit, mark_cache_hit
+from ..services.facility_index import get_facility_index
+from ..services import llm, vitals_archive, vitals_import
+import logging
+import os
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/health",
-    tags=["Health"]
+    tags=["Health"],
+    route_class=FastJSONRoute
 )
 
 @router.get("")
@@ -15,7 +32,8 @@ def health_check():
     return {"status": "Active"}
 
 @router.post("/vitals")
-def add_vital(vitals_data: dict, db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+@budget(3)
+def add_vital(vitals_data: dict, db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
     """
     Handles vitals submission. 
     Frontend sends keys: heart_rate, blood_pressure, blood_sugar, weight, temperature
@@ -63,15 +81,21 @@ def add_vital(vitals_data: dict, db: Session = Depends(database.get_db), current
             )
             db.add(new_vital)
             
+    bump(db, current_user.id, VITALS)
     db.commit()
     return {"message": "Vitals recorded successfully"}
 
-@router.get("/vitals", response_model=List[schemas.VitalResponse])
-def get_vitals(db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
-    return db.query(models.Vital).filter(models.Vital.user_id == current_user.id).order_by(models.Vital.recorded_at.desc()).all()
+@router.get("/vitals", response_model=List[schemas.VitalResponse], dependencies=[Depends(ResourceETag(VITALS))])
+@budget(3)
+def get_vitals(response: Response, db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
+    # Plain column rows, encoded without building or re-validating ORM objects
+    rows = db.query(*schema_columns(models.Vital, schemas.VitalResponse)).filter(models.Vital.user_id == current_user.id).order_by(models.Vital.recorded_at.desc()).all()
+    # Older months live in the columnar archive
+    rows = vitals_archive.merged_newest_first(db, current_user.id, tuple(schemas.VitalResponse.model_fields), rows)
+    return rows_response(schemas.VitalResponse, rows, response.headers)
 
 @router.put("/profile", response_model=schemas.ProfileResponse)
-def update_profile(profile_update: schemas.ProfileUpdate, db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+def update_profile(profile_update: schemas.ProfileUpdate, db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
     profile = db.query(models.Profile).filter(models.Profile.user_id == current_user.id).first()
     if not profile:
         profile = models.Profile(user_id=current_user.id)
@@ -80,19 +104,22 @@ def update_profile(profile_update: schemas.ProfileUpdate, db: Session = Depends(
     for key, value in profile_update.dict(exclude_unset=True).items():
         setattr(profile, key, value)
     
+    bump(db, current_user.id, PROFILE)
     db.commit()
     db.refresh(profile)
     return profile
 
-@router.get("/profile", response_model=schemas.ProfileResponse)
-def get_profile(db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+@router.get("/profile", response_model=schemas.ProfileResponse, dependencies=[Depends(ResourceETag(PROFILE))])
+@budget(2)
+def get_profile(db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
     profile = db.query(models.Profile).filter(models.Profile.user_id == current_user.id).first()
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     return profile
 
 @router.get("/dashboard")
-def get_dashboard(db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+@budget(8)
+def get_dashboard(db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
     # Get latest of each vital category
     def get_latest(cat):
         return db.query(models.Vital).filter(
@@ -100,11 +127,14 @@ def get_dashboard(db: Session = Depends(database.get_db), current_user: models.U
             models.Vital.category == cat
         ).order_by(models.Vital.recorded_at.desc()).first()
 
-    latest_hr = get_latest("HR")
-    latest_bp = get_latest("BP")
-    latest_glucose = get_latest("Glucose")
-    latest_temp = get_latest("Temp")
-    latest_weight = get_latest("Weight")
+    latest = {cat: get_latest(cat) for cat in ("HR", "BP", "Glucose", "Temp", "Weight")}
+    # No recent reading: show the newest archived one
+    latest.update(vitals_archive.latest_archived(db, current_user.id, [c for c, v in latest.items() if v is None]))
+    latest_hr = latest["HR"]
+    latest_bp = latest["BP"]
+    latest_glucose = latest["Glucose"]
+    latest_temp = latest["Temp"]
+    latest_weight = latest["Weight"]
     
     # Get recent reports
     recent_reports = db.query(models.Report).filter(
@@ -191,37 +221,138 @@ def get_dashboard(db: Session = Depends(database.get_db), current_user: models.U
     }
 
 @router.patch("/vitals/{vital_id}", response_model=schemas.VitalResponse)
-def update_vital(vital_id: str, vital_update: schemas.VitalUpdate, db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+def update_vital(vital_id: str, vital_update: schemas.VitalUpdate, db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
     vital = db.query(models.Vital).filter(models.Vital.id == vital_id, models.Vital.user_id == current_user.id).first()
+    if not vital and vitals_archive.restore_containing(db, current_user.id, vital_id):
+        vital = db.query(models.Vital).filter(models.Vital.id == vital_id, models.Vital.user_id == current_user.id).first()
     if not vital:
         raise HTTPException(status_code=404, detail="Vital record not found")
     
     for key, value in vital_update.dict(exclude_unset=True).items():
         setattr(vital, key, value)
     
+    bump(db, current_user.id, VITALS)
     db.commit()
     db.refresh(vital)
     return vital
 
 @router.delete("/vitals/{vital_id}")
-def delete_vital(vital_id: str, db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+def delete_vital(vital_id: str, db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
     vital = db.query(models.Vital).filter(models.Vital.id == vital_id, models.Vital.user_id == current_user.id).first()
+    if not vital and vitals_archive.restore_containing(db, current_user.id, vital_id):
+        vital = db.query(models.Vital).filter(models.Vital.id == vital_id, models.Vital.user_id == current_user.id).first()
     if not vital:
         raise HTTPException(status_code=404, detail="Vital record not found")
     
     db.delete(vital)
+    bump(db, current_user.id, VITALS)
     db.commit()
     return {"message": "Vital deleted successfully"}
 
-@router.get("/recommendations")
-def get_recommendations(db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+@router.post("/imports", response_model=schemas.ImportJobResponse, status_code=202)
+async def start_import(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|fhir|fhir-ndjson)$"),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Bulk-import historical vitals. The request body is the file itself (CSV, a
+    FHIR Bundle or FHIR NDJSON, by Content-Type or ?format=), streamed to disk
+    and processed in the background; poll the returned job for progress.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or vitals_import.CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Send text/csv, application/fhir+json or application/fhir+ndjson")
+    try:
+        declared = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    # Rejects early; the streamed size is checked too, as the header can be absent (chunked) or wrong
+    if declared > settings.IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Import file is too large")
+
+    await db.execute(vitals_import.fail_stale(current_user.id))
+    await db.commit()
+    active = await db.execute(select(models.ImportJob.id).where(
+        models.ImportJob.user_id == current_user.id,
+        models.ImportJob.status.in_(vitals_import.ACTIVE),
+    ).limit(1))
+    if active.scalar() is not None:
+        raise HTTPException(status_code=409, detail="An import is already in progress")
+
+    job = models.ImportJob(id=models.generate_uuid(), user_id=current_user.id, format=fmt, status=vitals_import.QUEUED)
+    path = vitals_import.upload_path(job.id)
+    try:
+        with open(path, "wb") as f:
+            pending, pending_bytes = [], 0
+            async for chunk in request.stream():
+                job.size_bytes = (job.size_bytes or 0) + len(chunk)
+                if job.size_bytes > settings.IMPORT_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="Import file is too large")
+                pending.append(chunk)
+                pending_bytes += len(chunk)
+                if pending_bytes >= 1024 * 1024:
+                    await run_in_threadpool(f.write, b"".join(pending))
+                    pending, pending_bytes = [], 0
+            await run_in_threadpool(f.write, b"".join(pending))
+        if not job.size_bytes:
+            raise HTTPException(status_code=400, detail="Empty import file")
+    except BaseException:
+        os.remove(path)
+        raise
+
+    db.add(job)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another request started an import since the check above
+        await db.rollback()
+        os.remove(path)
+        raise HTTPException(status_code=409, detail="An import is already in progress")
+    await db.refresh(job)
+    vitals_import.submit(job.id)
+    return job
+
+@router.get("/imports/{job_id}", response_model=schemas.ImportJobResponse)
+@budget(1)
+def get_import(job_id: str, db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
+    job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id, models.ImportJob.user_id == current_user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return job
+
+def recommendations_cache(request: Request, db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    (cache key, cached recommendations or None). Runs before the rate limiter,
+    so a cached answer costs no rate-limit token.
+    """
+    from datetime import date
+
+    # The age in the prompt changes with the date, so the day is part of the key
+    versions = current_versions(db, current_user.id, (PROFILE, VITALS, REPORTS))
+    cache_key = f"recommendations:{current_user.id}:{date.today().isoformat()}:" + ":".join(str(v) for v in versions.values())
+    cached = get_shared_cache().get(cache_key)
+    if cached is not None:
+        mark_cache_hit(request)
+    return cache_key, cached
+
+@router.get("/recommendations", dependencies=[Depends(recommendations_cache), Depends(LLMRateLimit("health.recommendations"))])
+@budget(9)
+def get_recommendations(cache: tuple = Depends(recommendations_cache), db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_principal)):
     """
     Generate personalized health recommendations based on user's age, vitals and reports.
     Uses Gemini AI when API key is available, otherwise falls back to rule-based recommendations.
+    AI answers are cached for all workers until the profile, vitals or reports change.
     """
     from ..config import settings
     from datetime import datetime, date
     
+    cache_key, cached = cache
+    if cached is not None:
+        return cached
+    
     # Get user profile for age calculation
     profile = db.query(models.Profile).filter(models.Profile.user_id == current_user.id).first()
     
@@ -239,11 +370,13 @@ def get_recommendations(db: Session = Depends(database.get_db), current_user: mo
             models.Vital.category == cat
         ).order_by(models.Vital.recorded_at.desc()).first()
 
-    latest_hr = get_latest_vital("HR")
-    latest_bp = get_latest_vital("BP")
-    latest_glucose = get_latest_vital("Glucose")
-    latest_temp = get_latest_vital("Temp")
-    latest_weight = get_latest_vital("Weight")
+    latest = {cat: get_latest_vital(cat) for cat in ("HR", "BP", "Glucose", "Temp", "Weight")}
+    latest.update(vitals_archive.latest_archived(db, current_user.id, [c for c, v in latest.items() if v is None]))
+    latest_hr = latest["HR"]
+    latest_bp = latest["BP"]
+    latest_glucose = latest["Glucose"]
+    latest_temp = latest["Temp"]
+    latest_weight = latest["Weight"]
     
     # Get the most recent (newest) report only
     latest_report = db.query(models.Report).filter(
@@ -272,9 +405,6 @@ def get_recommendations(db: Session = Depends(database.get_db), current_user: mo
     # Try AI-powered recommendations
     if settings.GEMINI_API_KEY:
         try:
-            import google.generativeai as genai
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            
             age_str = f"{user_age} years old" if user_age else "Unknown age"
             gender_str = profile.gender if profile and profile.gender else "Unknown gender"
             vitals_str = ", ".join(vitals_summary) if vitals_summary else "No vitals recorded"
@@ -307,8 +437,7 @@ Guidelines:
 - Always include a hydration recommendation in diet
 """
             
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(prompt)
+            response = llm.generate(prompt)
             
             # Parse AI response
             import json
@@ -320,15 +449,17 @@ Guidelines:
             if json_match:
                 ai_recommendations = json.loads(json_match.group())
                 
-                return {
+                recommendations = {
                     "diet": ai_recommendations.get("diet", []),
                     "activity": ai_recommendations.get("activity", []),
                     "specialists": ai_recommendations.get("specialists", ["General Physician (Annual check-up)"]),
                     "disclaimer": "These AI-generated suggestions are personalized based on your recorded data and are for informational purposes only. Always consult a doctor for clinical diagnosis.",
                     "ai_powered": True
                 }
+                get_shared_cache().set(cache_key, recommendations, settings.RECOMMENDATIONS_CACHE_SECONDS)
+                return recommendations
         except Exception as e:
-            print(f"AI recommendations failed: {e}")
+            logger.warning(f"AI recommendations failed: {e}")
             # Fall through to rule-based recommendations
     
     # Fallback: Rule-based recommendations (existing logic)
@@ -396,35 +527,34 @@ Guidelines:
     }
 
 @router.get("/hospitals")
-def search_hospitals(city: str = "Local", query: str = None, db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+def search_hospitals(
+    city: str = "Local",
+    query: Optional[str] = None,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0),
+    specialty: Optional[str] = None,
+    emergency_only: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_principal)
+):
     """
-    Search for hospitals or doctors. 
-    In a real app, this would use Google Places API or a medical directory.
-    Returning mock data for demonstration.
+    Search the facility directory.
+    With lat/lng, returns the nearest facilities (optionally within radius_km) with distances;
+    otherwise returns filter matches, best rated first. city="Local" means no city filter.
     """
-    all_facilities = [
-        {"id": "1", "name": "City General Hospital", "type": "Hospital", "specialty": "General", "rating": 4.5, "address": "123 Healthcare Ave", "city": "New York"},
-        {"id": "2", "name": "Heart Care Institute", "type": "Specialty Center", "specialty": "Cardiology", "rating": 4.8, "address": "45 Cardia Lane", "city": "Los Angeles"},
-        {"id": "3", "name": "Diabetes & Metabolism Clinic", "type": "Clinic", "specialty": "Endocrinology", "rating": 4.6, "address": "78 Sugar St", "city": "Chicago"},
-        {"id": "4", "name": "Dr. Smith's Family Practice", "type": "Private Clinic", "specialty": "General Physician", "rating": 4.9, "address": "90 Wellness Blvd", "city": "New York"},
-        {"id": "5", "name": "Central Diagnostic Lab", "type": "Diagnostic", "specialty": "Pathology", "rating": 4.2, "address": "12 Test Rd", "city": "Houston"},
-        {"id": "6", "name": "Mumbai City Hospital", "type": "Hospital", "specialty": "General", "rating": 4.7, "address": "Marine Drive", "city": "Mumbai"},
-        {"id": "7", "name": "Delhi Heart Center", "type": "Specialty Center", "specialty": "Cardiology", "rating": 4.5, "address": "Connaught Place", "city": "Delhi"},
-        {"id": "8", "name": "Bangalore Wellness Clinic", "type": "Clinic", "specialty": "General", "rating": 4.6, "address": "Indiranagar", "city": "Bangalore"}
-    ]
-    
-    if query:
-        query = query.lower()
-        results = [
-            f for f in all_facilities 
-            if query in f['name'].lower() 
-            or query in f['specialty'].lower() 
-            or query in f['address'].lower()
-            or query in f['city'].lower()
-        ]
-    else:
-        results = all_facilities
-        
-    return {"results": results, "city": city}
+    index = get_facility_index()
+    city_filter = None if not city or city == "Local" else city
 
+    if lat is not None and lng is not None:
+        results = index.nearest(
+            lat, lng, k=limit, radius_km=radius_km, specialty=specialty,
+            query=query, city=city_filter, emergency_only=emergency_only
+        )
+    else:
+        results = index.search(
+            specialty=specialty, query=query, city=city_filter,
+            emergency_only=emergency_only, limit=limit
+        )
 
+    return {"results": results, "city": city}
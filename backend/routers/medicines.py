@@ -1,26 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime, timedelta
 
-from ..database import get_db
-from ..models import User, Medicine, Alert
-from ..schemas import MedicineCreate, MedicineResponse, MedicineUpdateStatus
-from ..auth import get_current_user
+from ..database import get_async_db
+from ..models import Medicine, Alert
+from ..schemas import (
+    MedicineCreate, MedicineResponse, MedicineUpdateStatus, ScannedMedicine, DrugMatch,
+    MedicineAddedResponse, InteractionReport
+)
+from ..auth import Principal, get_current_principal
+from ..http_cache import MEDICINES, ResourceETag, bump_async
+from ..query_budget import budget
+from ..rate_limit import LLMRateLimit
+from ..serialization import FastJSONRoute
 from ..services.gemini_vision import parse_prescription
 from ..services.price_services import search_medicine_prices
+from ..services.drug_search import get_drug_index
+from ..services.interactions import check_medicine_names, canonical_drug_id
+from ..services.facility_index import nearest_emergency_hospitals
+from ..config import settings
 from ..services.alerts import escalate_missed_medicine, trigger_emergency_alert
 
-router = APIRouter(prefix="/api/medicines", tags=["Medicines"])
+router = APIRouter(prefix="/api/medicines", tags=["Medicines"], route_class=FastJSONRoute)
 
-@router.post("/scan", response_model=List[MedicineCreate])
+async def get_user_medicine_names(db: AsyncSession, user_id: str) -> List[str]:
+    result = await db.execute(select(Medicine.name).where(Medicine.user_id == user_id))
+    return list(result.scalars())
+
+@router.post("/scan", response_model=List[ScannedMedicine], dependencies=[Depends(LLMRateLimit("medicines.scan", user="5/minute"))])
 async def scan_prescription(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Uploads a prescription image and returns extracted medicines.
+    Uploads a prescription image and returns extracted medicines,
+    each resolved against the drug catalog where possible.
     Does NOT save to DB automatically; frontend should confirm first.
     """
     if not file.content_type.startswith("image/"):
@@ -32,6 +49,7 @@ async def scan_prescription(
         
         # Convert JSON dicts to schemas to validate, optimizing schedule_time
         results = []
+        drug_index = get_drug_index()
         today = datetime.now().date()
         for m in medicines_data:
              # Basic handling of time hint to create a datetime object for 'today'
@@ -48,12 +66,29 @@ async def scan_prescription(
                 except:
                     pass
             
-            results.append(MedicineCreate(
+            match = drug_index.resolve(m["name"])
+            results.append(ScannedMedicine(
                 name=m["name"],
                 dosage=m.get("dosage"),
                 timing=m.get("timing"),
-                schedule_time=schedule_dt
+                schedule_time=schedule_dt,
+                canonical_id=match["id"] if match else None,
+                canonical_name=match["name"] if match else None,
+                strength=match["strength"] if match else None,
+                match_score=match["score"] if match else None
             ))
+
+        # Check the scanned medicines against each other and the user's current list
+        scanned_ids = {r.canonical_id for r in results if r.canonical_id}
+        warnings = check_medicine_names(
+            await get_user_medicine_names(db, current_user.id) + [r.name for r in results]
+        )
+        for r in results:
+            r.interactions = [
+                w for w in warnings
+                if r.canonical_id in (w["drug_a"], w["drug_b"])
+                and (w["drug_a"] in scanned_ids or w["drug_b"] in scanned_ids)
+            ]
         return results
 
     except ValueError as e:
@@ -61,36 +96,64 @@ async def scan_prescription(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
-@router.post("/", response_model=MedicineResponse)
-def add_medicine(
+@router.post("/", response_model=MedicineAddedResponse)
+async def add_medicine(
     medicine: MedicineCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     db_medicine = Medicine(
         **medicine.dict(),
         user_id=current_user.id
     )
     db.add(db_medicine)
-    db.commit()
-    db.refresh(db_medicine)
-    return db_medicine
+    await bump_async(db, current_user.id, MEDICINES)
+    await db.commit()
+    await db.refresh(db_medicine)
+
+    # Report interactions between the new medicine and the rest of the user's list
+    drug_id = canonical_drug_id(db_medicine.name)
+    warnings = [
+        w for w in check_medicine_names(await get_user_medicine_names(db, current_user.id))
+        if drug_id in (w["drug_a"], w["drug_b"])
+    ] if drug_id else []
+    return MedicineAddedResponse(
+        **MedicineResponse.model_validate(db_medicine).model_dump(),
+        interactions=warnings
+    )
 
-@router.get("/", response_model=List[MedicineResponse])
-def get_medicines(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get("/interactions", response_model=InteractionReport)
+async def get_interactions(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return db.query(Medicine).filter(Medicine.user_id == current_user.id).order_by(Medicine.schedule_time).all()
+    """
+    Checks all of the user's medicines against each other for known interactions.
+    """
+    return {"warnings": check_medicine_names(await get_user_medicine_names(db, current_user.id))}
+
+@router.get("/", response_model=List[MedicineResponse], dependencies=[Depends(ResourceETag(MEDICINES))])
+@budget(2)
+async def get_medicines(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.execute(
+        select(Medicine).where(Medicine.user_id == current_user.id).order_by(Medicine.schedule_time)
+    )
+    return result.scalars().all()
 
 @router.patch("/{medicine_id}/status", response_model=MedicineResponse)
-def update_medicine_status(
+async def update_medicine_status(
     medicine_id: str,
     update: MedicineUpdateStatus,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    medicine = db.query(Medicine).filter(Medicine.id == medicine_id, Medicine.user_id == current_user.id).first()
+    result = await db.execute(
+        select(Medicine).where(Medicine.id == medicine_id, Medicine.user_id == current_user.id)
+    )
+    medicine = result.scalars().first()
     if not medicine:
         raise HTTPException(status_code=404, detail="Medicine not found")
     
@@ -100,52 +163,72 @@ def update_medicine_status(
     elif update.status == "Taken":
         medicine.taken_at = datetime.now()
         
-    db.commit()
-    db.refresh(medicine)
+    await bump_async(db, current_user.id, MEDICINES)
+    await db.commit()
+    await db.refresh(medicine)
     return medicine
 
 @router.post("/simulate-missed")
 async def simulate_missed_dose(
     medicine_id: str = None, # Optional, if None pick first scheduled
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Simulates a missed dose event -> Changes status to Escalated -> Triggers Alert
     """
     if medicine_id:
-        medicine = db.query(Medicine).filter(Medicine.id == medicine_id, Medicine.user_id == current_user.id).first()
+        query = select(Medicine).where(Medicine.id == medicine_id, Medicine.user_id == current_user.id)
     else:
-        medicine = db.query(Medicine).filter(Medicine.user_id == current_user.id, Medicine.status == "Scheduled").first()
+        query = select(Medicine).where(Medicine.user_id == current_user.id, Medicine.status == "Scheduled")
+    medicine = (await db.execute(query)).scalars().first()
     
     if not medicine:
         return {"message": "No scheduled medicine found to simulate."}
     
     medicine.status = "Escalated"
-    db.commit()
+    await bump_async(db, current_user.id, MEDICINES)
+    await db.commit()
     
     # Trigger Alert
     await escalate_missed_medicine(current_user.id, medicine.name)
     
     return {"message": f"Simulated missed dose for {medicine.name}. Status escalated and Admin alerted."}
 
+@router.get("/search", response_model=List[DrugMatch])
+def search_drugs(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Autocomplete over the drug catalog; tolerates misspellings and brand names.
+    """
+    return get_drug_index().autocomplete(q, limit)
+
 @router.get("/compare-prices")
 async def compare_medicines(
     name: str,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    return await search_medicine_prices(name)
+    # Brand names and misspellings share the canonical drug's price entry
+    match = get_drug_index().resolve(name)
+    return await search_medicine_prices(match["name"] if match else name)
     
 @router.post("/sos")
 async def trigger_sos(
     location: dict = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Triggers SOS Alert
     """
     msg = f"SOS Triggered by {current_user.full_name} ({current_user.email})!"
+    nearest_hospitals = nearest_emergency_hospitals(
+        location, settings.SOS_NEAREST_HOSPITALS, settings.SOS_HOSPITAL_RADIUS_KM
+    )
+    location = {**(location or {}), "nearest_hospitals": nearest_hospitals}
     await trigger_emergency_alert(current_user.id, msg, location)
     
     # Save to DB
@@ -156,6 +239,6 @@ async def trigger_sos(
         location=location
     )
     db.add(alert)
-    db.commit()
+    await db.commit()
     
-    return {"status": "SOS Alert Sent", "message": msg}
+    return {"status": "SOS Alert Sent", "message": msg, "nearest_hospitals": nearest_hospitals}
@@ -6,8 +6,14 @@ from datetime import datetime
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None # Access token lifetime, seconds
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
+    user_id: Optional[str] = None
     email: Optional[str] = None
 
 # Profile
@@ -75,6 +81,30 @@ class ReportResponse(BaseModel):
     summary: Optional[str] = None
     risk_level: Optional[str] = None
     created_at: datetime
+    file_name: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class ReportFileURL(BaseModel):
+    url: str
+    expires_at: datetime
+
+# Vitals Import
+class ImportJobResponse(BaseModel):
+    id: str
+    format: str
+    status: str
+    size_bytes: int
+    bytes_processed: int
+    rows_imported: int
+    rows_skipped: int
+    rows_rejected: int
+    errors: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -100,6 +130,31 @@ class MedicineCreate(BaseModel):
     timing: Optional[str] = None
     schedule_time: Optional[datetime] = None
 
+class InteractionWarning(BaseModel):
+    drug_a: str
+    drug_b: str
+    medicine_a: str
+    medicine_b: str
+    severity: str # major, moderate, minor
+    description: str
+
+class InteractionReport(BaseModel):
+    warnings: List[InteractionWarning]
+
+class ScannedMedicine(MedicineCreate):
+    canonical_id: Optional[str] = None
+    canonical_name: Optional[str] = None
+    strength: Optional[str] = None
+    match_score: Optional[float] = None
+    interactions: List[InteractionWarning] = []
+
+class DrugMatch(BaseModel):
+    id: str
+    name: str
+    drug_class: Optional[str] = None
+    matched: str
+    score: float
+
 class MedicineUpdateStatus(BaseModel):
     status: str # Taken, Escalated, Missed
     taken_at: Optional[datetime] = None
@@ -114,3 +169,6 @@ class MedicineResponse(MedicineCreate):
     class Config:
         from_attributes = True
 
+class MedicineAddedResponse(MedicineResponse):
+    interactions: List[InteractionWarning] = []
+
@@ -0,0 +1,396 @@
+"""
+Synthetic data generator for scale testing.
+
+Bulk-generates users with profiles, years of vitals time series, analysed
+reports, medicine schedules, emergency contacts and SOS alerts. Every user's
+data comes from its own RNG seeded with (--seed, user number), so a run is
+reproducible regardless of batch size or worker count, and a database can be
+grown later with --start.
+
+Rows are generated as tuples in table column order and written with the
+fastest path the database offers: COPY on PostgreSQL (one connection per
+worker), executemany with syncing relaxed on SQLite, where worker processes
+only generate and a single writer inserts.
+
+Usage (from the repository root, after python -m backend.migrate):
+    python -m backend.seed --users 1000 --vitals 2000
+    DATABASE_URL=postgresql://... python -m backend.seed --users 100000 --vitals 500 --workers 8
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import math
+import multiprocessing
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import create_engine
+
+from .config import BASE_DIR, settings
+
+logger = logging.getLogger(__name__)
+
+SEED_PASSWORD = "synthetic-password"
+DEFAULT_END = datetime(2026, 1, 1)
+
+# Column order of the generated tuples; checked against the models at startup
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "users": ("id", "email", "hashed_password", "full_name", "role", "created_at"),
+    "profiles": ("id", "user_id", "dob", "gender", "height", "weight", "blood_type"),
+    "vitals": ("id", "user_id", "category", "value_primary", "value_secondary", "unit", "notes", "recorded_at"),
+    "reports": ("id", "user_id", "file_url", "file_type", "analysis_result", "summary", "risk_level", "created_at",
+                "file_name", "thumbnail_url"),
+    "medicines": ("id", "user_id", "name", "dosage", "timing", "schedule_time", "status", "taken_at", "created_at"),
+    "emergency_contacts": ("id", "user_id", "name", "relationship", "phone_number", "email"),
+    "alerts": ("id", "user_id", "type", "message", "location", "created_at"),
+}
+JSON_COLUMNS = {("reports", "analysis_result"), ("alerts", "location")}
+DATETIME_COLUMNS = {("users", "created_at"), ("profiles", "dob"), ("vitals", "recorded_at"),
+                    ("reports", "created_at"), ("medicines", "schedule_time"), ("medicines", "taken_at"),
+                    ("medicines", "created_at"), ("alerts", "created_at")}
+UUID_COLUMNS = {("vitals", "id")}  # 16 bytes on SQLite, uuid text for PostgreSQL's COPY
+CATEGORY_COLUMNS = {("vitals", "category")}  # models.VITAL_CATEGORIES codes
+GENERATED_COLUMNS = {("vitals", "pk")}  # Filled in by the database
+
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Ananya", "Vikram", "Sneha", "Arjun", "Kavya", "Rohan", "Meera",
+               "James", "Maria", "David", "Sarah", "Michael", "Emma", "Daniel", "Olivia", "Wei", "Fatima"]
+LAST_NAMES = ["Sharma", "Patel", "Iyer", "Reddy", "Gupta", "Nair", "Singh", "Das", "Khan", "Joshi",
+              "Smith", "Garcia", "Johnson", "Brown", "Chen", "Williams", "Lee", "Martin", "Ali", "Kumar"]
+RELATIONSHIPS = ["Spouse", "Parent", "Sibling", "Child", "Friend"]
+BLOOD_TYPES = ["O+", "A+", "B+", "AB+", "O-", "A-", "B-", "AB-"]
+BLOOD_TYPE_WEIGHTS = [38, 30, 20, 5, 3, 2, 1, 1]
+TIMINGS = [("Morning", 8), ("Afternoon", 14), ("Night", 20), ("After food", 13), ("Before bed", 22)]
+DOSAGES = ["5mg", "10mg", "25mg", "50mg", "100mg", "250mg", "500mg", "650mg", "1g"]
+CITIES = [(19.0760, 72.8777), (28.6139, 77.2090), (12.9716, 77.5946), (40.7128, -74.0060),
+          (34.0522, -118.2437), (41.8781, -87.6298), (29.7604, -95.3698)]
+
+# marker, unit, low, high, typical mean, spread
+LAB_MARKERS = [
+    ("Hemoglobin", "g/dL", 12.0, 17.5, 14.0, 1.5),
+    ("WBC Count", "x10^3/uL", 4.0, 11.0, 7.0, 2.0),
+    ("Platelets", "x10^3/uL", 150, 450, 260, 60),
+    ("Fasting Glucose", "mg/dL", 70, 100, 98, 18),
+    ("HbA1c", "%", 4.0, 5.7, 5.6, 0.8),
+    ("Total Cholesterol", "mg/dL", 125, 200, 190, 35),
+    ("LDL", "mg/dL", 0, 100, 110, 30),
+    ("HDL", "mg/dL", 40, 90, 50, 12),
+    ("Triglycerides", "mg/dL", 0, 150, 140, 50),
+    ("Creatinine", "mg/dL", 0.6, 1.3, 0.95, 0.2),
+    ("TSH", "mIU/L", 0.4, 4.0, 2.2, 1.0),
+    ("Vitamin D", "ng/mL", 30, 100, 28, 10),
+]
+
+# Share of readings per category, as logged by a typical user
+VITAL_MIX = [("BP", 0.30), ("HR", 0.25), ("Glucose", 0.20), ("Weight", 0.15), ("Temp", 0.10)]
+
+
+def user_email(n: int) -> str:
+    return f"user{n}@synthetic.arodoc.test"
+
+
+def load_medicine_names() -> List[str]:
+    path = Path(BASE_DIR) / settings.DRUG_CATALOG_PATH
+    try:
+        with open(path) as f:
+            return [d["name"] for d in json.load(f)]
+    except OSError:
+        return ["Paracetamol", "Metformin", "Amlodipine", "Atorvastatin", "Levothyroxine"]
+
+
+class SyntheticDataGenerator:
+    """
+    Generates all rows for one user at a time. Output depends only on
+    (seed, user number) and the generator parameters.
+    """
+
+    def __init__(self, seed: int = 42, vitals_per_user: int = 500, reports_per_user: int = 4,
+                 medicines_per_user: int = 3, years: float = 3.0, end: datetime = DEFAULT_END,
+                 password_hash: str = "", medicine_names: Optional[List[str]] = None):
+        self.seed = seed
+        self.vitals_per_user = vitals_per_user
+        self.reports_per_user = reports_per_user
+        self.medicines_per_user = medicines_per_user
+        self.span_seconds = years * 365.25 * 86400
+        self.end = end
+        self.password_hash = password_hash
+        self.medicine_names = medicine_names or load_medicine_names()
+
+    @staticmethod
+    def _uuid(rng: random.Random) -> str:
+        """Random version-4 UUID string, formatted directly (uuid.UUID is several times slower)."""
+        h = "%032x" % rng.getrandbits(128)
+        return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+
+    def user(self, n: int) -> Dict[str, List[tuple]]:
+        rng = random.Random(self.seed * 1_000_003 + n)
+        uid = self._uuid(rng)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        joined = self.end - timedelta(seconds=self.span_seconds * (0.9 + rng.random() * 0.1))
+        age = rng.randint(18, 85)
+        gender = rng.choice(("Male", "Female"))
+        height = rng.gauss(172 if gender == "Male" else 159, 7)
+        weight = max(40.0, rng.gauss(24.5, 4) * (height / 100) ** 2)
+
+        rows = {
+            "users": [(uid, user_email(n), self.password_hash, f"{first} {last}", "user", joined)],
+            "profiles": [(self._uuid(rng), uid, self.end - timedelta(days=age * 365 + rng.randint(0, 364)),
+                          gender, round(height, 1), round(weight, 1),
+                          rng.choices(BLOOD_TYPES, BLOOD_TYPE_WEIGHTS)[0])],
+        }
+        rows["vitals"] = self._vitals(rng, uid, joined, age, weight)
+        rows["reports"] = self._reports(rng, uid, joined)
+        rows["medicines"] = self._medicines(rng, uid, joined)
+        rows["emergency_contacts"] = [
+            (self._uuid(rng), uid, f"{rng.choice(FIRST_NAMES)} {last}", rng.choice(RELATIONSHIPS),
+             f"+91{rng.randint(7000000000, 9999999999)}", None)
+            for _ in range(rng.randint(1, 3))
+        ]
+        rows["alerts"] = self._alerts(rng, uid, joined, f"{first} {last}")
+        return rows
+
+    def _vitals(self, rng: random.Random, uid: str, joined: datetime, age: int, weight: float) -> List[tuple]:
+        """Per-user baselines with slow drift, a daily rhythm and measurement noise."""
+        hypertensive = rng.random() < min(0.6, age / 120)
+        diabetic = rng.random() < min(0.35, age / 200)
+        base_sys = rng.gauss(138 if hypertensive else 118, 6)
+        base_dia = base_sys * rng.uniform(0.6, 0.68)
+        base_hr = rng.gauss(72, 7)
+        base_glucose = rng.gauss(150 if diabetic else 95, 12)
+        base_temp = rng.gauss(98.2, 0.25)
+        drift = rng.gauss(0, 3) / max(self.span_seconds, 1)  # kg per second over the whole span
+
+        span = (self.end - joined).total_seconds()
+        offsets = sorted(rng.random() * span for _ in range(self.vitals_per_user))
+        categories = rng.choices([c for c, _ in VITAL_MIX], [w for _, w in VITAL_MIX], k=self.vitals_per_user)
+        gauss, uid4 = rng.gauss, self._uuid
+        out = []
+        for offset, category in zip(offsets, categories):
+            at = joined + timedelta(seconds=offset)
+            rhythm = math.sin((at.hour - 6) / 24 * 2 * math.pi)
+            secondary = None
+            if category == "BP":
+                primary = round(base_sys + 6 * rhythm + gauss(0, 7))
+                secondary = round(base_dia + 4 * rhythm + gauss(0, 5))
+            elif category == "HR":
+                primary = round(base_hr + 6 * rhythm + gauss(0, 6))
+            elif category == "Glucose":
+                primary = round(max(55.0, base_glucose + gauss(0, 18)))
+            elif category == "Weight":
+                primary = round(weight + drift * offset + gauss(0, 0.4), 1)
+            else:
+                primary = round(base_temp + 0.3 * rhythm + gauss(0, 0.3), 1)
+            # unit None: the category's standard unit (models.CATEGORY_UNITS)
+            out.append((uid4(rng), uid, category, float(primary),
+                        float(secondary) if secondary is not None else None, None, None, at))
+        return out
+
+    def _reports(self, rng: random.Random, uid: str, joined: datetime) -> List[tuple]:
+        out = []
+        span = (self.end - joined).total_seconds()
+        for _ in range(self.reports_per_user):
+            findings, abnormal = [], 0
+            for marker, unit, low, high, mean, spread in rng.sample(LAB_MARKERS, rng.randint(3, 8)):
+                value = round(max(0.0, rng.gauss(mean, spread)), 1)
+                status = "LOW" if value < low else "HIGH" if value > high else "NORMAL"
+                abnormal += status != "NORMAL"
+                findings.append({"marker": marker, "value": f"{value} {unit}", "status": status})
+            risk = "GREEN" if abnormal == 0 else "YELLOW" if abnormal <= 2 else "RED"
+            summary = ("All measured markers are within reference ranges." if risk == "GREEN" else
+                       f"{abnormal} marker(s) outside reference range: "
+                       + ", ".join(f["marker"] for f in findings if f["status"] != "NORMAL") + ".")
+            report_id = self._uuid(rng)
+            out.append((report_id, uid, f"backend/uploads/{report_id}_report.pdf", "application/pdf",
+                        findings, summary, risk, joined + timedelta(seconds=rng.random() * span), "report.pdf", None))
+        return out
+
+    def _medicines(self, rng: random.Random, uid: str, joined: datetime) -> List[tuple]:
+        out = []
+        for name in rng.sample(self.medicine_names, min(self.medicines_per_user, len(self.medicine_names))):
+            timing, hour = rng.choice(TIMINGS)
+            schedule = self.end.replace(hour=hour, minute=0) + timedelta(days=rng.randint(0, 1))
+            status = rng.choices(("Scheduled", "Taken", "Missed"), (70, 25, 5))[0]
+            taken_at = schedule - timedelta(days=1) + timedelta(minutes=rng.randint(0, 90)) if status == "Taken" else None
+            created = joined + timedelta(days=rng.randint(0, 30))
+            out.append((self._uuid(rng), uid, name, rng.choice(DOSAGES), timing, schedule, status, taken_at, created))
+        return out
+
+    def _alerts(self, rng: random.Random, uid: str, joined: datetime, full_name: str) -> List[tuple]:
+        out = []
+        span = (self.end - joined).total_seconds()
+        for _ in range(rng.choices((0, 1, 2), (85, 12, 3))[0]):
+            lat, lng = rng.choice(CITIES)
+            location = {"latitude": round(lat + rng.uniform(-0.2, 0.2), 5),
+                        "longitude": round(lng + rng.uniform(-0.2, 0.2), 5)}
+            out.append((self._uuid(rng), uid, "SOS", f"SOS Triggered by {full_name}", location,
+                        joined + timedelta(seconds=rng.random() * span)))
+        return out
+
+
+# --- Writers --------------------------------------------------------------------
+
+def check_columns():
+    """Fail fast if the models no longer match the generated tuples."""
+    from . import models
+
+    for table_name, columns in COLUMNS.items():
+        actual = tuple(c.name for c in models.Base.metadata.tables[table_name].columns
+                       if (table_name, c.name) not in GENERATED_COLUMNS)
+        if actual != columns:
+            raise RuntimeError(f"Seeder columns for {table_name} are out of date: {actual}")
+
+
+def _converted(table: str, rows: List[tuple], format_datetime, format_uuid) -> Iterable[list]:
+    """Rows with JSON columns serialized, datetimes and UUIDs formatted for the driver and categories coded."""
+    from .models import VITAL_CATEGORIES
+
+    columns = COLUMNS[table]
+    json_idx = [i for i, c in enumerate(columns) if (table, c) in JSON_COLUMNS]
+    dt_idx = [i for i, c in enumerate(columns) if (table, c) in DATETIME_COLUMNS]
+    uuid_idx = [i for i, c in enumerate(columns) if (table, c) in UUID_COLUMNS]
+    category_idx = [i for i, c in enumerate(columns) if (table, c) in CATEGORY_COLUMNS]
+    for row in rows:
+        row = list(row)
+        for i in json_idx:
+            row[i] = json.dumps(row[i])
+        for i in dt_idx:
+            if row[i] is not None:
+                row[i] = format_datetime(row[i])
+        for i in uuid_idx:
+            row[i] = format_uuid(row[i])
+        for i in category_idx:
+            row[i] = VITAL_CATEGORIES[row[i]]
+        yield row
+
+
+def write_sqlite(raw_connection, table: str, rows: List[tuple]):
+    columns = COLUMNS[table]
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    cursor = raw_connection.cursor()
+    # Same text format SQLAlchemy's SQLite DateTime type stores
+    cursor.executemany(sql, _converted(table, rows, lambda dt: dt.isoformat(" "), lambda u: uuid.UUID(u).bytes))
+    cursor.close()
+
+
+def write_postgres(raw_connection, table: str, rows: List[tuple]):
+    columns = COLUMNS[table]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in _converted(table, rows, lambda dt: dt.isoformat() + "+00:00", str):
+        writer.writerow(["\\N" if v is None else v for v in row])
+    buffer.seek(0)
+    cursor = raw_connection.cursor()
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+    cursor.close()
+
+
+def generate_batch(job) -> Dict[str, List[tuple]]:
+    """Rows for users [start, stop), grouped by table."""
+    generator, start, stop = job
+    batch: Dict[str, List[tuple]] = {table: [] for table in COLUMNS}
+    for n in range(start, stop):
+        for table, rows in generator.user(n).items():
+            batch[table].extend(rows)
+    return batch
+
+
+def write_batches(url: str, batches: Iterable[Dict[str, List[tuple]]]) -> Dict[str, int]:
+    """Insert batches over one raw connection, committing per batch; returns row counts."""
+    engine = create_engine(url)
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        raise ValueError(f"Unsupported database for seeding: {dialect}")
+    write = write_sqlite if dialect == "sqlite" else write_postgres
+    counts = {table: 0 for table in COLUMNS}
+
+    raw = engine.raw_connection()
+    try:
+        if dialect == "sqlite":
+            cursor = raw.cursor()
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA foreign_keys=OFF")
+            cursor.close()
+        for batch in batches:
+            for table in COLUMNS:  # parents first
+                if batch[table]:
+                    write(raw, table, batch[table])
+                    counts[table] += len(batch[table])
+            raw.commit()
+    finally:
+        raw.close()
+        engine.dispose()
+    return counts
+
+
+def _seed_worker(job) -> Dict[str, int]:
+    url, jobs = job
+    return write_batches(url, map(generate_batch, jobs))
+
+
+def seed(url: str, users: int, start: int = 0, workers: int = 1, batch_users: int = 500,
+         **generator_options) -> Dict[str, int]:
+    """
+    Seed users [start, start + users) into url.
+    PostgreSQL: each worker generates and COPYs its own share of the users.
+    SQLite: workers only generate; batches are written in order by this process.
+    """
+    from .auth import get_password_hash
+
+    check_columns()
+    generator = SyntheticDataGenerator(password_hash=get_password_hash(SEED_PASSWORD), **generator_options)
+    stop = start + users
+    jobs = [(generator, s, min(stop, s + batch_users)) for s in range(start, stop, batch_users)]
+    workers = max(1, min(workers, len(jobs)))
+
+    if workers == 1:
+        return write_batches(url, map(generate_batch, jobs))
+
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        if url.startswith("sqlite"):
+            return write_batches(url, pool.imap(generate_batch, jobs))
+        shares = [(url, jobs[i::workers]) for i in range(workers)]
+        results = pool.map(_seed_worker, shares)
+
+    totals = {table: 0 for table in COLUMNS}
+    for counts in results:
+        for table, n in counts.items():
+            totals[table] += n
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-generate deterministic synthetic data")
+    parser.add_argument("--url", default=None, help="Database URL (default: DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--start", type=int, default=0, help="First user number, to grow an existing dataset")
+    parser.add_argument("--vitals", type=int, default=500, help="Vitals per user")
+    parser.add_argument("--reports", type=int, default=4, help="Reports per user")
+    parser.add_argument("--medicines", type=int, default=3, help="Medicines per user")
+    parser.add_argument("--years", type=float, default=3.0, help="History length")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--batch-users", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    totals = seed(
+        args.url or settings.DATABASE_URL, args.users, start=args.start, workers=args.workers,
+        batch_users=args.batch_users, seed=args.seed, vitals_per_user=args.vitals,
+        reports_per_user=args.reports, medicines_per_user=args.medicines, years=args.years,
+    )
+    elapsed = time.perf_counter() - started
+    rows = sum(totals.values())
+    logger.info(f"Seeded {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s): {totals}")
+    logger.info(f"Users log in as {user_email(args.start)} .. with password '{SEED_PASSWORD}'")
+
+
+if __name__ == "__main__":
+    main()
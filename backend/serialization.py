@@ -0,0 +1,79 @@
+"""
+JSON encoding for API responses.
+
+FastJSONResponse renders through orjson (stdlib json when orjson is not
+installed). Routers use FastJSONRoute, which makes it the response class of
+every route without a response_model. Routes with a response_model keep
+FastAPI's own path, which dumps the validated model straight to JSON bytes in
+pydantic-core; re-encoding it through orjson would be slower.
+
+Routes that declare a response_model still validate everything they return
+against it, which for a list of ORM objects means loading full entities and
+then re-validating each of them. For the large per-user lists, the route
+instead selects exactly the schema's columns (schema_columns) and hands the
+rows to rows_response, which encodes them directly. The response_model stays
+on the route for the OpenAPI docs. The output is byte-for-byte what pydantic
+would produce, which benchmarks/serialization.py checks.
+"""
+
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Optional, Type
+
+from fastapi.datastructures import Default, DefaultPlaceholder
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+# UTC as "Z" matches pydantic's datetime serialization
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat().replace("+00:00", "Z")
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRoute(APIRoute):
+    """Route class (APIRouter(route_class=...)) that defaults model-less routes to FastJSONResponse."""
+
+    def get_route_handler(self):
+        if self.response_field is None and isinstance(self.response_class, DefaultPlaceholder):
+            self.response_class = Default(FastJSONResponse)
+        return super().get_route_handler()
+
+
+@lru_cache(maxsize=None)
+def schema_columns(model, schema: Type[BaseModel]) -> tuple:
+    """The model's columns for each field of a flat response schema, in field order."""
+    return tuple(getattr(model, field) for field in schema.model_fields)
+
+
+def rows_response(schema: Type[BaseModel], rows: Iterable, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """
+    Encode rows selected with schema_columns(model, schema) without re-validation.
+    Pass the injected Response's headers along, since FastAPI does not merge them
+    into a Response returned by the route.
+    """
+    fields = tuple(schema.model_fields)
+    return Response(dumps([dict(zip(fields, row)) for row in rows]), media_type="application/json", headers=headers)
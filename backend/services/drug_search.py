@@ -0,0 +1,322 @@
+"""
+Fuzzy medicine-name search over the local drug catalog.
+
+Names coming from prescription scans are often misspelled, carry a strength
+("Dolo 650mg") or a dosage form ("Tab."), or use a brand instead of the generic.
+The index normalizes those away and finds candidates on character trigrams,
+then reranks them by edit distance as well, since a single transposed or
+dropped letter ("Metfromin") breaks several trigrams at once. Resolution and
+autocomplete stay sub-millisecond on large catalogs.
+
+Build a prebuilt index file with:
+    python -m backend.services.drug_search backend/data/drug_catalog.json backend/data/drug_index.pkl
+"""
+
+import json
+import logging
+import os
+import pickle
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+
+from ..config import BASE_DIR, settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+DOSAGE_FORMS = {
+    "tab", "tabs", "tablet", "tablets", "cap", "caps", "capsule", "capsules",
+    "syp", "syrup", "susp", "suspension", "inj", "injection", "cream", "ointment",
+    "gel", "drops", "drop", "inhaler", "spray", "sachet", "powder", "solution",
+    "sr", "er", "xr", "cr", "mr", "dt", "od", "forte",
+}
+STRENGTH_RE = re.compile(r"\b\d+(?:\.\d+)?\s*(?:mg|mcg|µg|g|ml|iu|units?|%)(?:\s*/\s*\d*\s*(?:ml|g))?\b")
+BARE_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+# Queries whose candidates score below this are treated as "no match"
+MIN_MATCH_SCORE = 0.45
+# Candidates within this edit similarity (1 - distance / length) match even when
+# a typo broke too many trigrams: one edit in 4 letters, two in 8
+MIN_EDIT_SIMILARITY = 0.75
+# Only the rarest trigrams of a query are probed; enough that a term with a
+# transposition (up to four broken trigrams) still shares several of them
+MAX_PROBED_TRIGRAMS = 12
+MAX_RERANKED_CANDIDATES = 64
+# Of those, the ones sharing the most trigrams are also compared by edit distance
+MAX_EDIT_CANDIDATES = 8
+
+
+def normalize_drug_name(name: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a raw medicine name into (normalized base name, strength).
+    "Tab. Dolo-650 mg" -> ("dolo", "650 mg")
+    """
+    text = name.lower().replace("-", " ")
+    strength_match = STRENGTH_RE.search(text)
+    strength = re.sub(r"\s+", " ", strength_match.group(0)).strip() if strength_match else None
+    text = STRENGTH_RE.sub(" ", text)
+    text = re.sub(r"[^\w\s+]", " ", text)
+    words = [w for w in text.split() if w not in DOSAGE_FORMS]
+    if not strength:
+        numbers = [w for w in words if BARE_NUMBER_RE.fullmatch(w)]
+        strength = numbers[0] if numbers else None
+    words = [w for w in words if not BARE_NUMBER_RE.fullmatch(w)]
+    return " ".join(words), strength
+
+
+def trigrams(term: str) -> set:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Damerau-Levenshtein distance (optimal string alignment: a transposition is
+    one edit), or limit + 1 once it is certain to exceed limit. Only the band
+    of cells within limit of the diagonal is computed.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    before, previous = None, [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = current[0]
+        ai = a[i - 1]
+        for j in range(low, high + 1):
+            bj = b[j - 1]
+            cell = previous[j - 1] if ai == bj else previous[j - 1] + 1
+            if previous[j] + 1 < cell:
+                cell = previous[j] + 1
+            if current[j - 1] + 1 < cell:
+                cell = current[j - 1] + 1
+            if i > 1 and j > 1 and ai == b[j - 2] and a[i - 2] == bj and before[j - 2] + 1 < cell:
+                cell = before[j - 2] + 1
+            current[j] = cell if cell < over else over
+            if cell < row_min:
+                row_min = cell
+        if row_min > limit:
+            return over
+        before, previous = previous, current
+    return previous[-1]
+
+
+def edit_similarity(a: str, b: str) -> float:
+    """1 - distance / length, or 0 when below MIN_EDIT_SIMILARITY."""
+    length = max(len(a), len(b), 1)
+    limit = int(length * (1 - MIN_EDIT_SIMILARITY))
+    distance = edit_distance(a, b, limit)
+    return 1 - distance / length if distance <= limit else 0.0
+
+
+class DrugSearchIndex:
+    """
+    Trigram and prefix index over generic and brand names.
+    Every name ("term") points at the canonical drug it belongs to.
+    """
+
+    def __init__(self, drugs: List[Dict], terms: List[str], term_drug: array,
+                 postings: Dict[str, array], sorted_terms: List[str], sorted_term_ids: array):
+        self.drugs = drugs
+        self.terms = terms
+        self.term_drug = term_drug
+        self.postings = postings
+        self.sorted_terms = sorted_terms
+        self.sorted_term_ids = sorted_term_ids
+        self.drug_ids = {d["id"]: i for i, d in enumerate(drugs)}
+
+    @classmethod
+    def build(cls, catalog: List[Dict]) -> "DrugSearchIndex":
+        drugs, terms, term_drug = [], [], array("I")
+        seen = {}
+        for entry in catalog:
+            drug_idx = len(drugs)
+            drugs.append({
+                "id": entry["id"],
+                "name": entry["name"],
+                "drug_class": entry.get("drug_class"),
+                "brands": entry.get("brands", []),
+            })
+            for raw in [entry["name"], entry["id"].replace("_", " "), *entry.get("brands", [])]:
+                term, _ = normalize_drug_name(raw)
+                if term and term not in seen:
+                    seen[term] = len(terms)
+                    terms.append(term)
+                    term_drug.append(drug_idx)
+
+        postings: Dict[str, array] = {}
+        for term_id, term in enumerate(terms):
+            for gram in trigrams(term):
+                postings.setdefault(gram, array("I")).append(term_id)
+
+        order = sorted(range(len(terms)), key=terms.__getitem__)
+        return cls(drugs, terms, term_drug, postings,
+                   [terms[i] for i in order], array("I", order))
+
+    def save(self, path: str):
+        payload = {
+            "version": INDEX_FORMAT_VERSION,
+            "drugs": self.drugs,
+            "terms": self.terms,
+            "term_drug": self.term_drug,
+            "postings": self.postings,
+            "sorted_terms": self.sorted_terms,
+            "sorted_term_ids": self.sorted_term_ids,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "DrugSearchIndex":
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported drug index version in {path}")
+        payload.pop("version")
+        return cls(**payload)
+
+    def _result(self, term_id: int, score: float) -> Dict:
+        drug = self.drugs[self.term_drug[term_id]]
+        return {
+            "id": drug["id"],
+            "name": drug["name"],
+            "drug_class": drug["drug_class"],
+            "matched": self.terms[term_id],
+            "score": round(score, 3),
+        }
+
+    def _fuzzy(self, term: str, limit: int, prefix: bool = False) -> List[Tuple[int, float]]:
+        grams = trigrams(term)
+        if prefix:
+            grams.discard(f"{term[-2:]} ")
+        lists = sorted((self.postings[g] for g in grams if g in self.postings), key=len)
+        if not lists:
+            return []
+
+        counts = Counter(chain.from_iterable(lists[:MAX_PROBED_TRIGRAMS]))
+
+        scored = []
+        for rank, (term_id, _) in enumerate(counts.most_common(MAX_RERANKED_CANDIDATES)):
+            candidate = self.terms[term_id]
+            other = trigrams(candidate)
+            shared = len(grams & other)
+            if prefix:
+                # A prefix only needs to be contained in the candidate, not equal to it
+                score = shared / len(grams)
+                candidate = candidate[:len(term)]
+            else:
+                score = shared / (len(grams) + len(other) - shared)
+            similarity = edit_similarity(term, candidate) if rank < MAX_EDIT_CANDIDATES else 0.0
+            if score >= MIN_MATCH_SCORE or similarity >= MIN_EDIT_SIMILARITY:
+                scored.append((term_id, max(score, similarity)))
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return scored[:limit]
+
+    def _dedupe(self, scored: List[Tuple[int, float]], limit: int) -> List[Dict]:
+        results, seen = [], set()
+        for term_id, score in scored:
+            drug_idx = self.term_drug[term_id]
+            if drug_idx in seen:
+                continue
+            seen.add(drug_idx)
+            results.append(self._result(term_id, score))
+            if len(results) >= limit:
+                break
+        return results
+
+    def resolve(self, name: str) -> Optional[Dict]:
+        """Resolve a raw medicine name to its canonical drug, or None if nothing is close enough."""
+        term, strength = normalize_drug_name(name)
+        if not term:
+            return None
+
+        pos = bisect_left(self.sorted_terms, term)
+        if pos < len(self.sorted_terms) and self.sorted_terms[pos] == term:
+            match = self._result(self.sorted_term_ids[pos], 1.0)
+        else:
+            scored = self._fuzzy(term, 1)
+            if not scored:
+                return None
+            match = self._result(*scored[0])
+        match["strength"] = strength
+        return match
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Prefix matches; falls back to fuzzy matching when the prefix itself is misspelled."""
+        term, _ = normalize_drug_name(prefix)
+        if not term:
+            return []
+
+        scored = []
+        pos = bisect_left(self.sorted_terms, term)
+        while pos < len(self.sorted_terms) and len(scored) < limit * 4:
+            candidate = self.sorted_terms[pos]
+            if not candidate.startswith(term):
+                break
+            scored.append((self.sorted_term_ids[pos], len(term) / len(candidate)))
+            pos += 1
+
+        if not scored:
+            scored = self._fuzzy(term, limit * 2, prefix=True)
+        return self._dedupe(scored, limit)
+
+
+def _resolve_path(path: str) -> str:
+    return path if os.path.isabs(path) else str(BASE_DIR / path)
+
+
+def load_drug_index() -> DrugSearchIndex:
+    """
+    Load the prebuilt index if it is newer than the catalog; otherwise build it
+    from the catalog and try to write it out for the next start.
+    """
+    catalog_path = _resolve_path(settings.DRUG_CATALOG_PATH)
+    index_path = _resolve_path(settings.DRUG_INDEX_PATH)
+
+    if os.path.exists(index_path) and (
+        not os.path.exists(catalog_path) or os.path.getmtime(index_path) >= os.path.getmtime(catalog_path)
+    ):
+        try:
+            return DrugSearchIndex.load(index_path)
+        except Exception as e:
+            logger.warning(f"Could not load prebuilt drug index {index_path}: {e}")
+
+    with open(catalog_path, encoding="utf-8") as f:
+        index = DrugSearchIndex.build(json.load(f))
+    try:
+        index.save(index_path)
+    except OSError as e:
+        logger.warning(f"Could not write drug index {index_path}: {e}")
+    return index
+
+
+_drug_index: Optional[DrugSearchIndex] = None
+
+
+def get_drug_index() -> DrugSearchIndex:
+    """Get or load the drug search index singleton."""
+    global _drug_index
+    if _drug_index is None:
+        _drug_index = load_drug_index()
+    return _drug_index
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m backend.services.drug_search <catalog.json> <index.pkl>")
+        sys.exit(1)
+    with open(sys.argv[1], encoding="utf-8") as f:
+        built = DrugSearchIndex.build(json.load(f))
+    built.save(sys.argv[2])
+    print(f"Indexed {len(built.drugs)} drugs / {len(built.terms)} names into {sys.argv[2]}")
@@ -0,0 +1,184 @@
+"""
+Streaming export of a user's health record.
+
+Every section is read with a server-side cursor (yield_per; on PostgreSQL the
+rows stay on the server until fetched), and each fetched batch is encoded and
+handed to the response as one chunk. Memory therefore stays at one batch
+however many years of vitals a user has, and the first bytes go out as soon
+as the first batch is read. Archived vitals (services/vitals_archive.py)
+are decoded one month per chunk, ahead of the hot rows.
+
+Formats:
+  ndjson  one JSON object per line, tagged with its "type"; the first line
+          describes the export itself
+  csv     one section, with a header row (JSON-valued cells are JSON-encoded)
+  zip     record.ndjson plus the original report files under
+          reports/<report id><ext>, streamed without a seekable file
+
+The generators open their own session: they run while the response is being
+sent, after the request's dependencies may have been closed.
+"""
+
+import csv
+import io
+import os
+import zipfile
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from .. import database, models, schemas
+from ..config import settings
+from ..serialization import dumps, schema_columns
+from . import vitals_archive
+
+FORMAT_VERSION = 1
+
+# (type, model, response schema, order), written in this order
+SECTIONS = (
+    ("profile", models.Profile, schemas.ProfileResponse, models.Profile.id),
+    ("vital", models.Vital, schemas.VitalResponse, models.Vital.recorded_at),
+    ("report", models.Report, schemas.ReportResponse, models.Report.created_at),
+    ("medicine", models.Medicine, schemas.MedicineResponse, models.Medicine.created_at),
+    ("emergency_contact", models.EmergencyContact, schemas.EmergencyContactResponse, models.EmergencyContact.id),
+)
+SECTION_NAMES = tuple(name for name, *_ in SECTIONS)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "zip": "application/zip",
+}
+
+FILE_CHUNK_SIZE = 1024 * 1024
+
+
+def _batches(db, user_id: str, section: str) -> Iterator[Tuple[Tuple[str, ...], List[tuple]]]:
+    """(field names, rows) per fetched batch of one section."""
+    _, model, schema, order = next(s for s in SECTIONS if s[0] == section)
+    query = (
+        select(*schema_columns(model, schema))
+        .where(model.user_id == user_id)
+        .order_by(order)
+        .execution_options(yield_per=settings.EXPORT_BATCH_ROWS)
+    )
+    fields = tuple(schema.model_fields)
+    if model is models.Vital:
+        # Archived months are older than the hot rows, so they go first
+        for rows in vitals_archive.archived_months(db, user_id, fields):
+            yield fields, rows
+    for rows in db.execute(query).partitions():
+        yield fields, rows
+
+
+def _ndjson_batches(db, user_id: str, on_report=None) -> Iterator[bytes]:
+    header = {"type": "export", "format_version": FORMAT_VERSION, "user_id": user_id,
+              "exported_at": datetime.now(timezone.utc), "sections": list(SECTION_NAMES)}
+    yield dumps(header) + b"\n"
+    for section in SECTION_NAMES:
+        for fields, rows in _batches(db, user_id, section):
+            records = [{"type": section, **dict(zip(fields, row))} for row in rows]
+            if on_report is not None and section == "report":
+                for record in records:
+                    on_report(record)
+            yield b"".join(dumps(record) + b"\n" for record in records)
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode()
+    return value
+
+
+def stream_ndjson(user_id: str) -> Iterator[bytes]:
+    db = database.SessionLocal()
+    try:
+        yield from _ndjson_batches(db, user_id)
+    finally:
+        db.close()
+
+
+def stream_csv(user_id: str, section: str) -> Iterator[bytes]:
+    db = database.SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        header_written = False
+        for fields, rows in _batches(db, user_id, section):
+            if not header_written:
+                writer.writerow(fields)
+                header_written = True
+            writer.writerows([_csv_value(v) for v in row] for row in rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if not header_written:
+            _, _, schema, _ = next(s for s in SECTIONS if s[0] == section)
+            writer.writerow(schema.model_fields)
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        db.close()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable file for zipfile; pending() hands over what was written since the last call."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pending(self) -> Iterator[bytes]:
+        if self._chunks:
+            data = b"".join(self._chunks)
+            self._chunks.clear()
+            yield data
+
+
+def _report_arcname(report_id: str, path: Optional[str]) -> Optional[str]:
+    if not path or not os.path.isfile(path):
+        return None
+    return f"reports/{report_id}{os.path.splitext(path)[1]}"
+
+
+def stream_zip(user_id: str) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    report_files = []  # (id, file_url); reports are few, unlike vitals
+    db = database.SessionLocal()
+    try:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            with archive.open("record.ndjson", "w", force_zip64=True) as entry:
+                for data in _ndjson_batches(db, user_id, on_report=lambda r: report_files.append((r["id"], r["file_url"]))):
+                    entry.write(data)
+                    yield from sink.pending()
+            db.close()
+
+            for report_id, path in report_files:
+                arcname = _report_arcname(report_id, path)
+                if arcname is None:
+                    continue
+                # PDFs and images are compressed already
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                info.compress_type = zipfile.ZIP_STORED
+                with open(path, "rb") as source, archive.open(info, "w", force_zip64=True) as entry:
+                    for chunk in iter(lambda: source.read(FILE_CHUNK_SIZE), b""):
+                        entry.write(chunk)
+                        yield from sink.pending()
+        yield from sink.pending()
+    finally:
+        db.close()
+
+
+def filename(fmt: str, section: Optional[str] = None) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+    if fmt == "csv":
+        return f"arodoc-{section}s-{stamp}.csv"
+    return f"arodoc-export-{stamp}.{fmt}"
@@ -0,0 +1,258 @@
+"""
+In-memory spatial index over the facility directory.
+
+Facilities are bucketed into a fixed lat/lng grid at startup. Nearest-neighbour
+queries scan rings of cells outwards from the query point and stop as soon as
+no unscanned cell can hold anything closer than the current k-th result, so
+lookups touch a handful of cells even for a national directory. Rings are
+clipped to the occupied cells' extent and scanned out to its farthest corner,
+so a query from outside the covered area still finds the nearest facilities. A token index
+over names, specialties and addresses serves the text part of the search.
+"""
+
+import logging
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from heapq import nsmallest
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = 111.32
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class FacilityIndex:
+    """
+    Grid-bucketed spatial index plus token index over a list of facility dicts.
+    """
+
+    def __init__(self, facilities: List[Dict], cell_deg: float = 0.25):
+        self.facilities = facilities
+        self.cell_deg = cell_deg
+        self.lats = array("d", (f["lat"] for f in facilities))
+        self.lngs = array("d", (f["lng"] for f in facilities))
+
+        self.cells: Dict[Tuple[int, int], array] = {}
+        for i in range(len(facilities)):
+            self.cells.setdefault(self._cell(self.lats[i], self.lngs[i]), array("I")).append(i)
+        # Bounds of the occupied cells, which limit how far a ring scan has to go
+        rows = [c[0] for c in self.cells] or [0]
+        cols = [c[1] for c in self.cells] or [0]
+        self.row_range = (min(rows), max(rows))
+        self.col_range = (min(cols), max(cols))
+
+        self.tokens: Dict[str, Set[int]] = {}
+        for i, f in enumerate(facilities):
+            for field in ("name", "specialty", "address", "city", "type"):
+                for token in tokenize(f.get(field)):
+                    self.tokens.setdefault(token, set()).add(i)
+        self.sorted_tokens = sorted(self.tokens)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lng / self.cell_deg))
+
+    def _ring(self, center: Tuple[int, int], r: int) -> Iterable[array]:
+        """Occupied cells at Chebyshev distance r from center; only cells within the data's extent are probed."""
+        ci, cj = center
+        (row_lo, row_hi), (col_lo, col_hi) = self.row_range, self.col_range
+        for i in range(max(ci - r, row_lo), min(ci + r, row_hi) + 1):
+            if abs(i - ci) == r:
+                cols = range(max(cj - r, col_lo), min(cj + r, col_hi) + 1)
+            else:
+                cols = [j for j in (cj - r, cj + r) if col_lo <= j <= col_hi]
+            for j in cols:
+                cell = self.cells.get((i, j))
+                if cell is not None:
+                    yield cell
+
+    def _rings(self, center: Tuple[int, int]) -> range:
+        """Rings around center that can hold facilities, also when center lies outside the data's extent."""
+        ci, cj = center
+        (row_lo, row_hi), (col_lo, col_hi) = self.row_range, self.col_range
+        first = max(0, row_lo - ci, ci - row_hi, col_lo - cj, cj - col_hi)
+        last = max(abs(ci - row_lo), abs(ci - row_hi), abs(cj - col_lo), abs(cj - col_hi))
+        return range(first, last + 1)
+
+    def _ring_min_km(self, lat: float, r: int) -> float:
+        """Lower bound on the distance to any facility outside rings 0..r."""
+        reach = r * self.cell_deg
+        widest_lat = min(abs(lat) + reach, 89.9)
+        return reach * KM_PER_DEG_LAT * min(1.0, math.cos(math.radians(widest_lat)))
+
+    def _text_matches(self, query: str) -> Optional[Set[int]]:
+        """Facilities matching every query token; the last token may be a prefix."""
+        words = tokenize(query)
+        if not words:
+            return None
+        result: Optional[Set[int]] = None
+        for n, word in enumerate(words):
+            if n == len(words) - 1:
+                matched: Set[int] = set()
+                pos = bisect_left(self.sorted_tokens, word)
+                while pos < len(self.sorted_tokens) and self.sorted_tokens[pos].startswith(word):
+                    matched |= self.tokens[self.sorted_tokens[pos]]
+                    pos += 1
+            else:
+                matched = self.tokens.get(word, set())
+            result = matched if result is None else result & matched
+            if not result:
+                return set()
+        return result
+
+    def _filter(self, specialty: Optional[str], query: Optional[str], city: Optional[str],
+                emergency_only: bool):
+        allowed = self._text_matches(query) if query else None
+        specialty = specialty.lower() if specialty else None
+        city = city.lower() if city else None
+
+        def accept(i: int) -> bool:
+            if allowed is not None and i not in allowed:
+                return False
+            f = self.facilities[i]
+            if specialty and specialty not in (f.get("specialty") or "").lower():
+                return False
+            if city and city != (f.get("city") or "").lower():
+                return False
+            if emergency_only and not f.get("has_emergency"):
+                return False
+            return True
+
+        return allowed, accept
+
+    def _with_distance(self, i: int, distance_km: Optional[float]) -> Dict:
+        item = dict(self.facilities[i])
+        if distance_km is not None:
+            item["distance_km"] = round(distance_km, 2)
+        return item
+
+    def nearest(self, lat: float, lng: float, k: int = 5, radius_km: Optional[float] = None,
+                specialty: Optional[str] = None, query: Optional[str] = None,
+                city: Optional[str] = None, emergency_only: bool = False) -> List[Dict]:
+        """k nearest facilities to (lat, lng), optionally limited to radius_km and filters."""
+        allowed, accept = self._filter(specialty, query, city, emergency_only)
+        center = self._cell(lat, lng)
+        found: List[Tuple[float, int]] = []
+
+        if allowed is not None and len(allowed) <= 256:
+            # Selective text filter: cheaper to measure the matches than to walk the grid
+            for i in allowed:
+                if accept(i):
+                    found.append((haversine_km(lat, lng, self.lats[i], self.lngs[i]), i))
+        elif self.cells:
+            for r in self._rings(center):
+                for cell in self._ring(center, r):
+                    for i in cell:
+                        if accept(i):
+                            found.append((haversine_km(lat, lng, self.lats[i], self.lngs[i]), i))
+                bound = self._ring_min_km(lat, r)
+                if radius_km is not None and bound > radius_km:
+                    break
+                if len(found) >= k and nsmallest(k, found)[-1][0] <= bound:
+                    break
+
+        if radius_km is not None:
+            found = [f for f in found if f[0] <= radius_km]
+        return [self._with_distance(i, d) for d, i in nsmallest(k, found)]
+
+    def search(self, specialty: Optional[str] = None, query: Optional[str] = None,
+               city: Optional[str] = None, emergency_only: bool = False, limit: int = 50) -> List[Dict]:
+        """Filter-only search (no location), best rated first."""
+        allowed, accept = self._filter(specialty, query, city, emergency_only)
+        candidates = allowed if allowed is not None else range(len(self.facilities))
+        matches = [i for i in candidates if accept(i)]
+        matches.sort(key=lambda i: -(self.facilities[i].get("rating") or 0))
+        return [self._with_distance(i, None) for i in matches[:limit]]
+
+
+def location_coordinates(location: Optional[Dict]) -> Optional[Tuple[float, float]]:
+    """
+    Extract (lat, lng) from a client location payload.
+    Accepts {lat, lng} or the browser's {latitude, longitude}; (0, 0) means "unavailable".
+    """
+    if not location:
+        return None
+    lat = location.get("lat", location.get("latitude"))
+    lng = location.get("lng", location.get("longitude"))
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if (lat == 0 and lng == 0) or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+def nearest_emergency_hospitals(location: Optional[Dict], k: int, radius_km: float) -> List[Dict]:
+    """Compact list of the nearest emergency-capable hospitals for an SOS location."""
+    coords = location_coordinates(location)
+    if coords is None:
+        return []
+    hospitals = get_facility_index().nearest(*coords, k=k, radius_km=radius_km, emergency_only=True)
+    return [
+        {key: h[key] for key in ("id", "name", "address", "phone", "lat", "lng", "distance_km")}
+        for h in hospitals
+    ]
+
+
+def facility_to_dict(f) -> Dict:
+    return {
+        "id": f.id,
+        "name": f.name,
+        "type": f.type,
+        "specialty": f.specialty,
+        "rating": f.rating,
+        "address": f.address,
+        "city": f.city,
+        "phone": f.phone,
+        "lat": f.lat,
+        "lng": f.lng,
+        "has_emergency": f.has_emergency,
+    }
+
+
+_facility_index: Optional[FacilityIndex] = None
+_lock = threading.Lock()
+
+
+def build_facility_index(db, cell_deg: float) -> FacilityIndex:
+    """(Re)build the facility index from the directory table."""
+    global _facility_index
+    from .. import models
+
+    rows = db.query(models.Facility).filter(
+        models.Facility.lat.isnot(None), models.Facility.lng.isnot(None)
+    ).all()
+    index = FacilityIndex([facility_to_dict(f) for f in rows], cell_deg=cell_deg)
+    with _lock:
+        _facility_index = index
+    logger.info(f"Facility index built: {len(rows)} facilities in {len(index.cells)} cells")
+    return index
+
+
+def get_facility_index() -> FacilityIndex:
+    """Get the facility index, building it on first use."""
+    if _facility_index is None:
+        from ..database import SessionLocal
+        from ..config import settings
+
+        db = SessionLocal()
+        try:
+            build_facility_index(db, settings.FACILITY_GRID_CELL_DEG)
+        finally:
+            db.close()
+    return _facility_index
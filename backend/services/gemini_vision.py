@@ -1,14 +1,8 @@
-import google.generativeai as genai
 from ..config import settings
+from . import llm
 import json
 import logging
 import re
-from PIL import Image
-import io
-
-# Initialize Gemini
-if settings.GEMINI_API_KEY:
-    genai.configure(api_key=settings.GEMINI_API_KEY)
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +14,6 @@ async def parse_prescription(file_content: bytes, mime_type: str):
         raise Exception("Gemini API Key not configured")
 
     try:
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
         # Prepare the image part
         image_part = {
             "mime_type": mime_type,
@@ -47,7 +39,7 @@ async def parse_prescription(file_content: bytes, mime_type: str):
         ]
         """
 
-        response = model.generate_content([prompt, image_part])
+        response = await llm.generate_async([prompt, image_part], model_name='gemini-1.5-flash')
         response_text = response.text
         
         # Robust JSON extraction using Regex to find the first [ and last ]
@@ -0,0 +1,94 @@
+"""
+Drug-drug interaction checker.
+
+Interactions are loaded once from a bundled dataset into adjacency sets keyed by
+canonical drug id (see services/drug_search.py). Checking a medicine list is a
+pairwise scan over its canonical ids, memoized per distinct set of drugs.
+"""
+
+import json
+import logging
+import os
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from ..config import BASE_DIR, settings
+from .drug_search import get_drug_index
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_ORDER = {"major": 0, "moderate": 1, "minor": 2}
+
+
+class InteractionGraph:
+    """
+    Undirected graph of known interactions between canonical drug ids.
+    """
+
+    def __init__(self, interactions: List[Dict]):
+        self.adjacency: Dict[str, Set[str]] = {}
+        self.details: Dict[Tuple[str, str], Dict] = {}
+        for item in interactions:
+            a, b = sorted((item["a"], item["b"]))
+            self.adjacency.setdefault(a, set()).add(b)
+            self.adjacency.setdefault(b, set()).add(a)
+            self.details[(a, b)] = {"severity": item["severity"], "description": item["description"]}
+        # Memoize per graph instance; the key is the set of drugs, not their order
+        self._check_set = lru_cache(maxsize=settings.INTERACTION_CACHE_SIZE)(self._check_set_uncached)
+
+    @classmethod
+    def load(cls, path: str) -> "InteractionGraph":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _check_set_uncached(self, drug_ids: FrozenSet[str]) -> Tuple[Dict, ...]:
+        found = []
+        for a, b in combinations(sorted(drug_ids), 2):
+            if b in self.adjacency.get(a, ()):
+                found.append({"drug_a": a, "drug_b": b, **self.details[(a, b)]})
+        found.sort(key=lambda w: SEVERITY_ORDER.get(w["severity"], len(SEVERITY_ORDER)))
+        return tuple(found)
+
+    def check(self, drug_ids: Iterable[str]) -> List[Dict]:
+        """Return every known interaction among the given canonical drug ids, most severe first."""
+        return [dict(w) for w in self._check_set(frozenset(drug_ids))]
+
+
+@lru_cache(maxsize=4096)
+def canonical_drug_id(medicine_name: str) -> Optional[str]:
+    """Resolve a free-text medicine name to its canonical drug id, if the catalog knows it."""
+    match = get_drug_index().resolve(medicine_name)
+    return match["id"] if match else None
+
+
+def check_medicine_names(names: Iterable[str]) -> List[Dict]:
+    """
+    Check free-text medicine names (as stored on Medicine rows) for interactions.
+    Each warning also carries the names as the user entered them.
+    """
+    by_id: Dict[str, str] = {}
+    for name in names:
+        drug_id = canonical_drug_id(name)
+        if drug_id and drug_id not in by_id:
+            by_id[drug_id] = name
+
+    warnings = get_interaction_graph().check(by_id)
+    for w in warnings:
+        w["medicine_a"] = by_id[w["drug_a"]]
+        w["medicine_b"] = by_id[w["drug_b"]]
+    return warnings
+
+
+_interaction_graph: Optional[InteractionGraph] = None
+
+
+def get_interaction_graph() -> InteractionGraph:
+    """Get or load the interaction graph singleton."""
+    global _interaction_graph
+    if _interaction_graph is None:
+        path = settings.INTERACTIONS_PATH
+        path = path if os.path.isabs(path) else str(BASE_DIR / path)
+        _interaction_graph = InteractionGraph.load(path)
+        logger.info(f"Loaded {len(_interaction_graph.details)} drug interactions from {path}")
+    return _interaction_graph
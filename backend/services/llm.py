@@ -0,0 +1,85 @@
+"""
+Provider layer for the Gemini SDK.
+
+google.generativeai (and the protobuf/grpc stack it pulls in) takes about a
+second to import, so it is never imported at module level. The SDK is loaded
+and configured on the first call that actually needs it; workers that only
+serve /health, /auth or the CRUD routes never pay for it. Every call is timed
+and its token usage recorded in the request metrics and charged to the
+caller's daily budget (see rate_limit.py).
+"""
+
+import logging
+import threading
+import time
+from typing import Any, List, Union
+
+from ..config import settings
+from ..metrics import observe_llm_call
+from ..rate_limit import record_llm_usage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+Contents = Union[str, List[Any]]
+
+_genai = None
+_lock = threading.Lock()
+
+
+def is_configured() -> bool:
+    return bool(settings.GEMINI_API_KEY)
+
+
+def get_genai():
+    """Import and configure google.generativeai once, on first use."""
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                import google.generativeai as genai
+
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                _genai = genai
+    return _genai
+
+
+def get_model(model_name: str = DEFAULT_MODEL):
+    return get_genai().GenerativeModel(model_name)
+
+
+def upload_file(path: str, mime_type: str):
+    started = time.perf_counter()
+    try:
+        uploaded = get_genai().upload_file(path, mime_type=mime_type)
+    except Exception:
+        observe_llm_call("files", "upload", time.perf_counter() - started, error=True)
+        raise
+    observe_llm_call("files", "upload", time.perf_counter() - started)
+    return uploaded
+
+
+def generate(contents: Contents, model_name: str = DEFAULT_MODEL):
+    """Blocking generate_content call; use from sync routes only."""
+    started = time.perf_counter()
+    try:
+        response = get_model(model_name).generate_content(contents)
+    except Exception:
+        observe_llm_call(model_name, "generate", time.perf_counter() - started, error=True)
+        raise
+    observe_llm_call(model_name, "generate", time.perf_counter() - started, response)
+    record_llm_usage(response)
+    return response
+
+
+async def generate_async(contents: Contents, model_name: str = DEFAULT_MODEL):
+    started = time.perf_counter()
+    try:
+        response = await get_model(model_name).generate_content_async(contents)
+    except Exception:
+        observe_llm_call(model_name, "generate", time.perf_counter() - started, error=True)
+        raise
+    observe_llm_call(model_name, "generate", time.perf_counter() - started, response)
+    record_llm_usage(response)
+    return response
@@ -0,0 +1,151 @@
+"""
+Medicine price index.
+
+Vendor quotes are expensive to obtain (one request per vendor site), so they are
+fetched concurrently, cached per normalized medicine name and refreshed in the
+background. Within one refresh cycle a medicine always gets the same quotes.
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import re
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import quote_plus
+
+from ..cache import TTLCache
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VENDORS = [
+    {"name": "Apollo Pharmacy", "logo": "apollo", "reliability": "High",
+     "search_url": "https://www.apollopharmacy.com/search?q={query}"},
+    {"name": "1mg", "logo": "1mg", "reliability": "High",
+     "search_url": "https://www.1mg.com/search?q={query}"},
+    {"name": "Pharmeasy", "logo": "pharmeasy", "reliability": "Medium",
+     "search_url": "https://www.pharmeasy.com/search?q={query}"},
+    {"name": "Netmeds", "logo": "netmeds", "reliability": "Medium",
+     "search_url": "https://www.netmeds.com/search?q={query}"},
+]
+
+# Names kept warm by the refresher even before anyone has searched for them
+POPULAR_MEDICINES = ["paracetamol", "amoxicillin", "metformin", "atorvastatin", "ibuprofen"]
+
+VendorFetcher = Callable[[Dict, str, int], Awaitable[Optional[Dict]]]
+
+
+def normalize_medicine_name(name: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so cache keys are stable."""
+    name = re.sub(r"[^\w\s.]", " ", name.lower())
+    return re.sub(r"\s+", " ", name).strip()
+
+
+async def mock_vendor_quote(vendor: Dict, medicine_name: str, cycle: int) -> Optional[Dict]:
+    """
+    Deterministic stand-in for a vendor lookup.
+    Prices vary between vendors and refresh cycles but never between two calls in the same cycle.
+    """
+    seed = hashlib.sha256(f"{vendor['name']}|{medicine_name}|{cycle}".encode()).digest()
+    rng = random.Random(seed)
+
+    base_price = sum(ord(c) for c in medicine_name) % 500 + 50
+    return {
+        "vendor_name": vendor["name"],
+        "price": round(base_price * rng.uniform(0.85, 1.15), 2),
+        "currency": "INR",
+        "rating": round(rng.uniform(3.5, 5.0), 1),
+        "delivery_time": f"{rng.randint(24, 72)} hours",
+        "link": vendor["search_url"].format(query=quote_plus(medicine_name)),
+    }
+
+
+FETCHERS: Dict[str, VendorFetcher] = {
+    "mock": mock_vendor_quote,
+}
+
+
+class PriceIndex:
+    """
+    Cache of vendor quotes keyed by normalized medicine name.
+    """
+
+    def __init__(self, fetcher: VendorFetcher, ttl_seconds: float, timeout_seconds: float,
+                 concurrency: int):
+        self.fetcher = fetcher
+        self.timeout_seconds = timeout_seconds
+        self.concurrency = concurrency
+        self.cache = TTLCache(ttl_seconds)
+        self.vendors: List[Dict] = list(DEFAULT_VENDORS)
+        self.cycle = int(time.time() // max(settings.PRICE_REFRESH_INTERVAL_SECONDS, 1))
+        self.refreshed_at: Optional[float] = None
+
+    def load_vendors(self, db):
+        """Load active vendors from the catalog table (seeded by migration 0002)."""
+        from .. import models
+
+        rows = db.query(models.Vendor).filter(models.Vendor.is_active == True).all()
+        if not rows:
+            logger.warning("Vendor catalog is empty; using built-in vendor list")
+            return
+        self.vendors = [
+            {"name": v.name, "logo": v.logo, "reliability": v.reliability, "search_url": v.search_url}
+            for v in rows
+        ]
+
+    async def _fetch_one(self, vendor: Dict, name: str, cycle: int) -> Optional[Dict]:
+        try:
+            return await asyncio.wait_for(self.fetcher(vendor, name, cycle), self.timeout_seconds)
+        except Exception as e:
+            logger.warning(f"Price lookup failed for {name} at {vendor['name']}: {e}")
+            return None
+
+    async def _build(self, name: str, cycle: int) -> List[Dict]:
+        quotes = await asyncio.gather(*(self._fetch_one(v, name, cycle) for v in self.vendors))
+        results = sorted((q for q in quotes if q), key=lambda q: q["price"])
+        if results:
+            results[0]["is_best_price"] = True
+        return results
+
+    async def lookup(self, medicine_name: str) -> List[Dict]:
+        key = normalize_medicine_name(medicine_name)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        results = await self._build(key, self.cycle)
+        self.cache.set(key, results)
+        return results
+
+    async def refresh(self):
+        """Start a new cycle and recompute every tracked medicine."""
+        cycle = self.cycle + 1
+        names = set(self.cache.keys()) | set(POPULAR_MEDICINES)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def rebuild(name: str):
+            async with semaphore:
+                self.cache.set(name, await self._build(name, cycle))
+
+        await asyncio.gather(*(rebuild(n) for n in names))
+        self.cycle = cycle
+        self.refreshed_at = time.time()
+        logger.info(f"Price index refreshed: {len(names)} medicines, cycle {cycle}")
+
+    async def run_refresher(self, interval_seconds: float):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Price index refresh failed: {e}")
+            await asyncio.sleep(interval_seconds)
+
+
+price_index = PriceIndex(
+    fetcher=FETCHERS[settings.PRICE_FETCHER],
+    ttl_seconds=settings.PRICE_CACHE_TTL_SECONDS,
+    timeout_seconds=settings.PRICE_FETCH_TIMEOUT_SECONDS,
+    concurrency=settings.PRICE_REFRESH_CONCURRENCY,
+)
@@ -0,0 +1,164 @@
+"""
+Storage and signed delivery of uploaded report files.
+
+New uploads are stored content-addressed, under reports/<aa>/<sha256><ext>
+in the uploads directory, so a stored path never changes content: identical
+uploads share one file, and responses for these paths can be cached as
+immutable. Reports uploaded before this scheme keep their original
+<uuid>_<name> paths.
+
+Because files are shared, an upload and a delete of the same content can
+race: the delete sees no other report, the upload dedupes against the file it
+is about to remove. So an upload that finds its content already stored keeps
+its own copy until its report is committed (settle()), and a delete moves the
+file aside and checks the references once more before removing it
+(remove_if_unreferenced()). A report committed before that second check gets
+the file moved back; one committed after it finds the file missing and puts
+its copy in place.
+
+Files are not public. An owner asks for a URL, which is signed with the app
+secret and expires after REPORT_URL_TTL_SECONDS. The expiry is rounded up to
+a TTL boundary, so repeated requests within a window get the same URL and the
+browser cache keeps working. Serving the URL needs no database access: the
+signature alone authorizes the storage key.
+"""
+
+import base64
+import hashlib
+import hmac
+import math
+import os
+import tempfile
+import time
+import uuid
+from typing import BinaryIO, NamedTuple, Optional, Tuple
+
+from ..config import settings
+
+UPLOAD_DIR = "backend/uploads"
+CONTENT_ADDRESSED_PREFIX = "reports/"
+
+EXTENSIONS = {
+    "application/pdf": ".pdf",
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/png": ".png",
+}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class StoredUpload(NamedTuple):
+    path: str
+    # Our copy of content that was already stored, kept until the report is committed
+    pending: Optional[str] = None
+
+    @property
+    def readable(self) -> str:
+        """A path that holds the content until settle(), whatever concurrent deletes do."""
+        return self.pending or self.path
+
+
+def store_upload(source: BinaryIO, content_type: str) -> StoredUpload:
+    """Copy an upload into the content-addressed store, hashing on the way."""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=UPLOAD_DIR, prefix=".upload-", delete=False) as tmp:
+        try:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                tmp.write(chunk)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+
+    sha = digest.hexdigest()
+    key = f"{CONTENT_ADDRESSED_PREFIX}{sha[:2]}/{sha}{EXTENSIONS.get(content_type, '')}"
+    path = os.path.join(UPLOAD_DIR, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        return StoredUpload(path, tmp.name)  # Same content is already stored
+    os.replace(tmp.name, path)
+    return StoredUpload(path)
+
+
+def settle(stored: StoredUpload):
+    """Once the report pointing at stored.path is committed: restore the file if a delete removed it meanwhile."""
+    if stored.pending is None:
+        return
+    if os.path.exists(stored.path):
+        os.unlink(stored.pending)
+    else:
+        os.replace(stored.pending, stored.path)
+
+
+def discard(stored: StoredUpload):
+    """Drop the kept copy of an upload whose report was never committed."""
+    if stored.pending is not None and os.path.exists(stored.pending):
+        os.unlink(stored.pending)
+
+
+def storage_key(file_url: str) -> str:
+    """The path of a stored file relative to the uploads directory."""
+    return os.path.relpath(file_url, UPLOAD_DIR).replace(os.sep, "/")
+
+
+def is_content_addressed(key: str) -> bool:
+    return key.startswith(CONTENT_ADDRESSED_PREFIX)
+
+
+def resolve(key: str) -> Optional[str]:
+    """Filesystem path for a storage key, or None if it would escape the uploads directory."""
+    root = os.path.realpath(UPLOAD_DIR)
+    path = os.path.realpath(os.path.join(root, key))
+    return path if path.startswith(root + os.sep) else None
+
+
+def _referenced(db, file_url: str) -> bool:
+    from .. import models
+
+    return db.query(models.Report.id).filter(models.Report.file_url == file_url).first() is not None
+
+
+def remove_if_unreferenced(db, file_url: str):
+    """
+    Delete a stored file and its preview unless a report still points at it
+    (content-addressed dedupe). Call after the report's deletion is committed.
+    """
+    from .thumbnails import thumbnail_path
+
+    if _referenced(db, file_url):
+        return
+    aside = f"{file_url}.deleting-{uuid.uuid4().hex}"
+    try:
+        os.replace(file_url, aside)
+    except FileNotFoundError:
+        return
+    db.rollback()  # End the read transaction, so the second check sees reports committed since
+    if _referenced(db, file_url):
+        os.replace(aside, file_url)
+        return
+    os.remove(aside)
+    preview = thumbnail_path(file_url)
+    if os.path.exists(preview):
+        os.remove(preview)
+
+
+# --- Signed URLs --------------------------------------------------------------
+
+def _signature(key: str, expires: int) -> str:
+    mac = hmac.new(settings.SECRET_KEY.encode(), f"report-file:{key}:{expires}".encode(), hashlib.sha256)
+    return base64.urlsafe_b64encode(mac.digest()[:18]).decode()
+
+
+def sign(key: str, now: Optional[float] = None) -> Tuple[int, str]:
+    """(expires, signature) for a key, valid for between one and two TTLs."""
+    ttl = settings.REPORT_URL_TTL_SECONDS
+    expires = (math.floor((now or time.time()) / ttl) + 2) * ttl
+    return expires, _signature(key, expires)
+
+
+def verify(key: str, expires: int, signature: str, now: Optional[float] = None) -> bool:
+    if expires < (now or time.time()):
+        return False
+    return hmac.compare_digest(_signature(key, expires), signature)
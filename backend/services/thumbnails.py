@@ -0,0 +1,144 @@
+"""
+Preview thumbnails for uploaded reports.
+
+After an upload is stored, a small WebP is derived from it on a process pool:
+the image itself, or the first page of a PDF (rendered with pypdfium2 when it
+is installed; without it PDFs simply get no preview). The thumbnail is stored
+next to its content-addressed blob as <blob>.thumb.webp, so reports sharing a
+blob share the thumbnail and an already-rendered one is reused immediately.
+
+Rendering runs in separate processes started with "spawn": decoding large
+images and rasterizing PDFs is CPU-bound, and the API process never imports
+Pillow for it. When a thumbnail is ready, every report pointing at the blob
+gets its thumbnail_url set and the owners' report lists are invalidated
+(http_cache), so the next poll picks the preview up.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = ".thumb.webp"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def thumbnail_path(file_path: str) -> str:
+    return file_path + SUFFIX
+
+
+def thumbnail_url(report_id: str) -> str:
+    return f"/api/v1/analysis/reports/{report_id}/thumbnail"
+
+
+# --- Rendering (runs in the pool's processes) ---------------------------------
+
+def _first_pdf_page(source: str, size: int):
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None
+    pdf = pdfium.PdfDocument(source)
+    try:
+        page = pdf[0]
+        width, height = page.get_size()
+        # Render at twice the target size so the downscale stays sharp
+        return page.render(scale=2 * size / max(width, height)).to_pil()
+    finally:
+        pdf.close()
+
+
+def render_thumbnail(source: str, destination: str, content_type: str, size: int, quality: int) -> bool:
+    """Write a WebP preview of source to destination; False if there is nothing to render."""
+    from PIL import Image, ImageOps
+
+    if content_type == "application/pdf":
+        image = _first_pdf_page(source, size)
+        if image is None:
+            return False
+    else:
+        image = Image.open(source)
+        image.draft("RGB", (2 * size, 2 * size))  # JPEG: decode at reduced scale
+        image = ImageOps.exif_transpose(image)
+
+    image.thumbnail((size, size), Image.Resampling.LANCZOS)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    partial = destination + ".partial"
+    image.save(partial, "WEBP", quality=quality, method=4)
+    os.replace(partial, destination)
+    return True
+
+
+# --- Scheduling (API process) -------------------------------------------------
+
+def _executor() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.REPORT_THUMBNAIL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def _attach(file_path: str):
+    """Point every report stored as file_path at its thumbnail and invalidate the owners' lists."""
+    from .. import database, models
+    from ..http_cache import REPORTS, bump
+
+    db = database.SessionLocal()
+    try:
+        reports = db.query(models.Report).filter(
+            models.Report.file_url == file_path, models.Report.thumbnail_url.is_(None)
+        ).all()
+        for report in reports:
+            report.thumbnail_url = thumbnail_url(report.id)
+        for user_id in {r.user_id for r in reports}:
+            bump(db, user_id, REPORTS)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _on_rendered(file_path: str, future: Future):
+    try:
+        if future.result():
+            _attach(file_path)
+    except Exception as e:
+        logger.warning(f"Thumbnail generation failed for {file_path}: {e}")
+
+
+def schedule(file_path: str, content_type: str) -> Optional[str]:
+    """
+    Queue the thumbnail for a stored upload. Returns the thumbnail path right
+    away when the blob already has one (a re-upload of the same content).
+    """
+    destination = thumbnail_path(file_path)
+    if os.path.exists(destination):
+        return destination
+    if settings.REPORT_THUMBNAIL_WORKERS <= 0:
+        return None
+    future = _executor().submit(
+        render_thumbnail, file_path, destination, content_type,
+        settings.REPORT_THUMBNAIL_PX, settings.REPORT_THUMBNAIL_QUALITY,
+    )
+    future.add_done_callback(lambda f: _on_rendered(file_path, f))
+    return None
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,318 @@
+"""
+Columnar archive tier for old vitals.
+
+Readings older than ARCHIVE_AFTER_DAYS are rarely read one by one, yet every
+one of them is a full row in the hot table and its indexes. The archival job
+packs them per user and calendar month into one VitalArchive row: the month's
+readings stored column by column (16-byte ids, delta-encoded timestamps,
+dictionary-coded category and unit, float64 values) and zlib-compressed,
+around 30 bytes a reading against some 170 in the hot table and its index.
+
+Archiving a user is one transaction: their cold hot-table rows are deleted
+with RETURNING, so exactly the rows removed are the rows packed, and a month
+that already has an archive (readings imported later, or a month restored
+for an edit) is merged into it.
+
+Readers treat the tiers as one: the vitals list and the export decode the
+archived months next to the hot rows, and the dashboard falls back to the
+archive for categories with no recent reading. Archived readings keep their
+ids; editing or deleting one first restores its month to the hot table.
+
+Run from the repository root (e.g. nightly):
+    python -m backend.services.vitals_archive --older-than-days 90
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import logging
+import math
+import struct
+import sys
+import time
+import uuid
+import zlib
+from array import array
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import delete, select
+
+from .. import models
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBI")  # magic, format version, row count
+MAGIC = b"AVT1"
+ENCODED_FIELDS = ("id", "category", "value_primary", "value_secondary", "unit", "notes", "recorded_at")
+
+EPOCH = datetime(1970, 1, 1)
+
+ArchivedVital = namedtuple("ArchivedVital", ["id", "category", "value_primary", "value_secondary", "unit", "recorded_at"])
+
+
+# --- Encoding -----------------------------------------------------------------
+
+def _micros(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _packed(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpacked(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def encode(rows: Sequence[tuple]) -> bytes:
+    """Pack rows of ENCODED_FIELDS, in any order, into an archive blob (sorted by time)."""
+    rows = sorted(rows, key=lambda r: _micros(r[6]))
+    categories: Dict[str, int] = {}
+    units: Dict[Optional[str], int] = {}
+    ids = bytearray()
+    stamps, primaries, secondaries = array("q"), array("d"), array("d")
+    category_codes, unit_codes = array("B"), array("B")
+    notes = {}
+
+    previous = 0
+    for i, (vital_id, category, primary, secondary, unit, note, recorded_at) in enumerate(rows):
+        ids += uuid.UUID(vital_id).bytes
+        micros = _micros(recorded_at)
+        stamps.append(micros - previous)
+        previous = micros
+        category_codes.append(categories.setdefault(category, len(categories)))
+        unit_codes.append(units.setdefault(unit, len(units)))
+        primaries.append(primary)
+        secondaries.append(math.nan if secondary is None else secondary)
+        if note:
+            notes[i] = note
+
+    dictionary = json.dumps({"categories": list(categories), "units": list(units), "notes": notes}).encode()
+    columns = [bytes(ids), _packed(stamps), _packed(category_codes), _packed(unit_codes),
+               _packed(primaries), _packed(secondaries), dictionary]
+    body = b"".join(struct.pack("<I", len(c)) + c for c in columns)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, len(rows)) + zlib.compress(body, 6)
+
+
+def decode(blob: bytes, aware: bool = False) -> List[tuple]:
+    """Rows of ENCODED_FIELDS, oldest first. aware: return UTC-aware datetimes, as PostgreSQL does."""
+    magic, version, count = HEADER.unpack_from(blob)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported vitals archive format {magic!r} v{version}")
+    body = zlib.decompress(blob[HEADER.size:])
+    columns, offset = [], 0
+    while offset < len(body):
+        (size,) = struct.unpack_from("<I", body, offset)
+        columns.append(body[offset + 4:offset + 4 + size])
+        offset += 4 + size
+    ids, stamps, category_codes, unit_codes, primaries, secondaries, dictionary = columns
+    stamps = _unpacked("q", stamps)
+    primaries, secondaries = _unpacked("d", primaries), _unpacked("d", secondaries)
+    dictionary = json.loads(dictionary)
+    categories, units, notes = dictionary["categories"], dictionary["units"], dictionary["notes"]
+    tz = timezone.utc if aware else None
+    hex_ids = ids.hex()
+
+    rows, micros = [], 0
+    for i in range(count):
+        micros += stamps[i]
+        secondary = secondaries[i]
+        h = hex_ids[i * 32:i * 32 + 32]
+        rows.append((
+            f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}",
+            categories[category_codes[i]],
+            primaries[i],
+            None if math.isnan(secondary) else secondary,
+            units[unit_codes[i]],
+            notes.get(str(i)),
+            (EPOCH + timedelta(microseconds=micros)).replace(tzinfo=tz),
+        ))
+    return rows
+
+
+def _contains(blob: bytes, vital_id: str) -> bool:
+    target = uuid.UUID(vital_id).bytes
+    body = zlib.decompress(blob[HEADER.size:])
+    (size,) = struct.unpack_from("<I", body)
+    ids = body[4:4 + size]
+    position = ids.find(target)
+    while position != -1 and position % 16:
+        position = ids.find(target, position + 1)
+    return position != -1
+
+
+# --- Reading ------------------------------------------------------------------
+
+def _aware(db) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _project(rows: Iterable[tuple], fields: Sequence[str], user_id: str) -> List[tuple]:
+    """Decoded rows as tuples of fields (any of ENCODED_FIELDS or user_id)."""
+    index = [ENCODED_FIELDS.index(f) if f != "user_id" else None for f in fields]
+    return [tuple(row[i] if i is not None else user_id for i in index) for row in rows]
+
+
+def _blobs(db, user_id: str, newest_first: bool) -> Iterator[bytes]:
+    order = models.VitalArchive.month.desc() if newest_first else models.VitalArchive.month
+    query = (select(models.VitalArchive.data).where(models.VitalArchive.user_id == user_id)
+             .order_by(order).execution_options(yield_per=1))
+    for (blob,) in db.execute(query):
+        yield blob
+
+
+def archived_months(db, user_id: str, fields: Sequence[str], newest_first: bool = False) -> Iterator[List[tuple]]:
+    """The user's archived readings as rows of fields, one list per month, in time order."""
+    aware = _aware(db)
+    for blob in _blobs(db, user_id, newest_first):
+        rows = _project(decode(blob, aware), fields, user_id)
+        yield rows[::-1] if newest_first else rows
+
+
+def merged_newest_first(db, user_id: str, fields: Sequence[str], hot_rows: List[tuple]) -> Iterable[tuple]:
+    """Hot rows (already newest first) merged with the archive, newest first."""
+    months = archived_months(db, user_id, fields, newest_first=True)
+    newest = next(months, None)
+    if newest is None:
+        return hot_rows
+    position = fields.index("recorded_at")
+    archived = itertools.chain(newest, (row for month in months for row in month))
+    return heapq.merge(hot_rows, archived, key=lambda row: row[position], reverse=True)
+
+
+def latest_archived(db, user_id: str, categories: Iterable[str]) -> Dict[str, ArchivedVital]:
+    """Newest archived reading of each category, reading months from newest until all are found."""
+    wanted, found = set(categories), {}
+    if not wanted:
+        return found
+    aware = _aware(db)
+    for blob in _blobs(db, user_id, newest_first=True):
+        for vital_id, category, primary, secondary, unit, _, recorded_at in reversed(decode(blob, aware)):
+            if category in wanted and category not in found:
+                found[category] = ArchivedVital(vital_id, category, primary, secondary, unit, recorded_at)
+        if len(found) == len(wanted):
+            break
+    return found
+
+
+# --- Moving between tiers -----------------------------------------------------
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+def cutoff_for(older_than_days: int, now: Optional[datetime] = None) -> datetime:
+    """Whole months only: the start of the month containing now - older_than_days."""
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    return _month_start(now - timedelta(days=older_than_days))
+
+
+def _vital_columns():
+    return [getattr(models.Vital, f) for f in ENCODED_FIELDS]
+
+
+def archive_user(db, user_id: str, cutoff: datetime) -> int:
+    """Move the user's readings before cutoff into their months' archives; the caller commits."""
+    from ..http_cache import VITALS, bump
+
+    # One statement, so exactly the rows removed are the rows packed
+    moved = db.execute(
+        delete(models.Vital)
+        .where(models.Vital.user_id == user_id, models.Vital.recorded_at < cutoff)
+        .returning(*_vital_columns())
+    ).all()
+    if not moved:
+        return 0
+
+    months = defaultdict(list)
+    for row in moved:
+        months[_month_start(row[6]).date()].append(tuple(row))
+    existing = {e.month: e for e in db.query(models.VitalArchive).filter(
+        models.VitalArchive.user_id == user_id, models.VitalArchive.month.in_(list(months)))}
+    aware = _aware(db)
+    for month, rows in months.items():
+        entry = existing.get(month)
+        if entry is not None:
+            rows += decode(entry.data, aware)
+        else:
+            entry = models.VitalArchive(user_id=user_id, month=month)
+            db.add(entry)
+        entry.data = encode(rows)
+        entry.row_count = len(rows)
+        entry.first_recorded_at = min(r[6] for r in rows)
+        entry.last_recorded_at = max(r[6] for r in rows)
+    bump(db, user_id, VITALS)
+    return len(moved)
+
+
+def restore_containing(db, user_id: str, vital_id: str) -> bool:
+    """Move the archived month holding vital_id back to the hot table; the caller commits."""
+    try:
+        uuid.UUID(vital_id)
+    except ValueError:
+        return False
+    entries = db.query(models.VitalArchive).filter(models.VitalArchive.user_id == user_id).all()
+    entry = next((e for e in entries if _contains(e.data, vital_id)), None)
+    if entry is None:
+        return False
+    mappings = []
+    for row in decode(entry.data, _aware(db)):
+        mapping = dict(zip(ENCODED_FIELDS, row), user_id=user_id)
+        mapping["unit_override"] = models.stored_unit(mapping["category"], mapping.pop("unit"))
+        mappings.append(mapping)
+    db.bulk_insert_mappings(models.Vital, mappings)
+    db.delete(entry)
+    db.flush()
+    return True
+
+
+def archive(older_than_days: int, user_id: Optional[str] = None) -> Dict[str, int]:
+    """Archive every complete month older than the cutoff, committing per user."""
+    from .. import database
+
+    cutoff = cutoff_for(older_than_days)
+    totals = {"users": 0, "rows": 0}
+    db = database.SessionLocal()
+    try:
+        users = select(models.Vital.user_id).where(models.Vital.recorded_at < cutoff).distinct()
+        if user_id:
+            users = users.where(models.Vital.user_id == user_id)
+        for (uid,) in db.execute(users).all():
+            totals["users"] += 1
+            totals["rows"] += archive_user(db, uid, cutoff)
+            db.commit()
+    finally:
+        db.close()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old vitals into the columnar archive")
+    parser.add_argument("--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--user", default=None, help="Only this user id")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    totals = archive(args.older_than_days, args.user)
+    logger.info(f"Archived {totals['rows']} readings of {totals['users']} users "
+                f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
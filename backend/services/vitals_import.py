@@ -0,0 +1,433 @@
+"""
+Bulk import of historical vitals.
+
+An upload is streamed to disk by the route, recorded as an ImportJob, and
+parsed in a separate process, so a multi-million-row file never blocks an API
+worker. Three formats are accepted:
+
+  csv          header row with category, value_primary, recorded_at and
+               optionally value_secondary, unit, notes (extra columns such as
+               the id and user_id of our own CSV export are ignored)
+  fhir         a FHIR Bundle of Observations
+  fhir-ndjson  FHIR bulk data: one resource per line
+
+Rows are validated one at a time as they are parsed: known category (or
+LOINC code), finite value in a plausible range, unit converted to the one the
+app stores, and a timestamp that is not in the future. Rejected rows are
+counted and the first IMPORT_MAX_ERRORS reasons kept on the job; FHIR
+resources that are not vital signs are skipped.
+
+Valid rows are written IMPORT_BATCH_ROWS at a time with the seeder's bulk
+writers (executemany on SQLite, COPY on PostgreSQL). Each batch commits
+together with the job's progress counters and the user's VITALS version, so
+the status endpoint, cached vitals lists (http_cache) and the data itself
+never disagree.
+
+A user has at most one queued or running job (a partial unique index). A job
+whose worker died with its API process (a restart or deploy) would hold that
+slot forever, so jobs without progress for IMPORT_STALE_SECONDS are failed:
+at startup and before each new import. A worker only works on a job while it
+is still its own: it claims a queued job to start, and stops if the job was
+failed under it.
+"""
+
+import csv
+import io
+import json
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, update
+
+from ..config import settings
+from ..models import CATEGORY_UNITS
+
+logger = logging.getLogger(__name__)
+
+IMPORT_DIR = "backend/uploads/imports"
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+FORMATS = ("csv", "fhir", "fhir-ndjson")
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/fhir+json": "fhir",
+    "application/json": "fhir",
+    "application/fhir+ndjson": "fhir-ndjson",
+    "application/x-ndjson": "fhir-ndjson",
+    "application/ndjson": "fhir-ndjson",
+}
+
+# Plausible range of value_primary (and value_secondary for BP) in the category's unit
+RANGES = {
+    "BP": ((40, 300), (20, 200)),
+    "HR": ((20, 300), None),
+    "SpO2": ((50, 100), None),
+    "Glucose": ((10, 1500), None),
+    "Temp": ((80, 115), None),
+    "Weight": ((0.5, 500), None),
+}
+UNIT_ALIASES = {
+    "/min": "bpm", "beats/min": "bpm", "{beats}/min": "bpm",
+    "mm[Hg]": "mmHg", "mm hg": "mmHg",
+    "mg/dl": "mg/dL",
+    "[degF]": "°F", "degF": "°F", "F": "°F", "°f": "°F",
+}
+CONVERSIONS = {
+    ("Temp", "Cel"): lambda v: v * 9 / 5 + 32,
+    ("Temp", "°C"): lambda v: v * 9 / 5 + 32,
+    ("Temp", "C"): lambda v: v * 9 / 5 + 32,
+    ("Temp", "degC"): lambda v: v * 9 / 5 + 32,
+    ("Weight", "[lb_av]"): lambda v: v * 0.45359237,
+    ("Weight", "lb"): lambda v: v * 0.45359237,
+    ("Weight", "lbs"): lambda v: v * 0.45359237,
+    ("Weight", "g"): lambda v: v / 1000,
+    ("Glucose", "mmol/L"): lambda v: v * 18.016,
+}
+
+# LOINC codes of the vital-sign Observations we store
+LOINC = {
+    "8867-4": "HR",
+    "85354-9": "BP", "55284-4": "BP",
+    "59408-5": "SpO2", "2708-6": "SpO2",
+    "2339-0": "Glucose", "2345-7": "Glucose", "41653-7": "Glucose", "15074-8": "Glucose",
+    "8310-5": "Temp", "8331-1": "Temp",
+    "29463-7": "Weight", "3141-9": "Weight",
+}
+BP_SYSTOLIC, BP_DIASTOLIC = "8480-6", "8462-4"
+
+# (category, value_primary, value_secondary, unit, notes, recorded_at); unit is
+# always None, values being converted to the category's standard unit
+Measurement = Tuple[str, float, Optional[float], None, Optional[str], datetime]
+
+
+class RowError(ValueError):
+    pass
+
+
+class JobLost(Exception):
+    """The job is no longer running: it was failed as stale while its worker went on."""
+
+
+# --- Validation ---------------------------------------------------------------
+
+def _number(value, name: str) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise RowError(f"{name} is not a number: {value!r}")
+    if not math.isfinite(number):
+        raise RowError(f"{name} is not finite")
+    return number
+
+
+def _timestamp(value) -> datetime:
+    if not value:
+        raise RowError("missing timestamp")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise RowError(f"invalid timestamp: {value!r}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    if parsed > datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=1):
+        raise RowError(f"timestamp in the future: {value}")
+    return parsed
+
+
+def measurement(category: str, primary, secondary, unit: Optional[str], notes: Optional[str],
+                recorded_at) -> Measurement:
+    """A validated row in stored units, or RowError."""
+    if category not in CATEGORY_UNITS:
+        raise RowError(f"unknown category: {category!r}")
+    primary = _number(primary, "value")
+    secondary = _number(secondary, "second value") if secondary not in (None, "") else None
+    if category == "BP" and secondary is None:
+        raise RowError("blood pressure needs systolic and diastolic values")
+
+    unit = UNIT_ALIASES.get(unit, unit) or CATEGORY_UNITS[category]
+    if unit != CATEGORY_UNITS[category]:
+        convert = CONVERSIONS.get((category, unit))
+        if convert is None:
+            raise RowError(f"unsupported unit for {category}: {unit!r}")
+        primary = round(convert(primary), 2)
+
+    (low, high), secondary_range = RANGES[category]
+    if not low <= primary <= high:
+        raise RowError(f"{category} value out of range: {primary:g}")
+    if secondary is not None and secondary_range and not secondary_range[0] <= secondary <= secondary_range[1]:
+        raise RowError(f"{category} second value out of range: {secondary:g}")
+    return category, primary, secondary, None, notes or None, _timestamp(recorded_at)
+
+
+# --- Parsers ------------------------------------------------------------------
+# Each yields (line or entry number, measurement or None, error or None);
+# (n, None, None) is a skipped resource.
+
+def parse_csv(source: BinaryIO) -> Iterator[tuple]:
+    reader = csv.reader(io.TextIOWrapper(source, encoding="utf-8-sig", newline=""))
+    header = [name.strip().lower() for name in next(reader, [])]
+    missing = {"category", "value_primary", "recorded_at"} - set(header)
+    if missing:
+        raise RowError(f"CSV header is missing {', '.join(sorted(missing))}")
+    index = {name: i for i, name in enumerate(header)}
+    columns = [index.get(name) for name in ("category", "value_primary", "value_secondary", "unit", "notes", "recorded_at")]
+    width = len(header)
+
+    for line, row in enumerate(reader, start=2):
+        if not row:
+            continue
+        if len(row) < width:
+            yield line, None, f"expected {width} columns, got {len(row)}"
+            continue
+        try:
+            yield line, measurement(*(row[i] if i is not None else None for i in columns)), None
+        except RowError as e:
+            yield line, None, str(e)
+
+
+def _codes(concept: Optional[dict]) -> set:
+    return {c.get("code") for c in (concept or {}).get("coding", []) if "loinc" in (c.get("system") or "")}
+
+
+def _quantity(holder: dict) -> Tuple[Optional[float], Optional[str]]:
+    quantity = holder.get("valueQuantity") or {}
+    return quantity.get("value"), quantity.get("code") or quantity.get("unit")
+
+
+def observation(resource: dict) -> Optional[Measurement]:
+    """A vital-sign Observation as a measurement; None for anything else."""
+    if resource.get("resourceType") != "Observation":
+        return None
+    category = next((LOINC[c] for c in _codes(resource.get("code")) if c in LOINC), None)
+    if category is None:
+        return None
+    if resource.get("status") in ("entered-in-error", "cancelled"):
+        raise RowError(f"observation status is {resource['status']}")
+
+    recorded_at = (resource.get("effectiveDateTime") or resource.get("effectiveInstant")
+                   or (resource.get("effectivePeriod") or {}).get("start") or resource.get("issued"))
+    notes = next((n.get("text") for n in resource.get("note", []) if n.get("text")), None)
+
+    if category == "BP":
+        components = {code: _quantity(c) for c in resource.get("component", []) for code in _codes(c.get("code"))}
+        systolic, unit = components.get(BP_SYSTOLIC, (None, None))
+        diastolic, _ = components.get(BP_DIASTOLIC, (None, None))
+        if systolic is None or diastolic is None:
+            raise RowError("blood pressure observation without systolic and diastolic components")
+        return measurement(category, systolic, diastolic, unit, notes, recorded_at)
+
+    value, unit = _quantity(resource)
+    if value is None:
+        raise RowError(f"{category} observation without valueQuantity")
+    return measurement(category, value, None, unit, notes, recorded_at)
+
+
+def _resource_row(n: int, resource) -> tuple:
+    try:
+        return n, observation(resource) if isinstance(resource, dict) else None, None
+    except RowError as e:
+        return n, None, str(e)
+
+
+def parse_fhir_bundle(source: BinaryIO) -> Iterator[tuple]:
+    try:
+        import ijson  # optional: streams entries instead of loading the whole bundle
+        resources = (entry.get("resource") for entry in ijson.items(source, "entry.item", use_float=True))
+    except ImportError:
+        bundle = json.load(source)
+        if not isinstance(bundle, dict) or bundle.get("resourceType") != "Bundle":
+            raise RowError("not a FHIR Bundle")
+        resources = (entry.get("resource") for entry in bundle.get("entry", []))
+    for n, resource in enumerate(resources, start=1):
+        yield _resource_row(n, resource)
+
+
+def parse_fhir_ndjson(source: BinaryIO) -> Iterator[tuple]:
+    for line, text in enumerate(source, start=1):
+        if not text.strip():
+            continue
+        try:
+            resource = json.loads(text)
+        except ValueError:
+            yield line, None, "invalid JSON"
+            continue
+        yield _resource_row(line, resource)
+
+
+PARSERS = {"csv": parse_csv, "fhir": parse_fhir_bundle, "fhir-ndjson": parse_fhir_ndjson}
+
+
+# --- Worker (runs in the pool's processes) ------------------------------------
+
+class _CountingReader(io.RawIOBase):
+    """Counts the bytes read from a file, for progress."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.raw.readinto(buffer)
+        self.count += n or 0
+        return n
+
+
+def _write_batch(db, write, job_id: str, user_id: str, rows: List[tuple], progress: dict):
+    from .. import models
+    from ..http_cache import VITALS, bump
+
+    if rows:
+        write(db.connection().connection, "vitals", rows)
+        bump(db, user_id, VITALS)
+    updated = db.query(models.ImportJob).filter(
+        models.ImportJob.id == job_id, models.ImportJob.status == RUNNING
+    ).update(progress, synchronize_session=False)
+    if updated != 1:
+        raise JobLost(job_id)
+    db.commit()
+
+
+def run_import(job_id: str, path: str):
+    """Process one import job to completion; the job row records the outcome."""
+    from .. import database, models
+    from ..seed import write_postgres, write_sqlite
+
+    db = database.SessionLocal()
+    try:
+        claimed = db.query(models.ImportJob).filter(
+            models.ImportJob.id == job_id, models.ImportJob.status == QUEUED
+        ).update({"status": RUNNING, "started_at": datetime.now(timezone.utc)}, synchronize_session=False)
+        db.commit()
+        if claimed != 1:
+            logger.warning(f"Import {job_id} is no longer queued, skipping it")
+            return
+        job = db.get(models.ImportJob, job_id)
+        user_id, fmt = job.user_id, job.format
+
+        write = write_postgres if db.get_bind().dialect.name == "postgresql" else write_sqlite
+        counts = {"rows_imported": 0, "rows_skipped": 0, "rows_rejected": 0}
+        errors: List[str] = []
+        batch: List[tuple] = []
+        with open(path, "rb", buffering=0) as raw:
+            counter = _CountingReader(raw)
+            source = io.BufferedReader(counter, 1024 * 1024)
+            for n, row, error in PARSERS[fmt](source):
+                if row is not None:
+                    # Column order of seed.COLUMNS["vitals"]
+                    batch.append((str(uuid.uuid4()), user_id) + row)
+                elif error is not None:
+                    counts["rows_rejected"] += 1
+                    if len(errors) < settings.IMPORT_MAX_ERRORS:
+                        errors.append(f"{'line' if fmt != 'fhir' else 'entry'} {n}: {error}")
+                else:
+                    counts["rows_skipped"] += 1
+                if len(batch) >= settings.IMPORT_BATCH_ROWS:
+                    counts["rows_imported"] += len(batch)
+                    _write_batch(db, write, job_id, user_id, batch,
+                                 {**counts, "bytes_processed": counter.count, "errors": list(errors)})
+                    batch = []
+
+            counts["rows_imported"] += len(batch)
+            _write_batch(db, write, job_id, user_id, batch, {
+                **counts, "bytes_processed": counter.count, "errors": list(errors),
+                "status": SUCCEEDED, "finished_at": datetime.now(timezone.utc),
+            })
+    except JobLost:
+        db.rollback()
+        logger.warning(f"Import {job_id} was failed while running, stopping")
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Import {job_id} failed: {e}")
+        db.query(models.ImportJob).filter(models.ImportJob.id == job_id).update({
+            "status": FAILED, "finished_at": datetime.now(timezone.utc),
+            "errors": [f"import stopped: {e}"] if isinstance(e, (RowError, ValueError)) else ["import stopped: internal error"],
+        })
+        db.commit()
+    finally:
+        db.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# --- Scheduling (API process) -------------------------------------------------
+
+def fail_stale(user_id: Optional[str] = None):
+    """UPDATE failing the queued or running jobs (of one user, or all) without progress for IMPORT_STALE_SECONDS."""
+    from .. import models
+
+    now = datetime.now(timezone.utc)
+    statement = update(models.ImportJob).where(
+        models.ImportJob.status.in_(ACTIVE),
+        func.coalesce(models.ImportJob.updated_at, models.ImportJob.created_at)
+        < now - timedelta(seconds=settings.IMPORT_STALE_SECONDS),
+    )
+    if user_id is not None:
+        statement = statement.where(models.ImportJob.user_id == user_id)
+    return statement.values(
+        status=FAILED, finished_at=now, errors=["import stopped: no progress, its worker was lost"],
+    ).execution_options(synchronize_session=False)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.IMPORT_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def upload_path(job_id: str) -> str:
+    os.makedirs(IMPORT_DIR, exist_ok=True)
+    return os.path.join(IMPORT_DIR, job_id)
+
+
+def _on_done(job_id: str, future: Future):
+    """The worker records its own failures; this catches a worker that died."""
+    try:
+        future.result()
+    except Exception as e:
+        from .. import database, models
+
+        logger.warning(f"Import {job_id} worker crashed: {e}")
+        db = database.SessionLocal()
+        try:
+            db.query(models.ImportJob).filter(
+                models.ImportJob.id == job_id, models.ImportJob.status.in_(ACTIVE)
+            ).update({"status": FAILED, "finished_at": datetime.now(timezone.utc),
+                      "errors": ["import stopped: worker crashed"]}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+def submit(job_id: str):
+    future = _executor().submit(run_import, job_id, upload_path(job_id))
+    future.add_done_callback(lambda f: _on_done(job_id, f))
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,179 @@
+"""
+Shared test setup. Run from the repository root:
+
+    python -m pytest backend/tests
+
+Settings are read once at import, so the environment is fixed here, before
+anything from backend is imported: a scratch SQLite database, no outbound
+LLM or SMS calls, and every request checked against the query budget its
+endpoint declares (see query_budget.py).
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+_scratch = tempfile.mkdtemp(prefix="arodoc-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'app.db')}"
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["QUERY_BUDGET_MODE"] = "raise"
+os.environ.setdefault("METRICS_ENABLED", "false")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+TEST_PASSWORD = "correct horse battery staple"
+API = "/api/v1"
+
+
+def pytest_configure(config):
+    # The db_query_budget fixture
+    config.pluginmanager.import_plugin("backend.pytest_query_budget")
+
+
+@pytest.fixture(scope="session")
+def app():
+    from backend import migrate
+
+    migrate.upgrade()
+    from backend.main import app
+
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def user(client):
+    """A fresh account; the access and refresh tokens of its first sign-in."""
+    email = f"user-{os.urandom(6).hex()}@example.com"
+    client.post("/api/v1/auth/signup", json={"email": email, "password": TEST_PASSWORD, "full_name": "Test User"})
+    tokens = client.post("/api/v1/auth/token", data={"username": email, "password": TEST_PASSWORD}).json()
+    return {"email": email, **tokens, "headers": {"Authorization": f"Bearer {tokens['access_token']}"}}
+
+
+RECOMMENDATIONS_JSON = '{"diet": ["Drink water"], "activity": ["Walk"], "specialists": ["General Physician"]}'
+
+
+class FakeLLMResponse:
+    usage_metadata = None
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Take the AI paths of the routes without calling Gemini; counts the calls."""
+    from backend.config import settings
+    from backend.services import llm
+
+    calls = []
+
+    def generate(contents, model_name=None):
+        calls.append(contents)
+        return FakeLLMResponse(RECOMMENDATIONS_JSON)
+
+    async def generate_async(contents, model_name=None):
+        calls.append(contents)
+        return FakeLLMResponse("Stay hydrated, and consult your doctor about anything unusual.")
+
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "generate", generate)
+    monkeypatch.setattr(llm, "generate_async", generate_async)
+    return calls
+
+
+@pytest.fixture
+def patient(client, user):
+    """A user with a birth date, every vital category, reports and medicines."""
+    from backend import database, models
+
+    headers = user["headers"]
+    client.put(f"{API}/health/profile", headers=headers, json={"dob": "1960-05-01T00:00:00", "gender": "F"})
+    for _ in range(3):
+        response = client.post(f"{API}/health/vitals", headers=headers, json={
+            "heart_rate": "72", "blood_pressure": "135/88", "blood_sugar": "150",
+            "weight": "70", "temperature": "98.6",
+        })
+        assert response.status_code == 200
+
+    db = database.SessionLocal()
+    try:
+        user_id = db.query(models.User.id).filter(models.User.email == user["email"]).scalar()
+        now = datetime.now(timezone.utc)
+        for i in range(4):
+            db.add(models.Report(user_id=user_id, file_url=f"/reports/{i}", file_type="pdf",
+                                 summary="Mildly raised LDL", risk_level="YELLOW",
+                                 created_at=now - timedelta(days=i)))
+            db.add(models.Medicine(user_id=user_id, name=f"Medicine {i}", dosage="5mg",
+                                   schedule_time=now + timedelta(hours=i)))
+        db.commit()
+    finally:
+        db.close()
+    return user
+
+
+@pytest.fixture
+def vitals_history(user):
+    """
+    A user with readings in the two months before the archive cutoff
+    (vitals_archive.cutoff_for(ARCHIVE_AFTER_DAYS)) and two recent ones.
+    Temperature and weight only have old readings; the weight is in pounds.
+    Nothing is archived yet. ids maps a label to each reading's id.
+    """
+    from backend import database, models
+    from backend.config import settings
+    from backend.services import vitals_archive
+
+    cutoff = vitals_archive.cutoff_for(settings.ARCHIVE_AFTER_DAYS)
+    last_month = (cutoff - timedelta(days=1)).replace(day=10, hour=8)
+    month_before = (last_month.replace(day=1) - timedelta(days=1)).replace(day=10, hour=8)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    readings = {
+        "old_hr": ("HR", 64, None, None, None, month_before),
+        "old_bp": ("BP", 128, 84, None, "after a walk", month_before + timedelta(hours=1)),
+        "temp": ("Temp", 99.1, None, None, None, month_before + timedelta(days=1)),
+        "weight": ("Weight", 176, None, "lb", None, last_month),
+        "hr": ("HR", 70, None, None, "resting", last_month + timedelta(hours=1)),
+        "new_hr": ("HR", 72, None, None, None, now - timedelta(days=2)),
+        "new_bp": ("BP", 120, 80, None, None, now - timedelta(days=1)),
+    }
+
+    db = database.SessionLocal()
+    try:
+        user_id = db.query(models.User.id).filter(models.User.email == user["email"]).scalar()
+        vitals = {}
+        for label, (category, primary, secondary, unit, notes, recorded_at) in readings.items():
+            vitals[label] = models.Vital(user_id=user_id, category=category, value_primary=primary,
+                                         value_secondary=secondary, notes=notes, recorded_at=recorded_at)
+            if unit:
+                vitals[label].unit = unit
+            db.add(vitals[label])
+        db.commit()
+        ids = {label: vital.id for label, vital in vitals.items()}
+    finally:
+        db.close()
+    return {**user, "user_id": user_id, "ids": ids, "cutoff": cutoff}
+
+
+@pytest.fixture
+def archive(vitals_history):
+    """Archives the vitals_history user's old months; returns how many readings moved."""
+    from backend import database
+    from backend.services import vitals_archive
+
+    def run():
+        db = database.SessionLocal()
+        try:
+            moved = vitals_archive.archive_user(db, vitals_history["user_id"], vitals_history["cutoff"])
+            db.commit()
+            return moved
+        finally:
+            db.close()
+
+    return run
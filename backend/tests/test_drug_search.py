@@ -0,0 +1,71 @@
+"""Resolving scanned medicine names: typos, brands, strengths and dosage forms."""
+
+import json
+
+import pytest
+
+from backend.config import BASE_DIR, settings
+from backend.services.drug_search import DrugSearchIndex, edit_distance, normalize_drug_name
+
+
+@pytest.fixture(scope="module")
+def index():
+    with open(BASE_DIR / settings.DRUG_CATALOG_PATH, encoding="utf-8") as f:
+        return DrugSearchIndex.build(json.load(f))
+
+
+@pytest.mark.parametrize("name, drug_id", [
+    ("Metfromin 500mg SR", "metformin"),  # transposition
+    ("Paracetmaol", "paracetamol"),
+    ("Amlodipnie 5 mg", "amlodipine"),
+    ("Ibuprfen 400", "ibuprofen"),  # dropped letter
+    ("Atorvastatln", "atorvastatin"),  # misread letter
+    ("Glucophgae 850", "metformin"),  # misspelled brand
+])
+def test_typos_resolve(index, name, drug_id):
+    assert index.resolve(name)["id"] == drug_id
+
+
+@pytest.mark.parametrize("name, drug_id, matched", [
+    ("Crocin", "paracetamol", "crocin"),
+    ("Tab. Dolo-650 mg", "paracetamol", "dolo"),
+    ("Augmentin 625", "amoxicillin_clavulanate", "augmentin"),
+    ("Tab Ecosprin 75", "aspirin", "ecosprin"),
+])
+def test_brands_resolve_to_the_generic(index, name, drug_id, matched):
+    match = index.resolve(name)
+    assert (match["id"], match["matched"], match["score"]) == (drug_id, matched, 1.0)
+
+
+@pytest.mark.parametrize("name, base, strength", [
+    ("Tab. Dolo-650 mg", "dolo", "650 mg"),
+    ("Metformin 500mg SR", "metformin", "500mg"),
+    ("Cap. Omez 20", "omez", "20"),
+    ("Syp. Calpol 120 mg/5 ml", "calpol", "120 mg/5 ml"),
+    ("Telma 40 Tablets", "telma", "40"),
+])
+def test_strength_and_dosage_form_are_stripped(index, name, base, strength):
+    assert normalize_drug_name(name) == (base, strength)
+    assert index.resolve(name)["strength"] == strength
+
+
+def test_unrelated_names_do_not_resolve(index):
+    assert index.resolve("xyzzy") is None
+    assert index.resolve("Tab. 500 mg") is None
+
+
+def test_autocomplete(index):
+    assert index.autocomplete("metf")[0]["id"] == "metformin"
+    assert index.autocomplete("mtef")[0]["id"] == "metformin"  # misspelled prefix
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("metformin", "metformin", 0),
+    ("metfromin", "metformin", 1),
+    ("ibuprfen", "ibuprofen", 1),
+    ("glucophgae", "glucophage", 1),
+    ("abcd", "badc", 2),
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b, 3) == distance
+    assert edit_distance(a, b, 0) == min(distance, 1)  # Beyond the limit: limit + 1
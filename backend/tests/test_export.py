@@ -0,0 +1,88 @@
+"""The streaming export, read back: NDJSON, CSV and zip, with archived vitals."""
+
+import csv
+import io
+import json
+import zipfile
+
+import pytest
+
+from backend import database, models, schemas
+from backend.services import export
+
+API = "/api/v1"
+VITAL_ORDER = ("old_hr", "old_bp", "temp", "weight", "hr", "new_hr", "new_bp")  # Oldest first
+
+
+@pytest.fixture
+def exported_user(vitals_history, archive, tmp_path):
+    """The vitals_history user, archived, with one report whose file is stored and one whose file is gone."""
+    archive()
+    stored = tmp_path / "lipids.pdf"
+    stored.write_bytes(b"%PDF-1.4 lipid panel")
+    db = database.SessionLocal()
+    try:
+        reports = [models.Report(user_id=vitals_history["user_id"], file_url=path, file_type="application/pdf",
+                                 summary="Lipid panel", risk_level="GREEN")
+                   for path in (str(stored), str(tmp_path / "missing.pdf"))]
+        db.add_all(reports)
+        db.commit()
+        report_ids = [r.id for r in reports]
+    finally:
+        db.close()
+    return {**vitals_history, "report_ids": report_ids, "stored": stored}
+
+
+def ndjson_records(data: bytes):
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+def test_ndjson(exported_user):
+    header, *records = ndjson_records(b"".join(export.stream_ndjson(exported_user["user_id"])))
+    assert header["type"] == "export" and header["format_version"] == export.FORMAT_VERSION
+    assert header["user_id"] == exported_user["user_id"]
+    assert header["sections"] == list(export.SECTION_NAMES)
+
+    vitals = [r for r in records if r["type"] == "vital"]
+    # Archived months come before the hot rows, all in time order
+    assert [v["id"] for v in vitals] == [exported_user["ids"][label] for label in VITAL_ORDER]
+    assert set(vitals[0]) == {"type", *schemas.VitalResponse.model_fields}
+    assert next(v for v in vitals if v["id"] == exported_user["ids"]["weight"])["unit"] == "lb"
+    assert [r["id"] for r in records if r["type"] == "report"] == exported_user["report_ids"]
+    assert [r["type"] for r in records] == sorted((r["type"] for r in records), key=export.SECTION_NAMES.index)
+
+
+def test_csv(exported_user):
+    data = b"".join(export.stream_csv(exported_user["user_id"], "vital")).decode()
+    header, *rows = list(csv.reader(io.StringIO(data)))
+    assert header == list(schemas.VitalResponse.model_fields)
+    assert [row[header.index("id")] for row in rows] == [exported_user["ids"][label] for label in VITAL_ORDER]
+    assert rows[1][header.index("notes")] == "after a walk"
+
+
+def test_csv_of_an_empty_section_has_its_header(exported_user):
+    data = b"".join(export.stream_csv(exported_user["user_id"], "medicine")).decode()
+    assert list(csv.reader(io.StringIO(data))) == [list(schemas.MedicineResponse.model_fields)]
+
+
+def test_zip(exported_user):
+    data = b"".join(export.stream_zip(exported_user["user_id"]))
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        stored_id = exported_user["report_ids"][0]
+        # The report whose file is missing is listed in the record but has no entry
+        assert archive.namelist() == ["record.ndjson", f"reports/{stored_id}.pdf"]
+        assert archive.read(f"reports/{stored_id}.pdf") == exported_user["stored"].read_bytes()
+        header, *records = ndjson_records(archive.read("record.ndjson"))
+
+    _, *expected = ndjson_records(b"".join(export.stream_ndjson(exported_user["user_id"])))
+    assert header["type"] == "export" and records == expected
+
+
+def test_route(client, exported_user):
+    headers = exported_user["headers"]
+    response = client.get(f"{API}/export", params={"format": "csv", "section": "vital"}, headers=headers)
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+    assert len(response.text.splitlines()) == 1 + len(VITAL_ORDER)
+    assert client.get(f"{API}/export", params={"format": "csv"}, headers=headers).status_code == 400
@@ -0,0 +1,59 @@
+"""Nearest-facility queries against a brute-force scan, inside and outside the data's extent."""
+
+import random
+
+import pytest
+
+from backend.services.facility_index import FacilityIndex, haversine_km
+
+
+def facility(i, lat, lng, emergency=False):
+    return {"id": str(i), "name": f"Hospital {i}", "type": "hospital", "specialty": "General",
+            "city": "Town", "address": "", "lat": lat, "lng": lng, "has_emergency": emergency}
+
+
+@pytest.fixture(scope="module")
+def facilities():
+    rng = random.Random(29)
+    return [facility(i, rng.uniform(10, 11.5), rng.uniform(76, 77.5), emergency=i % 4 == 0) for i in range(300)]
+
+
+def brute_force(facilities, lat, lng, k, radius_km=None, emergency_only=False):
+    scored = sorted((haversine_km(lat, lng, f["lat"], f["lng"]), f["id"]) for f in facilities
+                    if not emergency_only or f["has_emergency"])
+    return [i for d, i in scored if radius_km is None or d <= radius_km][:k]
+
+
+QUERIES = [
+    (10.7, 76.8),   # inside
+    (11.49, 77.49),  # at the edge
+    (5.0, 70.0),    # well outside the bounding box
+    (10.5, 80.0),   # outside, level with the data
+    (-20.0, 150.0),  # far away
+]
+
+
+@pytest.mark.parametrize("lat, lng", QUERIES)
+def test_nearest_matches_brute_force(facilities, lat, lng):
+    index = FacilityIndex(facilities, cell_deg=0.1)
+    assert [f["id"] for f in index.nearest(lat, lng, k=5)] == brute_force(facilities, lat, lng, 5)
+
+
+@pytest.mark.parametrize("lat, lng", QUERIES)
+def test_emergency_only(facilities, lat, lng):
+    index = FacilityIndex(facilities, cell_deg=0.1)
+    found = index.nearest(lat, lng, k=3, emergency_only=True)
+    assert [f["id"] for f in found] == brute_force(facilities, lat, lng, 3, emergency_only=True)
+    assert all(f["has_emergency"] for f in found)
+
+
+@pytest.mark.parametrize("lat, lng, radius_km", [(10.7, 76.8, 5), (10.7, 76.8, 40), (9.5, 76.8, 80), (5.0, 70.0, 100)])
+def test_radius(facilities, lat, lng, radius_km):
+    index = FacilityIndex(facilities, cell_deg=0.1)
+    found = index.nearest(lat, lng, k=10, radius_km=radius_km)
+    assert [f["id"] for f in found] == brute_force(facilities, lat, lng, 10, radius_km=radius_km)
+    assert all(f["distance_km"] <= radius_km + 0.01 for f in found)
+
+
+def test_empty_index():
+    assert FacilityIndex([]).nearest(10.0, 76.0) == []
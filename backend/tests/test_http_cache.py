@@ -0,0 +1,31 @@
+"""ETags and 304s across content-codings."""
+
+from backend.compression import brotli
+
+API = "/api/v1"
+CODINGS = ("gzip", "identity") + (("br",) if brotli is not None else ())
+
+
+def test_each_coding_has_its_own_strong_etag(client, user):
+    headers = user["headers"]
+    for _ in range(30):  # Enough rows for the list to pass the compression threshold
+        client.post(f"{API}/health/vitals", headers=headers, json={"heart_rate": "70", "weight": "80"})
+
+    tags = {}
+    for coding in CODINGS:
+        response = client.get(f"{API}/health/vitals", headers={**headers, "Accept-Encoding": coding})
+        assert response.status_code == 200
+        assert response.headers.get("content-encoding", "identity") == coding
+        tags[coding] = response.headers["etag"]
+    assert len(set(tags.values())) == len(CODINGS)
+    assert tags["gzip"] == tags["identity"][:-1] + '-gzip"'
+
+    for coding, tag in tags.items():
+        response = client.get(f"{API}/health/vitals",
+                              headers={**headers, "Accept-Encoding": coding, "If-None-Match": tag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == tag
+
+    client.post(f"{API}/health/vitals", headers=headers, json={"heart_rate": "71"})
+    response = client.get(f"{API}/health/vitals", headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": tags["gzip"]})
+    assert response.status_code == 200
@@ -0,0 +1,25 @@
+"""Startup stays lean: heavy SDKs load on first use, and importing the app stays within budget."""
+
+import json
+import os
+import subprocess
+import sys
+
+from backend.benchmarks.import_time import (
+    BUDGET_MS, LAZY_PACKAGES, REPO_ROOT, best_profile, eager_heavy_imports, total_ms,
+)
+
+
+def test_heavy_sdks_are_not_imported_at_startup():
+    result = subprocess.run(
+        [sys.executable, "-c", "import json, sys, backend.main; print(json.dumps(sorted(sys.modules)))"],
+        cwd=REPO_ROOT, env=dict(os.environ), capture_output=True, text=True, check=True,
+    )
+    modules = json.loads(result.stdout.splitlines()[-1])
+    assert "backend.main" in modules
+    assert eager_heavy_imports(modules) == [], f"load on demand: {LAZY_PACKAGES}"
+
+
+def test_import_time_within_budget():
+    rows = best_profile("backend.main", dict(os.environ), runs=3)
+    assert total_ms(rows) <= BUDGET_MS
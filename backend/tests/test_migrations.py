@@ -0,0 +1,128 @@
+"""Migration chain: fresh databases, legacy create_all() databases and the models."""
+
+import sqlite3
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+
+from backend import migrate, models
+
+# SQLite schema that Base.metadata.create_all() built before migrations
+# existed, frozen: revision 0001 has to match it, not the other way round.
+LEGACY_SCHEMA = """
+CREATE TABLE users (
+    id VARCHAR NOT NULL,
+    email VARCHAR NOT NULL,
+    hashed_password VARCHAR NOT NULL,
+    full_name VARCHAR,
+    role VARCHAR,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE TABLE profiles (
+    id VARCHAR NOT NULL, user_id VARCHAR, dob DATETIME, gender VARCHAR, height FLOAT,
+    weight FLOAT, blood_type VARCHAR,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE vitals (
+    id VARCHAR NOT NULL, user_id VARCHAR, category VARCHAR NOT NULL, value_primary FLOAT NOT NULL,
+    value_secondary FLOAT, unit VARCHAR, notes VARCHAR, recorded_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE reports (
+    id VARCHAR NOT NULL, user_id VARCHAR, file_url VARCHAR NOT NULL, file_type VARCHAR,
+    analysis_result JSON, summary TEXT, risk_level VARCHAR, created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE emergency_contacts (
+    id VARCHAR NOT NULL, user_id VARCHAR, name VARCHAR NOT NULL, relationship VARCHAR,
+    phone_number VARCHAR NOT NULL, email VARCHAR,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE alerts (
+    id VARCHAR NOT NULL, user_id VARCHAR, type VARCHAR, message TEXT, location JSON,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE medicines (
+    id VARCHAR NOT NULL, user_id VARCHAR, name VARCHAR NOT NULL, dosage VARCHAR, timing VARCHAR,
+    schedule_time DATETIME, status VARCHAR, taken_at DATETIME, created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+"""
+
+USER_ID = "0b6f3f55-32c4-4bb4-9a52-1f3cf1e8e1a1"
+VITAL_ID = "6f1c2d8e-93a7-4d0b-8f5e-2b7f0c4a9d11"
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(migrate.alembic_config()).get_current_head()
+
+
+def current_revision(url: str) -> str:
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            return MigrationContext.configure(connection).get_current_revision()
+    finally:
+        engine.dispose()
+
+
+def schema_drift(url: str) -> list:
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            return compare_metadata(MigrationContext.configure(connection), models.Base.metadata)
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "migrations.db"
+    return path, f"sqlite:///{path}"
+
+
+def test_fresh_database_matches_models(database):
+    _, url = database
+    migrate.upgrade(database_url=url)
+    assert current_revision(url) == head_revision()
+    assert schema_drift(url) == []
+
+
+def test_legacy_database_upgrades_with_its_data(database):
+    path, url = database
+    connection = sqlite3.connect(path)
+    connection.executescript(LEGACY_SCHEMA)
+    connection.execute("INSERT INTO users (id, email, hashed_password) VALUES (?, ?, ?)",
+                       (USER_ID, "legacy@example.com", "x"))
+    connection.execute("INSERT INTO vitals (id, user_id, category, value_primary, unit, recorded_at) "
+                       "VALUES (?, ?, 'HR', 72, 'bpm', '2025-01-01 08:00:00')", (VITAL_ID, USER_ID))
+    connection.commit()
+    connection.close()
+
+    migrate.upgrade(database_url=url)
+
+    assert current_revision(url) == head_revision()
+    assert schema_drift(url) == []
+    connection = sqlite3.connect(path)
+    try:
+        assert connection.execute("SELECT email FROM users").fetchall() == [("legacy@example.com",)]
+        assert connection.execute("SELECT COUNT(*) FROM vitals").fetchone() == (1,)
+        assert connection.execute("SELECT COUNT(*) FROM vendors").fetchone()[0] > 0
+        assert connection.execute("SELECT COUNT(*) FROM facilities").fetchone()[0] > 0
+    finally:
+        connection.close()
+
+
+def test_downgrade_to_baseline_and_back(database):
+    _, url = database
+    migrate.upgrade(database_url=url)
+    migrate.downgrade(migrate.BASELINE_REVISION, database_url=url)
+    assert current_revision(url) == migrate.BASELINE_REVISION
+    migrate.upgrade(database_url=url)
+    assert schema_drift(url) == []
@@ -0,0 +1,89 @@
+"""
+Every endpoint that declares @budget(n) is exercised here with realistic data.
+conftest.py runs the app with QUERY_BUDGET_MODE=raise, so a request that
+issues more statements than its endpoint declares fails the test.
+"""
+
+import pytest
+
+from backend.config import settings
+from backend.query_budget import QueryBudgetExceeded
+from backend.routers import analysis, assistant, auth, emergency, export, health, medicines
+
+API = "/api/v1"
+
+COVERED = {
+    ("POST", f"{API}/health/vitals"),
+    ("GET", f"{API}/health/vitals"),
+    ("GET", f"{API}/health/profile"),
+    ("GET", f"{API}/health/dashboard"),
+    ("GET", f"{API}/health/imports/{{job_id}}"),
+    ("GET", f"{API}/health/recommendations"),
+    ("POST", f"{API}/assistant/chat"),
+    ("GET", f"{API}/api/medicines/"),
+}
+
+
+def test_every_declared_budget_is_covered():
+    declared = {
+        (method, API + route.path)
+        for module in (analysis, assistant, auth, emergency, export, health, medicines)
+        for route in module.router.routes if hasattr(route.endpoint, "query_budget")
+        for method in route.methods
+    }
+    assert declared == COVERED
+
+
+def test_vitals_profile_and_dashboard(client, patient):
+    headers = patient["headers"]
+    assert client.post(f"{API}/health/vitals", headers=headers, json={"heart_rate": "80"}).status_code == 200
+    vitals = client.get(f"{API}/health/vitals", headers=headers)
+    assert vitals.status_code == 200 and len(vitals.json()) == 16
+    assert client.get(f"{API}/health/vitals", headers={**headers, "If-None-Match": vitals.headers["etag"]}).status_code == 304
+    assert client.get(f"{API}/health/profile", headers=headers).status_code == 200
+    dashboard = client.get(f"{API}/health/dashboard", headers=headers)
+    assert dashboard.status_code == 200 and dashboard.json()["recent_reports_count"] == 4
+
+
+def test_medicines(client, patient):
+    response = client.get(f"{API}/api/medicines/", headers=patient["headers"])
+    assert response.status_code == 200 and len(response.json()) == 4
+
+
+def test_import_status(client, user):
+    csv = b"category,value_primary,recorded_at\nHR,70,2024-01-01T08:00:00Z\n"
+    job = client.post(f"{API}/health/imports", headers={**user["headers"], "Content-Type": "text/csv"}, content=csv)
+    assert job.status_code == 202
+    assert client.get(f"{API}/health/imports/{job.json()['id']}", headers=user["headers"]).status_code == 200
+
+
+def test_recommendations_ai_cached_and_rule_based(client, patient, fake_llm, monkeypatch):
+    headers = patient["headers"]
+    first = client.get(f"{API}/health/recommendations", headers=headers)
+    assert first.status_code == 200 and first.json()["ai_powered"] is True
+    assert client.get(f"{API}/health/recommendations", headers=headers).json() == first.json()
+    assert len(fake_llm) == 1
+
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "")
+    client.post(f"{API}/health/vitals", headers=headers, json={"heart_rate": "75"})
+    assert client.get(f"{API}/health/recommendations", headers=headers).json()["ai_powered"] is False
+
+
+def test_chat(client, patient, fake_llm):
+    response = client.post(f"{API}/assistant/chat", headers=patient["headers"],
+                           json={"message": "How is my blood pressure?"})
+    assert response.status_code == 200 and not response.json()["is_emergency"]
+    assert len(fake_llm) == 1
+
+
+def test_exceeding_a_declared_budget_fails(client, patient, monkeypatch):
+    monkeypatch.setattr(health.get_dashboard, "query_budget", (1, None))
+    with pytest.raises(QueryBudgetExceeded, match="/health/dashboard"):
+        client.get(f"{API}/health/dashboard", headers=patient["headers"])
+
+
+def test_db_query_budget_fixture(client, patient, db_query_budget):
+    with pytest.raises(QueryBudgetExceeded):
+        with db_query_budget(2, label="profile and dashboard"):
+            client.get(f"{API}/health/profile", headers=patient["headers"])
+            client.get(f"{API}/health/dashboard", headers=patient["headers"])
@@ -0,0 +1,25 @@
+"""Cached AI answers are served without taking a rate-limit token."""
+
+from backend import rate_limit
+
+API = "/api/v1"
+
+
+class ExhaustedBackend(rate_limit.MemoryBackend):
+    async def take(self, buckets):
+        return 30.0
+
+
+def test_cached_recommendations_skip_the_limiter(client, patient, fake_llm, monkeypatch):
+    headers = patient["headers"]
+    first = client.get(f"{API}/health/recommendations", headers=headers)
+    assert first.status_code == 200
+
+    monkeypatch.setattr(rate_limit, "_backend", ExhaustedBackend())
+    cached = client.get(f"{API}/health/recommendations", headers=headers)
+    assert cached.status_code == 200 and cached.json() == first.json()
+
+    client.post(f"{API}/health/vitals", headers=headers, json={"heart_rate": "75"})
+    refused = client.get(f"{API}/health/recommendations", headers=headers)
+    assert refused.status_code == 429 and "Retry-After" in refused.headers
+    assert len(fake_llm) == 1
@@ -0,0 +1,42 @@
+"""Refresh-token rotation: single use, also under concurrent refreshes."""
+
+import asyncio
+
+import httpx
+
+from backend import database
+
+API = "/api/v1"
+
+
+def refresh(client, token):
+    return client.post(f"{API}/auth/refresh", json={"refresh_token": token})
+
+
+def test_rotation_is_single_use_and_reuse_revokes_the_family(client, user):
+    rotated = refresh(client, user["refresh_token"])
+    assert rotated.status_code == 200
+    assert refresh(client, user["refresh_token"]).status_code == 401
+    # The replay revoked every token of the login, including the rotated one
+    assert refresh(client, rotated.json()["refresh_token"]).status_code == 401
+
+
+def test_concurrent_refreshes_fork_no_live_tokens(app, user):
+    async def race():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await asyncio.gather(*(
+                client.post(f"{API}/auth/refresh", json={"refresh_token": user["refresh_token"]})
+                for _ in range(4)
+            ))
+            issued = [r.json()["refresh_token"] for r in first if r.status_code == 200]
+            second = [
+                (await client.post(f"{API}/auth/refresh", json={"refresh_token": token})).status_code
+                for token in issued
+            ]
+        await database.async_engine.dispose()
+        return [r.status_code for r in first], second
+
+    first, second = asyncio.run(race())
+    assert first.count(200) <= 1
+    assert second.count(200) <= 1
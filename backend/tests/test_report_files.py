@@ -0,0 +1,75 @@
+"""Shared report files survive an upload racing a delete of the same content."""
+
+import io
+import os
+
+import pytest
+
+from backend import database, models
+from backend.services import report_files
+
+CONTENT = b"%PDF-1.4 lipid panel"
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_files, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def store():
+    return report_files.store_upload(io.BytesIO(CONTENT), "application/pdf")
+
+
+def add_report(db, path):
+    user = models.User(email=f"files-{os.urandom(6).hex()}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    report = models.Report(user_id=user.id, file_url=path, file_type="application/pdf")
+    db.add(report)
+    db.commit()
+    return report
+
+
+def test_delete_between_dedupe_and_commit_keeps_the_file(app, uploads):
+    db = database.SessionLocal()
+    try:
+        existing = add_report(db, store().path)
+        stored = store()  # Dedupes against the existing report's file
+        assert stored.pending is not None
+
+        db.delete(existing)
+        db.commit()
+        report_files.remove_if_unreferenced(db, stored.path)
+        assert not os.path.exists(stored.path)
+
+        add_report(db, stored.path)
+        report_files.settle(stored)
+        with open(stored.path, "rb") as f:
+            assert f.read() == CONTENT
+        assert os.listdir(os.path.dirname(stored.path)) == [os.path.basename(stored.path)]
+    finally:
+        db.close()
+
+
+def test_report_committed_during_delete_gets_the_file_back(app, uploads, monkeypatch):
+    db = database.SessionLocal()
+    try:
+        stored = store()
+        checks = iter([False, True])  # The upload commits between the delete's two checks
+        monkeypatch.setattr(report_files, "_referenced", lambda db, file_url: next(checks))
+        report_files.remove_if_unreferenced(db, stored.path)
+        assert os.path.exists(stored.path)
+        assert os.listdir(os.path.dirname(stored.path)) == [os.path.basename(stored.path)]
+    finally:
+        db.close()
+
+
+def test_unreferenced_file_is_removed(app, uploads):
+    db = database.SessionLocal()
+    try:
+        stored = store()
+        report_files.remove_if_unreferenced(db, stored.path)
+        assert not os.path.exists(stored.path)
+    finally:
+        db.close()
@@ -0,0 +1,109 @@
+"""The columnar archive tier: its codec, and readers that cannot tell the tiers apart."""
+
+import math
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend import database, models
+from backend.services import vitals_archive
+
+API = "/api/v1"
+
+
+def test_encode_decode_round_trip():
+    base = datetime(2024, 3, 1, 8, 30, 15, 123456)
+    rows = [
+        (str(uuid.uuid4()), "BP", 128.0, 84.0, "mmHg", "after a walk", base + timedelta(days=2)),
+        (str(uuid.uuid4()), "Weight", 176.4, None, "lb", None, base),
+        (str(uuid.uuid4()), "HR", 64.0, math.nan, None, "", base + timedelta(days=1)),
+        # Aware timestamps are stored as UTC
+        (str(uuid.uuid4()), "Temp", 99.1, None, "°F", "évening", datetime(2024, 3, 5, 12, tzinfo=timezone(timedelta(hours=5, minutes=30)))),
+    ]
+    blob = vitals_archive.encode(rows)
+
+    decoded = vitals_archive.decode(blob)
+    assert [r[0] for r in decoded] == [rows[1][0], rows[2][0], rows[0][0], rows[3][0]]  # Oldest first
+    assert decoded[0] == rows[1]
+    assert decoded[1][2:6] == (64.0, None, None, None)  # NaN and empty notes come back as None
+    assert decoded[2] == rows[0]
+    assert decoded[3][5:] == ("évening", datetime(2024, 3, 5, 6, 30))
+
+    aware = vitals_archive.decode(blob, aware=True)
+    assert all(r[6].tzinfo is timezone.utc for r in aware)
+    assert [r[6].replace(tzinfo=None) for r in aware] == [r[6] for r in decoded]
+
+
+def test_decode_rejects_other_formats():
+    blob = vitals_archive.encode([(str(uuid.uuid4()), "HR", 70.0, None, None, None, datetime(2024, 1, 1))])
+    with pytest.raises(ValueError):
+        vitals_archive.decode(b"XXXX" + blob[4:])
+
+
+def snapshot(client, headers):
+    vitals = client.get(f"{API}/health/vitals", headers=headers)
+    dashboard = client.get(f"{API}/health/dashboard", headers=headers).json()
+    export = client.get(f"{API}/export", headers=headers).text.splitlines()[1:]  # After the header, which has a timestamp
+    return vitals.json(), dashboard, export, vitals.headers["etag"]
+
+
+def test_readers_return_the_same_data_after_archiving(client, vitals_history, archive):
+    headers = vitals_history["headers"]
+    vitals, dashboard, export, etag = snapshot(client, headers)
+    assert len(vitals) == 7 and dashboard["latest_vitals"]["temperature"]["value"] == 99.1
+
+    assert archive() == 5
+    archived_vitals, archived_dashboard, archived_export, archived_etag = snapshot(client, headers)
+    assert archived_vitals == vitals
+    assert archived_dashboard == dashboard
+    assert archived_export == export
+    assert archived_etag != etag
+
+
+def test_list_is_newest_first_across_the_tiers(client, vitals_history, archive):
+    archive()
+    vitals = client.get(f"{API}/health/vitals", headers=vitals_history["headers"]).json()
+    ids = vitals_history["ids"]
+    assert [v["id"] for v in vitals] == [ids[label] for label in ("new_bp", "new_hr", "hr", "weight", "temp", "old_bp", "old_hr")]
+    weight = next(v for v in vitals if v["id"] == ids["weight"])
+    assert (weight["value_primary"], weight["unit"]) == (176, "lb")
+
+
+def test_latest_archived_fills_categories_missing_from_the_hot_table(vitals_history, archive):
+    archive()
+    db = database.SessionLocal()
+    try:
+        latest = vitals_archive.latest_archived(db, vitals_history["user_id"], ["HR", "Temp", "Weight", "Glucose"])
+    finally:
+        db.close()
+    ids = vitals_history["ids"]
+    assert {category: v.id for category, v in latest.items()} == {"HR": ids["hr"], "Temp": ids["temp"], "Weight": ids["weight"]}
+    assert latest["Weight"].unit == "lb"
+
+
+def archived_months(user_id):
+    db = database.SessionLocal()
+    try:
+        return db.query(models.VitalArchive).filter(models.VitalArchive.user_id == user_id).count()
+    finally:
+        db.close()
+
+
+def test_editing_and_deleting_archived_readings(client, vitals_history, archive):
+    archive()
+    headers, ids, user_id = vitals_history["headers"], vitals_history["ids"], vitals_history["user_id"]
+    assert archived_months(user_id) == 2
+
+    updated = client.patch(f"{API}/health/vitals/{ids['old_hr']}", headers=headers, json={"value_primary": 66})
+    assert updated.status_code == 200 and updated.json()["value_primary"] == 66
+    assert archived_months(user_id) == 1  # Its month is back in the hot table
+
+    assert client.delete(f"{API}/health/vitals/{ids['weight']}", headers=headers).status_code == 200
+    assert archived_months(user_id) == 0
+
+    vitals = {v["id"]: v for v in client.get(f"{API}/health/vitals", headers=headers).json()}
+    assert len(vitals) == 6 and ids["weight"] not in vitals
+    assert vitals[ids["old_hr"]]["value_primary"] == 66
+    assert vitals[ids["old_bp"]]["notes"] == "after a walk"
+    assert client.delete(f"{API}/health/vitals/{uuid.uuid4()}", headers=headers).status_code == 404
@@ -0,0 +1,96 @@
+"""One active import per user; jobs whose worker was lost do not block the next one."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from backend import database, models
+from backend.config import settings
+from backend.services import vitals_import
+
+API = "/api/v1"
+CSV = b"category,value_primary,recorded_at\nHR,70,2024-01-01T08:00:00Z\n"
+
+
+def start(client, user):
+    return client.post(f"{API}/health/imports", headers={**user["headers"], "Content-Type": "text/csv"}, content=CSV)
+
+
+def add_job(user, status=vitals_import.RUNNING, age=timedelta(0)):
+    db = database.SessionLocal()
+    try:
+        user_id = db.query(models.User.id).filter(models.User.email == user["email"]).scalar()
+        job = models.ImportJob(user_id=user_id, format="csv", status=status,
+                               created_at=datetime.now(timezone.utc) - age)
+        db.add(job)
+        db.commit()
+        return job.id
+    finally:
+        db.close()
+
+
+def get_job(job_id):
+    db = database.SessionLocal()
+    try:
+        return db.get(models.ImportJob, job_id)
+    finally:
+        db.close()
+
+
+def test_an_active_job_blocks_a_second_import(client, user):
+    add_job(user)
+    assert start(client, user).status_code == 409
+
+
+def test_only_one_active_job_per_user_in_the_database(client, user):
+    add_job(user, vitals_import.QUEUED)
+    add_job(user, vitals_import.SUCCEEDED)
+    with pytest.raises(IntegrityError):
+        add_job(user, vitals_import.RUNNING)
+
+
+def test_a_stale_job_is_failed_and_the_import_starts(client, user):
+    stale = add_job(user, age=timedelta(hours=1))
+    assert start(client, user).status_code == 202
+    job = get_job(stale)
+    assert job.status == vitals_import.FAILED and job.finished_at is not None
+
+
+def test_the_worker_skips_a_job_that_is_no_longer_queued(app, user):
+    job_id = add_job(user, vitals_import.FAILED)
+    path = vitals_import.upload_path(job_id)
+    with open(path, "wb") as f:
+        f.write(CSV)
+    vitals_import.run_import(job_id, path)
+    job = get_job(job_id)
+    assert job.status == vitals_import.FAILED and job.rows_imported == 0
+
+
+def test_the_worker_records_progress(app, user):
+    job_id = add_job(user, vitals_import.QUEUED)
+    path = vitals_import.upload_path(job_id)
+    with open(path, "wb") as f:
+        f.write(CSV)
+    vitals_import.run_import(job_id, path)
+    job = get_job(job_id)
+    assert job.status == vitals_import.SUCCEEDED and job.rows_imported == 1
+    assert job.updated_at is not None
+
+
+def test_a_malformed_content_length_is_a_bad_request(client, user):
+    response = client.post(f"{API}/health/imports", content=CSV,
+                           headers={**user["headers"], "Content-Type": "text/csv", "Content-Length": "12abc"})
+    assert response.status_code == 400
+
+
+def test_the_size_cap_applies_to_the_streamed_body(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_MAX_BYTES", len(CSV) - 1)
+
+    def body():
+        yield CSV  # Chunked, without a Content-Length
+
+    response = client.post(f"{API}/health/imports", content=body(),
+                           headers={**user["headers"], "Content-Type": "text/csv"})
+    assert response.status_code == 413
+    assert start(client, user).status_code == 413  # With the header
@@ -0,0 +1,23 @@
+"""
+Gunicorn worker for the production server profile (gunicorn.conf.py).
+
+On SIGTERM gunicorn's master asks every worker to stop and kills any still
+running graceful_timeout seconds later. A uvicorn worker stops accepting
+connections, closes idle keep-alive ones and waits for the requests it is
+serving, such as a slow LLM call or an SOS being dispatched, before running
+the app's lifespan shutdown. The stock worker waits without limit, so a
+request that never finishes ends with the SIGKILL and the shutdown never
+runs. This one gives up on stragglers a few seconds before that.
+"""
+
+from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+
+SHUTDOWN_MARGIN_SECONDS = 5
+
+
+class UvicornWorker(BaseUvicornWorker):
+    CONFIG_KWARGS = {"loop": "auto", "http": "auto", "lifespan": "on"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(1, self.cfg.graceful_timeout - SHUTDOWN_MARGIN_SECONDS)
@@ -1,9 +1,30 @@
 import { X, FileText, AlertTriangle, CheckCircle, ExternalLink } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
+import axios from 'axios';
+import ReportThumbnail from './ReportThumbnail';
 
 const ReportModal = ({ report, onClose }) => {
     if (!report) return null;
 
+    // Report files are private: fetch a short-lived signed link, then open it.
+    // The tab is opened first, inside the click, so popup blockers allow it.
+    const openOriginal = async () => {
+        const tab = window.open('', '_blank');
+        try {
+            const token = localStorage.getItem('token');
+            const res = await axios.get(`/api/v1/analysis/reports/${report.id}/file`, {
+                headers: { 'Authorization': `Bearer ${token}` }
+            });
+            if (tab) {
+                tab.opener = null;
+                tab.location = res.data.url;
+            }
+        } catch (err) {
+            tab?.close();
+            console.error("Failed to open report file", err);
+        }
+    };
+
     const getRiskBadgeClass = (riskLevel) => {
         switch (riskLevel) {
             case 'GREEN': return 'badge-success';
@@ -37,12 +58,14 @@ const ReportModal = ({ report, onClose }) => {
                         {/* Header */}
                         <div className="flex items-start justify-between p-6 border-b border-slate-100 dark:border-slate-800">
                             <div className="flex items-center gap-4">
-                                <div className="w-12 h-12 bg-primary-50 dark:bg-primary-900/20 rounded-xl flex items-center justify-center text-primary border border-primary-100 dark:border-primary-900/30">
-                                    <FileText className="w-6 h-6" />
+                                <div className="w-12 h-12 bg-primary-50 dark:bg-primary-900/20 rounded-xl flex items-center justify-center text-primary border border-primary-100 dark:border-primary-900/30 overflow-hidden">
+                                    <ReportThumbnail report={report} className="w-full h-full object-cover">
+                                        <FileText className="w-6 h-6" />
+                                    </ReportThumbnail>
                                 </div>
                                 <div>
                                     <h2 className="text-lg font-bold text-slate-800 dark:text-white mb-1">
-                                        {report.file_url.split('/').pop().split('_').slice(1).join('_') || "Medical Report"}
+                                        {report.file_name || report.file_url.split('/').pop().split('_').slice(1).join('_') || "Medical Report"}
                                     </h2>
                                     <p className="text-sm text-slate-500 dark:text-slate-400">
                                         {new Date(report.created_at).toLocaleDateString(undefined, {
@@ -153,15 +176,13 @@ const ReportModal = ({ report, onClose }) => {
 
                         {/* Footer */}
                         <div className="flex items-center justify-between gap-4 p-6 border-t border-slate-100 dark:border-slate-800 bg-slate-50/50 dark:bg-slate-800/50 rounded-b-2xl">
-                            <a
-                                href={report.file_url.replace('backend/uploads/', '/uploads/')}
-                                target="_blank"
-                                rel="noopener noreferrer"
+                            <button
+                                onClick={openOriginal}
                                 className="btn-secondary px-4 py-2.5 text-sm"
                             >
                                 <ExternalLink className="w-4 h-4" />
                                 View Original
-                            </a>
+                            </button>
                             <button onClick={onClose} className="btn-primary px-6 py-2.5 text-sm">
                                 Close
                             </button>
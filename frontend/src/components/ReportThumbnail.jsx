@@ -0,0 +1,33 @@
+import { useEffect, useState } from 'react';
+import axios from 'axios';
+
+// Preview of an uploaded report, or the fallback until one has been rendered.
+// Thumbnails need the bearer token, so they are fetched as blobs rather than
+// linked from an <img>; the browser still caches them (immutable responses).
+const ReportThumbnail = ({ report, className, children }) => {
+    const [src, setSrc] = useState(null);
+
+    useEffect(() => {
+        if (!report?.thumbnail_url) return;
+        let objectUrl = null;
+        let cancelled = false;
+        const token = localStorage.getItem('token');
+        axios.get(report.thumbnail_url, {
+            headers: { 'Authorization': `Bearer ${token}` },
+            responseType: 'blob'
+        }).then(res => {
+            if (cancelled) return;
+            objectUrl = URL.createObjectURL(res.data);
+            setSrc(objectUrl);
+        }).catch(() => setSrc(null));
+        return () => {
+            cancelled = true;
+            if (objectUrl) URL.revokeObjectURL(objectUrl);
+        };
+    }, [report?.thumbnail_url]);
+
+    if (!src) return children;
+    return <img src={src} alt="" className={className} onError={() => setSrc(null)} />;
+};
+
+export default ReportThumbnail;
@@ -1,7 +1,41 @@
 import { createContext, useContext, useState, useEffect } from 'react';
+import axios from 'axios';
 
 const AuthContext = createContext();
 
+// Tabs share the tokens through localStorage, and a refresh token is single
+// use: presenting one that another tab already rotated revokes the login.
+// Refreshes therefore run under a Web Lock held across tabs, and a tab that
+// gets the lock after another tab rotated picks up the new tokens instead of
+// spending the old one. Within a tab, concurrent 401s share one refresh.
+const REFRESH_LOCK = 'arodoc-token-refresh';
+let refreshRequest = null;
+
+const rotateTokens = (seenRefreshToken) => {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (!refreshToken) {
+        return Promise.reject(new Error('No refresh token'));
+    }
+    if (refreshToken !== seenRefreshToken) {
+        return Promise.resolve(localStorage.getItem('token'));
+    }
+    return axios.post('/api/v1/auth/refresh', { refresh_token: refreshToken }, { _skipRefresh: true })
+        .then((res) => {
+            localStorage.setItem('token', res.data.access_token);
+            localStorage.setItem('refresh_token', res.data.refresh_token);
+            return res.data.access_token;
+        });
+};
+
+const refreshAccessToken = (seenRefreshToken) => {
+    if (!refreshRequest) {
+        const rotate = () => rotateTokens(seenRefreshToken);
+        refreshRequest = (navigator.locks ? navigator.locks.request(REFRESH_LOCK, rotate) : rotate())
+            .finally(() => { refreshRequest = null; });
+    }
+    return refreshRequest;
+};
+
 export const AuthProvider = ({ children }) => {
     const [isAuthenticated, setIsAuthenticated] = useState(false);
     const [loading, setLoading] = useState(true);
@@ -16,16 +50,66 @@ export const AuthProvider = ({ children }) => {
         setLoading(false);
     }, []);
 
-    const login = (newToken) => {
+    const clearSession = () => {
+        localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
+        setToken(null);
+        setIsAuthenticated(false);
+    };
+
+    // Another tab refreshed, signed in or signed out
+    useEffect(() => {
+        const onStorage = (event) => {
+            if (event.key !== 'token' && event.key !== null) return;
+            const storedToken = localStorage.getItem('token');
+            setToken(storedToken);
+            setIsAuthenticated(!!storedToken);
+        };
+        window.addEventListener('storage', onStorage);
+        return () => window.removeEventListener('storage', onStorage);
+    }, []);
+
+    // Access tokens are short-lived: on a 401, refresh once and replay the request
+    useEffect(() => {
+        const interceptor = axios.interceptors.response.use(
+            (response) => response,
+            async (error) => {
+                const original = error.config;
+                const seenRefreshToken = localStorage.getItem('refresh_token');
+                if (error.response?.status !== 401 || !original || original._skipRefresh || original._retried
+                    || !seenRefreshToken) {
+                    return Promise.reject(error);
+                }
+                original._retried = true;
+                try {
+                    const newToken = await refreshAccessToken(seenRefreshToken);
+                    setToken(newToken);
+                    original.headers = { ...original.headers, Authorization: `Bearer ${newToken}` };
+                    return axios(original);
+                } catch (refreshError) {
+                    clearSession();
+                    return Promise.reject(error);
+                }
+            }
+        );
+        return () => axios.interceptors.response.eject(interceptor);
+    }, []);
+
+    const login = (newToken, refreshToken) => {
         localStorage.setItem('token', newToken);
+        if (refreshToken) {
+            localStorage.setItem('refresh_token', refreshToken);
+        }
         setToken(newToken);
         setIsAuthenticated(true);
     };
 
     const logout = () => {
-        localStorage.removeItem('token');
-        setToken(null);
-        setIsAuthenticated(false);
+        const refreshToken = localStorage.getItem('refresh_token');
+        if (refreshToken) {
+            axios.post('/api/v1/auth/logout', { refresh_token: refreshToken }, { _skipRefresh: true }).catch(() => {});
+        }
+        clearSession();
     };
 
     return (
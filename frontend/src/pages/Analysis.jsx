@@ -3,6 +3,7 @@ import { useState, useEffect } from 'react';
 import Navbar from '../components/Navbar';
 import FileUpload from '../components/FileUpload';
 import ReportModal from '../components/ReportModal';
+import ReportThumbnail from '../components/ReportThumbnail';
 import axios from 'axios';
 import { FileText, Trash2, Loader2, Wand2, ArrowUpRight, Sparkles } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
@@ -158,15 +159,17 @@ const Analysis = () => {
                                             </div>
 
                                             <div className="flex items-start gap-4">
-                                                <div className="w-14 h-14 bg-gradient-to-br from-primary-50 to-primary-100 dark:from-primary-900/20 dark:to-primary-800/20 rounded-2xl flex items-center justify-center text-primary dark:text-primary-400 shrink-0 border border-primary-100/50 dark:border-primary-500/10 group-hover:scale-105 transition-transform duration-300 shadow-sm">
-                                                    <FileText className="w-7 h-7" />
+                                                <div className="w-14 h-14 bg-gradient-to-br from-primary-50 to-primary-100 dark:from-primary-900/20 dark:to-primary-800/20 rounded-2xl flex items-center justify-center text-primary dark:text-primary-400 shrink-0 border border-primary-100/50 dark:border-primary-500/10 group-hover:scale-105 transition-transform duration-300 shadow-sm overflow-hidden">
+                                                    <ReportThumbnail report={report} className="w-full h-full object-cover">
+                                                        <FileText className="w-7 h-7" />
+                                                    </ReportThumbnail>
                                                 </div>
 
                                                 <div className="flex-1 min-w-0">
                                                     <div className="flex items-start justify-between gap-8">
                                                         <div>
                                                             <h3 className="font-bold text-slate-800 dark:text-white truncate pr-4 mb-1 text-lg group-hover:text-primary transition-colors">
-                                                                {report.file_url.split('/').pop().split('_').slice(1).join('_') || "Medical Report"}
+                                                                {report.file_name || report.file_url.split('/').pop().split('_').slice(1).join('_') || "Medical Report"}
                                                             </h3>
                                                             <div className="flex items-center gap-3 text-xs font-medium text-slate-400">
                                                                 <span className="uppercase tracking-wide">
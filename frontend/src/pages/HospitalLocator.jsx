@@ -15,12 +15,12 @@ const HospitalLocator = () => {
     const [userLocation, setUserLocation] = useState(null);
     const [locationError, setLocationError] = useState(null);
 
-    const fetchFacilities = async (searchQuery) => {
+    const fetchFacilities = async (searchQuery, location = null) => {
         setLoading(true);
         try {
             const token = localStorage.getItem('token');
             const res = await axios.get('/api/v1/health/hospitals', {
-                params: { query: searchQuery },
+                params: location ? { query: searchQuery, lat: location.lat, lng: location.lng } : { query: searchQuery },
                 headers: { 'Authorization': `Bearer ${token}` }
             });
             setResults(res.data.results);
@@ -58,7 +58,7 @@ const HospitalLocator = () => {
                 const { latitude, longitude } = position.coords;
                 setUserLocation({ lat: latitude, lng: longitude });
                 setQuery("Nearby Hospitals");
-                fetchFacilities('');
+                fetchFacilities('', { lat: latitude, lng: longitude });
             },
             () => {
                 setLocationError("Unable to retrieve your location. Please check browser permissions.");
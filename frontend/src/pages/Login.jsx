@@ -31,7 +31,7 @@ const Login = () => {
             formData.append('password', password);
 
             const res = await axios.post('/api/v1/auth/token', formData);
-            login(res.data.access_token);
+            login(res.data.access_token, res.data.refresh_token);
             navigate('/dashboard');
         } catch (err) {
             alert('Login failed: ' + (err.response?.data?.detail || err.message));
@@ -12,10 +12,6 @@ export default defineConfig(({ mode }) => {
                 '/api': {
                     target: env.VITE_API_TARGET || 'http://localhost:8000',
                     changeOrigin: true,
-                },
-                '/uploads': {
-                    target: env.VITE_API_TARGET || 'http://localhost:8000',
-                    changeOrigin: true,
                 }
             }
         }